@@ -15,6 +15,8 @@ import os
 import tempfile
 import io
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from docx import Document as DocxDocument
 from docx.shared import Inches
 from io import BytesIO
@@ -32,6 +34,7 @@ from docx import Document as DocxDocument
 from docx.shared import Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 import json
+from functools import lru_cache
 
 # 添加原項目路徑到 sys.path
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../../app'))
@@ -62,8 +65,6 @@ except ImportError as e:
     PYMUPDF_AVAILABLE = False
 
 import time
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from PIL import Image
 
 router = APIRouter()
@@ -434,74 +435,140 @@ async def get_proposal_status(task_id: str):
         "progress": 100
     }
 
+# XML 不允許的控制字符（保留 \t \n \r），供 str.translate 一次刪除
+_XML_DEL = dict.fromkeys([i for i in range(32) if i not in (9, 10, 13)], None)
+
 def clean_text_for_xml(text):
     """清理文本以確保XML兼容性"""
-    if not text:
-        return ""
-    # 移除NULL字節和控制字符
-    cleaned = "".join(char for char in text if ord(char) >= 32 or char in '\n\r\t')
-    # 移除其他可能導致XML問題的字符
-    cleaned = cleaned.replace('\x00', '')  # NULL字節
-    cleaned = cleaned.replace('\x01', '')  # SOH
-    cleaned = cleaned.replace('\x02', '')  # STX
-    cleaned = cleaned.replace('\x03', '')  # ETX
-    cleaned = cleaned.replace('\x04', '')  # EOT
-    cleaned = cleaned.replace('\x05', '')  # ENQ
-    cleaned = cleaned.replace('\x06', '')  # ACK
-    cleaned = cleaned.replace('\x07', '')  # BEL
-    cleaned = cleaned.replace('\x08', '')  # BS
-    cleaned = cleaned.replace('\x0b', '')  # VT
-    cleaned = cleaned.replace('\x0c', '')  # FF
-    cleaned = cleaned.replace('\x0e', '')  # SO
-    cleaned = cleaned.replace('\x0f', '')  # SI
-    return cleaned
+    return text.translate(_XML_DEL) if text else ""
+
+# clean_markdown_text 使用的正則（模組載入時預先編譯）
+_RE_BOLD = re.compile(r'\*\*(.*?)\*\*')
+_RE_ITALIC = re.compile(r'\*(.*?)\*')
+_RE_CODE = re.compile(r'`(.*?)`')
+_RE_HEADER = re.compile(r'^#+\s*(.*)$', re.MULTILINE)
+_RE_BULLET = re.compile(r'^\s*[-*+]\s+', re.MULTILINE)
+_RE_NUMLIST = re.compile(r'^\s*\d+\.\s+', re.MULTILINE)
+_RE_BLANKS = re.compile(r'\n\s*\n\s*\n')
+_RE_NL_BOLD = re.compile(r'\n\s*\*\*')
+_RE_BOLD_NL = re.compile(r'\*\*\s*\n')
 
 def clean_markdown_text(text):
     """清理 markdown 格式，轉換為純文本"""
     if not text:
         return ""
     
-    import re
-    
     # 移除 markdown 格式
     cleaned = text
-    cleaned = re.sub(r'\*\*(.*?)\*\*', r'\1', cleaned)  # 移除粗體標記
-    cleaned = re.sub(r'\*(.*?)\*', r'\1', cleaned)  # 移除斜體標記
-    cleaned = re.sub(r'`(.*?)`', r'\1', cleaned)  # 移除代碼標記
-    cleaned = re.sub(r'^#+\s*(.*)$', r'\1', cleaned, flags=re.MULTILINE)  # 移除標題標記
-    cleaned = re.sub(r'^\s*[-*+]\s+', '- ', cleaned, flags=re.MULTILINE)  # 統一項目符號
-    cleaned = re.sub(r'^\s*\d+\.\s+', '', cleaned, flags=re.MULTILINE)  # 移除編號
-    cleaned = re.sub(r'\n\s*\n\s*\n', '\n\n', cleaned)  # 移除多餘空行
-    cleaned = re.sub(r'\n\s*\*\*', '\n', cleaned)  # 移除粗體前的換行
-    cleaned = re.sub(r'\*\*\s*\n', '\n', cleaned)  # 移除粗體後的換行
+    cleaned = _RE_BOLD.sub(r'\1', cleaned)  # 移除粗體標記
+    cleaned = _RE_ITALIC.sub(r'\1', cleaned)  # 移除斜體標記
+    cleaned = _RE_CODE.sub(r'\1', cleaned)  # 移除代碼標記
+    cleaned = _RE_HEADER.sub(r'\1', cleaned)  # 移除標題標記
+    cleaned = _RE_BULLET.sub('- ', cleaned)  # 統一項目符號
+    cleaned = _RE_NUMLIST.sub('', cleaned)  # 移除編號
+    cleaned = _RE_BLANKS.sub('\n\n', cleaned)  # 移除多餘空行
+    cleaned = _RE_NL_BOLD.sub('\n', cleaned)  # 移除粗體前的換行
+    cleaned = _RE_BOLD_NL.sub('\n', cleaned)  # 移除粗體後的換行
     
     return cleaned
 
-def get_nfpa_icon_image_stream(nfpa_code: str) -> io.BytesIO:
+def svg_to_png_stream(svg_content: bytes, scale: float = 2) -> Optional[io.BytesIO]:
     """
-    用 Headless Chrome 抓取 PubChem NFPA 圖，回傳 BytesIO PNG 圖片
+    使用 svglib + reportlab + PyMuPDF 將 SVG 轉為 PNG，回傳 BytesIO；無法轉換時回傳 None
     """
+    if not (SVGLIB_AVAILABLE and PYMUPDF_AVAILABLE):
+        print("⚠️ svglib 或 PyMuPDF 不可用，無法轉換 SVG")
+        return None
+
+    # 步驟1：SVG 轉 PDF
+    drawing = svg2rlg(io.BytesIO(svg_content))
+    if not drawing:
+        print("⚠️ SVG 轉換失敗 - drawing 為 None")
+        return None
+
+    # 直接在記憶體中產生 PDF，不經過臨時文件
+    pdf_bytes = renderPDF.drawToString(drawing)
+
+    # 步驟2：PDF 轉 PNG
+    pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        pix = pdf_document[0].get_pixmap(matrix=fitz.Matrix(scale, scale))
+        png_stream = io.BytesIO(pix.tobytes("png"))
+    finally:
+        pdf_document.close()
+
+    png_stream.seek(0)
+    return png_stream
+
+# 圖片/圖示下載與轉換結果的程序內快取容量（GHS 圖示僅約十種）
+IMAGE_CACHE_SIZE = 256
+
+# 共用 HTTP Session：圖示皆來自 pubchem.ncbi.nlm.nih.gov，重用連線可省去每次的 TLS 握手
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=Retry(total=2)))
+
+@lru_cache(maxsize=IMAGE_CACHE_SIZE)
+def _fetch_bytes(url: str) -> bytes:
+    """下載 URL 原始內容並快取；非 200 時拋出 HTTPError（失敗結果不會被快取）"""
+    response = _SESSION.get(url, verify=False, timeout=5)
+    response.raise_for_status()
+    return response.content
+
+class _IconConversionError(Exception):
+    """SVG 圖示無法轉為 PNG（以例外表示，lru_cache 不會快取失敗結果）"""
+
+def _svg_to_png_bytes(svg_content: bytes) -> bytes:
+    """SVG 轉 PNG bytes；無法轉換時拋出 _IconConversionError"""
+    png_stream = svg_to_png_stream(svg_content)
+    if png_stream is None:
+        raise _IconConversionError("SVG 轉換 PNG 失敗")
+    return png_stream.getvalue()
+
+@lru_cache(maxsize=IMAGE_CACHE_SIZE)
+def _ghs_icon_png_bytes(icon_url: str) -> bytes:
+    """下載 GHS 圖示 SVG 並轉為 PNG bytes（快取）"""
+    return _svg_to_png_bytes(_fetch_bytes(icon_url))
+
+@lru_cache(maxsize=IMAGE_CACHE_SIZE)
+def _nfpa_icon_png_bytes(nfpa_code: str) -> bytes:
+    """下載 PubChem NFPA 圖並轉為 PNG bytes（以 NFPA code 為鍵快取）"""
     nfpa_svg_url = f"https://pubchem.ncbi.nlm.nih.gov/image/nfpa.cgi?code={nfpa_code}"
 
-    chrome_options = Options()
-    chrome_options.add_argument("--headless=new")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--window-size=300,300")
-    chrome_options.add_argument("--hide-scrollbars")
+    response = _SESSION.get(nfpa_svg_url, verify=False, timeout=5)
+    response.raise_for_status()
+
+    content_type = response.headers.get("Content-Type", "")
+    if content_type.startswith("image/png"):
+        # 已是點陣圖，直接裁切左上角的菱形區域
+        image = Image.open(io.BytesIO(response.content))
+        cropped = image.crop((0, 0, min(image.width, 100), min(image.height, 100)))
+        output = io.BytesIO()
+        cropped.save(output, format="PNG")
+        return output.getvalue()
 
-    driver = webdriver.Chrome(options=chrome_options)
-    driver.get(nfpa_svg_url)
-    time.sleep(1)
+    return _svg_to_png_bytes(response.content)
 
-    png_data = driver.get_screenshot_as_png()
-    driver.quit()
+# 以下公開函式每次回傳新的 BytesIO，避免多個呼叫端共用同一游標
 
-    image = Image.open(io.BytesIO(png_data))
-    cropped = image.crop((0, 0, 100, 100))  # 你已經測試好的範圍
-    output = io.BytesIO()
-    cropped.save(output, format="PNG")
-    output.seek(0)
-    return output
+def get_image_stream_from_url(url: str) -> io.BytesIO:
+    """下載圖片並回傳 BytesIO"""
+    return io.BytesIO(_fetch_bytes(url))
+
+def get_ghs_icon_stream(icon_url: str) -> Optional[io.BytesIO]:
+    """下載 GHS 圖示 (SVG) 並轉為 PNG，回傳 BytesIO；無法轉換時回傳 None"""
+    try:
+        return io.BytesIO(_ghs_icon_png_bytes(icon_url))
+    except _IconConversionError:
+        return None
+
+def get_nfpa_icon_image_stream(nfpa_code: str) -> Optional[io.BytesIO]:
+    """
+    直接下載 PubChem NFPA 圖 (SVG) 並轉為 PNG，回傳 BytesIO PNG 圖片
+    """
+    try:
+        return io.BytesIO(_nfpa_icon_png_bytes(nfpa_code))
+    except _IconConversionError:
+        return None
 
 class DocxRequest(BaseModel):
     """DOCX 生成請求模型"""
@@ -569,14 +636,12 @@ async def generate_docx(request: DocxRequest):
             elif chem.get("image_url"):
                 # 備用方案：使用原有的 URL 圖片
                 try:
-                    response = requests.get(chem["image_url"], verify=False, timeout=5)
-                    if response.status_code == 200:
-                        img_stream = BytesIO(response.content)
-                        row[0].paragraphs[0].add_run().add_picture(img_stream, width=Inches(1))
-                        print(f"✅ 使用 URL 圖片: {chem.get('name', 'Unknown')}")
-                    else:
-                        row[0].text = "Image not found"
-                        print(f"⚠️ URL 圖片下載失敗: {chem.get('name', 'Unknown')}")
+                    img_stream = get_image_stream_from_url(chem["image_url"])
+                    row[0].paragraphs[0].add_run().add_picture(img_stream, width=Inches(1))
+                    print(f"✅ 使用 URL 圖片: {chem.get('name', 'Unknown')}")
+                except requests.HTTPError:
+                    row[0].text = "Image not found"
+                    print(f"⚠️ URL 圖片下載失敗: {chem.get('name', 'Unknown')}")
                 except Exception as e:
                     print(f"⚠️ 圖片下載失敗: {chem['image_url']}, {e}")
                     row[0].text = "Image error"
@@ -599,42 +664,14 @@ async def generate_docx(request: DocxRequest):
             
             for icon_url in ghs_icons:
                 try:
-                    icon_resp = requests.get(icon_url, verify=False, timeout=5)
-                    if icon_resp.status_code == 200:
-                        # 使用 svglib + PyMuPDF 轉換 SVG 為 PNG
-                        if SVGLIB_AVAILABLE and PYMUPDF_AVAILABLE:
-                            try:
-                                # 步驟1：SVG 轉 PDF
-                                drawing = svg2rlg(io.BytesIO(icon_resp.content))
-                                if drawing:
-                                    # 創建臨時 PDF 文件
-                                    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_pdf:
-                                        renderPDF.drawToFile(drawing, tmp_pdf.name)
-                                    
-                                    # 步驟2：PDF 轉 PNG
-                                    pdf_document = fitz.open(tmp_pdf.name)
-                                    page = pdf_document[0]
-                                    pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x 縮放
-                                    
-                                    # 將 PNG 轉換為 BytesIO
-                                    png_stream = io.BytesIO()
-                                    png_stream.write(pix.tobytes("png"))
-                                    png_stream.seek(0)
-                                    
-                                    # 插入到 Word 文檔
-                                    run = icons_cell.add_run()
-                                    run.add_picture(png_stream, width=Inches(0.3))
-                                    
-                                    # 清理臨時文件
-                                    pdf_document.close()
-                                    os.unlink(tmp_pdf.name)
-                                    
-                                else:
-                                    print(f"⚠️ SVG 轉換失敗 - drawing 為 None: {icon_url}")
-                            except Exception as e:
-                                print(f"⚠️ SVG 轉換錯誤: {icon_url}, {e}")
-                        else:
-                            print(f"⚠️ svglib 或 PyMuPDF 不可用，無法轉換 SVG: {icon_url}")
+                    # 使用 svglib + PyMuPDF 轉換 SVG 為 PNG
+                    png_stream = get_ghs_icon_stream(icon_url)
+                    if png_stream:
+                        # 插入到 Word 文檔
+                        run = icons_cell.add_run()
+                        run.add_picture(png_stream, width=Inches(0.3))
+                    else:
+                        print(f"⚠️ SVG 轉換失敗: {icon_url}")
                 except Exception as e:
                     print(f"⚠️ Failed to convert or insert icon: {icon_url}, {e}")
 
@@ -5,19 +5,28 @@
 處理文件上傳、處理和狀態查詢功能
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi.responses import FileResponse, ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import os
 import sys
+import asyncio
+import functools
 import tempfile
 import shutil
 import time
 import logging
 import re
+import uuid
 from pathlib import Path
+from dataclasses import dataclass
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import aiofiles
+import orjson
+from cachetools import TTLCache
 
 # 添加原項目路徑到 sys.path
 sys.path.append(os.path.join(os.path.dirname(__file__), '../../../app'))
@@ -28,9 +37,13 @@ import os
 # sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../../../app'))  # 已重組，不再需要
 
 from backend.services.file_service import process_uploaded_files
-from backend.services.embedding_service import embed_documents_from_metadata, embed_experiment_txt_batch, get_vectorstore_stats
-from backend.services.excel_service import export_new_experiments_to_txt
+from backend.services.embedding_service import embed_documents_from_metadata, embed_experiment_rows, get_vectorstore_stats, embed_pool
+from backend.services.excel_service import iter_new_experiment_rows
+from backend.services.content_hash_registry import lookup_hashes, record_hashes
 from backend.config import EXPERIMENT_DIR
+from backend.core.config import settings
+from backend.utils.exceptions import TaskCancelledError
+from backend.utils.helpers import generate_file_hash
 
 # 配置日誌
 logging.basicConfig(level=logging.DEBUG)
@@ -48,7 +61,7 @@ class FileUploadResponse(BaseModel):
 class ProcessingStatus(BaseModel):
     """處理狀態模型"""
     task_id: str
-    status: str  # pending, processing, completed, failed
+    status: str  # pending, queued, processing, completed, failed, cancelled
     progress: int
     message: str
     results: Optional[Dict[str, Any]] = None
@@ -59,19 +72,110 @@ class VectorStatsResponse(BaseModel):
     experiment_vectors: int
     total_vectors: int
 
-# 存儲處理任務狀態
-processing_tasks = {}
+@dataclass
+class UploadedFile:
+    """已保存到臨時目錄的上傳文件（大小在保存時記錄，後續不再 stat）"""
+    path: str
+    size: int
+    name: str
+
+class TaskState(dict):
+    """
+    任務狀態字典；status / progress / message 變更時推送快照給 SSE 訂閱者。
+    可在任意線程寫入（透過 call_soon_threadsafe 交回事件循環）。
+    """
+    _WATCHED_KEYS = ("status", "progress", "message")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loop = asyncio.get_running_loop()
+        self.subscribers: set = set()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if key in self._WATCHED_KEYS:
+            self._notify()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._notify()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {key: self.get(key) for key in self._WATCHED_KEYS}
+
+    def _notify(self) -> None:
+        if not self.subscribers:
+            return
+        snapshot = self.snapshot()
+        for queue in list(self.subscribers):
+            self.loop.call_soon_threadsafe(queue.put_nowait, snapshot)
 
-@router.post("/upload/files", response_model=FileUploadResponse)
+# 存儲處理任務狀態（有上限且會過期，避免長時間運行後無限增長）
+TASK_STORE_MAXSIZE = 10_000
+TASK_STORE_TTL = 3600  # 秒
+processing_tasks: TTLCache = TTLCache(maxsize=TASK_STORE_MAXSIZE, ttl=TASK_STORE_TTL)
+_tasks_lock = asyncio.Lock()
+_TERMINAL_STATUSES = {"completed", "failed", "cancelled"}
+
+# 設定 UPLOAD_TASK_STATE_BACKEND=redis 時，任務狀態同步到 Redis（settings.redis_url），
+# 讓其他 uvicorn worker 或重啟後仍可查詢/取消任務；本進程仍保留 processing_tasks 作為主副本
+UPLOAD_TASK_STATE_BACKEND = os.getenv("UPLOAD_TASK_STATE_BACKEND", "memory").lower()
+TASK_STATE_SYNC_INTERVAL = 0.5  # 秒
+_redis = None
+_redis_request_cancel = None
+# 僅在任務 hash 仍存在（含 status）時寫入取消標記，避免任務剛過期時建立只有 cancel_requested 的殘缺 hash
+_REQUEST_CANCEL_LUA = """
+if redis.call('HEXISTS', KEYS[1], 'status') == 1 then
+    redis.call('HSET', KEYS[1], 'cancel_requested', '1')
+    return 1
+end
+return 0
+"""
+if UPLOAD_TASK_STATE_BACKEND == "redis":
+    try:
+        import redis.asyncio as aioredis
+        _redis = aioredis.Redis.from_url(settings.redis_url, decode_responses=True)
+        _redis_request_cancel = _redis.register_script(_REQUEST_CANCEL_LUA)
+        logger.info(f"✅ 上傳任務狀態同步到 Redis: {settings.redis_url}")
+    except ImportError:
+        logger.warning("⚠️ UPLOAD_TASK_STATE_BACKEND=redis 但未安裝 redis，任務狀態僅保存在本進程")
+
+# 解析服務層狀態訊息中的進度（模組載入時預先編譯）
+_RE_EXTRACT_PROG = re.compile(r'提取第 (\d+)/(\d+) 個文件元數據')
+
+# 限制同時執行的後台處理任務數量，超出的任務排隊等待
+UPLOAD_MAX_PARALLEL = int(os.getenv("UPLOAD_MAX_PARALLEL", str(min(4, os.cpu_count() or 1))))
+_job_sem = asyncio.Semaphore(UPLOAD_MAX_PARALLEL)
+
+# 同一任務內並行處理的實驗文件數量上限，避免壓垮嵌入服務
+EXPERIMENT_MAX_PARALLEL = 4
+
+# 上傳文件寫入磁碟時的分塊大小
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+def _preallocate(fd: int, size: Optional[int]) -> None:
+    """
+    已知文件大小時預先分配磁碟空間，減少大文件寫入時的碎片
+    
+    為阻塞調用：文件系統不支援 fallocate 時 glibc 會逐塊寫零模擬，須在線程中執行
+    """
+    if not size or not hasattr(os, "posix_fallocate"):
+        return
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except OSError as e:
+        # 空間不足（ENOSPC）或平台不支援（EINVAL/EOPNOTSUPP）時放棄預分配，直接寫入即可
+        logger.debug(f"預分配磁碟空間失敗，改為直接寫入: {e}")
+
+
+@router.post("/upload/files", response_model=FileUploadResponse, response_class=ORJSONResponse)
 async def upload_files(
-    background_tasks: BackgroundTasks,
     files: List[UploadFile] = File(...)
 ):
     """
     上傳並處理文件
     
     Args:
-        background_tasks: 後台任務管理器
         files: 上傳的文件列表
         
     Returns:
@@ -87,37 +191,44 @@ async def upload_files(
             if file.filename:
                 file_path = os.path.join(temp_dir, file.filename)
                 # 重置文件指針到開始位置，確保能讀取完整內容
-                file.file.seek(0)
-                with open(file_path, "wb") as buffer:
-                    shutil.copyfileobj(file.file, buffer)
+                await file.seek(0)
+                # 分塊非同步寫入，避免阻塞事件循環
+                written = 0
+                async with aiofiles.open(file_path, "wb") as buffer:
+                    await asyncio.to_thread(_preallocate, buffer.fileno(), getattr(file, "size", None))
+                    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                        await buffer.write(chunk)
+                        written += len(chunk)
+                    # 預分配的長度可能與實際寫入不同，截斷到實際大小
+                    await buffer.truncate()
                 
                 # 驗證文件是否成功保存
-                saved_size = os.path.getsize(file_path)
-                if saved_size == 0:
+                if written == 0:
                     logger.warning(f"⚠️ 文件 {file.filename} 保存後大小為 0 bytes")
                 else:
-                    logger.info(f"✅ 文件 {file.filename} 成功保存，大小: {saved_size} bytes")
+                    logger.info(f"✅ 文件 {file.filename} 成功保存，大小: {written} bytes")
                 
-                uploaded_files.append(file_path)
+                uploaded_files.append(UploadedFile(path=file_path, size=written, name=file.filename))
         
         # 生成任務 ID
-        task_id = f"task_{len(processing_tasks) + 1}"
+        task_id = uuid.uuid4().hex
         
         # 初始化任務狀態
-        processing_tasks[task_id] = {
-            "status": "pending",
-            "progress": 0,
-            "message": "文件上傳完成，開始處理...",
-            "results": None
-        }
+        task_state = TaskState(
+            status="pending",
+            progress=0,
+            message="文件上傳完成，開始處理...",
+            results=None
+        )
+        async with _tasks_lock:
+            processing_tasks[task_id] = task_state
         
-        # 在後台處理文件
-        background_tasks.add_task(
-            process_files_background,
-            task_id,
-            uploaded_files,
-            temp_dir
+        # 在後台處理文件，保留 Task 引用以便取消
+        task_state["_task"] = asyncio.create_task(
+            process_files_background(task_id, task_state, uploaded_files, temp_dir)
         )
+        if _redis is not None:
+            task_state["_sync"] = asyncio.create_task(_sync_task_state(task_id, task_state))
         
         return FileUploadResponse(
             success=True,
@@ -133,54 +244,244 @@ async def upload_files(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"文件上傳失敗: {str(e)}")
 
-def _classify_files_by_type(file_paths: List[str]) -> Dict[str, List[str]]:
+def _classify_files_by_type(uploaded_files: List[UploadedFile]) -> Dict[str, List[str]]:
     """根據副檔名將檔案分類為論文或實驗資料。"""
     papers: List[str] = []
     experiments: List[str] = []
     other: List[str] = []
 
-    for path in file_paths:
-        ext = os.path.splitext(path)[1].lower()
+    for uploaded in uploaded_files:
+        ext = os.path.splitext(uploaded.path)[1].lower()
         if ext in [".pdf", ".docx"]:
-            papers.append(path)
+            papers.append(uploaded.path)
         elif ext in [".xlsx", ".xls"]:
-            experiments.append(path)
+            experiments.append(uploaded.path)
         else:
-            other.append(path)
+            other.append(uploaded.path)
 
     return {"type": "mixed", "papers": papers, "experiments": experiments, "others": other}
 
 
-async def process_files_background(task_id: str, file_paths: List[str], temp_dir: str):
+def _hash_files(file_paths: List[str]) -> Dict[str, str]:
+    """計算每個文件的 SHA-256，回傳 {路徑: 雜湊}；無法讀取的文件略過"""
+    hashes: Dict[str, str] = {}
+    for path in file_paths:
+        try:
+            hashes[path] = generate_file_hash(path, "sha256")
+        except Exception as e:
+            logger.warning(f"⚠️ 無法計算文件雜湊 {os.path.basename(path)}: {e}")
+    return hashes
+
+
+def _record_paper_hashes(metadata_list: List[Dict[str, Any]], paper_hashes: Dict[str, str]) -> None:
+    """記錄本次成功嵌入的論文雜湊，供之後的上傳去重（一次交易批次寫入）"""
+    rows = []
+    for metadata in metadata_list:
+        content_hash = paper_hashes.get(metadata.get("original_path"))
+        if content_hash and metadata.get("tracing_number"):
+            rows.append((content_hash, metadata["tracing_number"], metadata.get("new_filename", "")))
+    record_hashes(rows)
+
+
+def _remove_temp_dir(temp_dir: str) -> None:
+    """刪除臨時目錄，個別文件刪除失敗時記錄日誌並繼續"""
+    def _on_error(func, path, exc_info):
+        logger.warning(f"⚠️ 無法刪除 {path}: {exc_info[1]}")
+
+    shutil.rmtree(temp_dir, onerror=_on_error)
+
+
+# 背景清理任務的引用，避免尚未完成的 Task 被垃圾回收
+_cleanup_tasks: set = set()
+
+def _schedule_temp_cleanup(temp_dir: str) -> None:
+    """在背景線程刪除臨時目錄，不阻塞事件循環，也不佔用任務並行名額"""
+    def _on_done(task: asyncio.Task) -> None:
+        _cleanup_tasks.discard(task)
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            logger.error(f"⚠️ 清理臨時目錄失敗: {temp_dir}: {task.exception()}")
+        else:
+            logger.info(f"🧹 清理臨時目錄: {temp_dir}")
+
+    task = asyncio.create_task(asyncio.to_thread(_remove_temp_dir, temp_dir))
+    _cleanup_tasks.add(task)
+    task.add_done_callback(_on_done)
+
+
+def _task_key(task_id: str) -> str:
+    return f"task:{task_id}"
+
+
+def _serialize_task_state(task_state: Dict[str, Any]) -> Dict[str, str]:
+    """將任務狀態轉為 Redis hash 欄位（results 以 JSON 字串保存）"""
+    return {
+        "status": task_state["status"],
+        "progress": str(task_state["progress"]),
+        "message": task_state["message"],
+        "results": orjson.dumps(task_state["results"], default=str).decode()
+    }
+
+
+async def _sync_task_state(task_id: str, task_state: Dict[str, Any]) -> None:
+    """
+    定期把本進程的任務狀態寫入 Redis，直到任務結束；
+    同時接收其他 worker 透過 Redis 發出的取消請求
+    """
+    key = _task_key(task_id)
+    last_snapshot = None
+    while True:
+        snapshot = _serialize_task_state(task_state)
+        try:
+            if snapshot != last_snapshot:
+                async with _redis.pipeline(transaction=True) as pipe:
+                    pipe.hset(key, mapping=snapshot)
+                    pipe.expire(key, TASK_STORE_TTL)
+                    await pipe.execute()
+                last_snapshot = snapshot
+            if snapshot["status"] in _TERMINAL_STATUSES:
+                return
+            if await _redis.hget(key, "cancel_requested"):
+                _cancel_local_task(task_state)
+        except Exception as e:
+            logger.warning(f"⚠️ 同步任務狀態到 Redis 失敗 {task_id}: {e}")
+        await asyncio.sleep(TASK_STATE_SYNC_INTERVAL)
+
+
+async def _get_task_state(task_id: str) -> Dict[str, Any]:
+    """取得任務狀態（本進程優先，其次 Redis），不存在（或已過期）時回傳 404"""
+    async with _tasks_lock:
+        task_state = processing_tasks.get(task_id)
+    if task_state is None and _redis is not None:
+        data = await _redis.hgetall(_task_key(task_id))
+        # 缺少 status 的 hash 不是完整的任務狀態，視為不存在
+        if data and "status" in data:
+            task_state = {
+                "status": data["status"],
+                "progress": int(data["progress"]),
+                "message": data["message"],
+                "results": orjson.loads(data["results"]),
+                "_remote": True
+            }
+    if task_state is None:
+        raise HTTPException(status_code=404, detail="任務不存在")
+    return task_state
+
+
+def _cancel_local_task(task_state: Dict[str, Any]) -> None:
+    """
+    標記本進程的任務為已取消
+    
+    處理中的任務不取消協程：執行器線程無法被中斷，改由進度回調中的 check_cancelled 停止，
+    協程等待線程結束後才釋放並行名額並清理臨時目錄；仍在排隊的任務沒有線程在運行，直接取消
+    """
+    task_state["status"] = "cancelled"
+    task_state["message"] = "任務已取消"
+    
+    task = task_state.get("_task")
+    if task and not task.done() and task_state.get("_queued"):
+        task.cancel()
+
+
+async def process_files_background(task_id: str, task_state: Dict[str, Any], uploaded_files: List[UploadedFile], temp_dir: str):
+    """
+    後台處理文件（受 UPLOAD_MAX_PARALLEL 限制並發數量）
+    
+    Args:
+        task_id: 任務 ID
+        task_state: 任務狀態字典（即使已從 processing_tasks 過期也可安全更新）
+        uploaded_files: 已保存的上傳文件
+        temp_dir: 臨時目錄
+    """
+    if _job_sem.locked():
+        task_state["status"] = "queued"
+        task_state["message"] = "等待其他任務完成..."
+        logger.info(f"⏳ 任務 {task_id} 排隊中，最大並行數: {UPLOAD_MAX_PARALLEL}")
+    
+    task_state["_queued"] = True
+    try:
+        await _job_sem.acquire()
+    except asyncio.CancelledError:
+        logger.info(f"🛑 任務 {task_id} 在排隊時已取消")
+        _schedule_temp_cleanup(temp_dir)
+        return
+    finally:
+        task_state["_queued"] = False
+    
+    try:
+        if task_state["status"] == "cancelled":
+            logger.info(f"🛑 任務 {task_id} 在排隊時已取消")
+            _schedule_temp_cleanup(temp_dir)
+            return
+        await _process_files_job(task_id, task_state, uploaded_files, temp_dir)
+    finally:
+        _job_sem.release()
+
+
+async def _process_files_job(task_id: str, task_state: Dict[str, Any], uploaded_files: List[UploadedFile], temp_dir: str):
     """
     後台處理文件
     
     Args:
         task_id: 任務 ID
-        file_paths: 文件路徑列表
+        task_state: 任務狀態字典
+        uploaded_files: 已保存的上傳文件
         temp_dir: 臨時目錄
     """
     start_time = time.time()
-    logger.info(f"🚀 開始處理任務 {task_id}，共 {len(file_paths)} 個文件")
+    logger.info(f"🚀 開始處理任務 {task_id}，共 {len(uploaded_files)} 個文件")
+    file_sizes = {uploaded.path: uploaded.size for uploaded in uploaded_files}
     logger.info(f"📁 臨時目錄: {temp_dir}")
     
+    loop = asyncio.get_running_loop()
+    # 進行中的執行器任務：結束前必須等待它們完成，才能釋放並行名額並刪除它們正在讀取的臨時文件
+    running_futures: set = set()
+    
+    def run_blocking(executor: Optional[ThreadPoolExecutor], func, *args, **kwargs) -> asyncio.Future:
+        future = loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+        running_futures.add(future)
+        future.add_done_callback(running_futures.discard)
+        return future
+    
     try:
         # 更新狀態為處理中
-        processing_tasks[task_id]["status"] = "processing"
-        processing_tasks[task_id]["progress"] = 0
-        processing_tasks[task_id]["message"] = "開始處理..."
+        task_state["status"] = "processing"
+        task_state["progress"] = 0
+        task_state["message"] = "開始處理..."
         
         # 分析文件類型（依副檔名分類）
         logger.info("🔍 開始分析文件類型...")
-        file_info = _classify_files_by_type(file_paths)
+        file_info = _classify_files_by_type(uploaded_files)
         
         # 記錄文件分類結果
         for file_type, files in file_info.items():
-            if files:
+            if files and isinstance(files, list):
                 logger.info(f"📂 {file_type}: {len(files)} 個文件")
                 for f in files:
-                    file_size = os.path.getsize(f) if os.path.exists(f) else 0
-                    logger.info(f"   📄 {os.path.basename(f)} ({file_size} bytes)")
+                    logger.info(f"   📄 {os.path.basename(f)} ({file_sizes.get(f, 0)} bytes)")
+        
+        # 以內容雜湊跳過先前已嵌入過的論文（在元數據提取前完成）
+        deduplicated_papers: List[Dict[str, Any]] = []
+        paper_hashes: Dict[str, str] = {}
+        if file_info["papers"]:
+            paper_hashes = await run_blocking(None, _hash_files, file_info["papers"])
+            seen_hashes = await run_blocking(None, lookup_hashes, paper_hashes.values())
+            if seen_hashes:
+                remaining_papers = []
+                for path in file_info["papers"]:
+                    doc_id = seen_hashes.get(paper_hashes.get(path))
+                    if doc_id:
+                        logger.info(f"♻️ 內容重複，跳過: {os.path.basename(path)} (tracing number: {doc_id})")
+                        deduplicated_papers.append({
+                            "original_filename": os.path.basename(path),
+                            "tracing_number": doc_id,
+                            "content_hash": paper_hashes[path],
+                            "deduplicated": True
+                        })
+                    else:
+                        remaining_papers.append(path)
+                file_info["papers"] = remaining_papers
         
         # 計算進度分配
         has_papers = bool(file_info.get("papers"))
@@ -206,18 +507,32 @@ async def process_files_background(task_id: str, file_paths: List[str], temp_dir
             paper_progress_range = 0
             experiment_progress_range = 0
         
-        processing_tasks[task_id]["progress"] = 10
-        processing_tasks[task_id]["message"] = "開始處理論文資料..."
+        # 在各階段邊界檢查任務是否已被取消
+        def check_cancelled():
+            if task_state["status"] == "cancelled":
+                raise TaskCancelledError(task_id)
+        
+        check_cancelled()
+        task_state["progress"] = 10
+        task_state["message"] = "開始處理論文資料..."
         
         # 定義進度回調函數
         def update_progress(message: str, progress_percent: int = None):
             if progress_percent is not None:
-                processing_tasks[task_id]["progress"] = progress_percent
-            processing_tasks[task_id]["message"] = message
-            logger.info(f"📈 進度更新: {processing_tasks[task_id]['progress']}% - {message}")
+                task_state["progress"] = progress_percent
+            task_state["message"] = message
+            logger.info(f"📈 進度更新: {task_state['progress']}% - {message}")
+        
+        def make_progress_cb(start_progress: int, progress_range: int):
+            """建立數值進度回調，同時在任務被取消時中止處理"""
+            def progress_cb(done: int, total: int):
+                check_cancelled()
+                if total:
+                    task_state["progress"] = start_progress + int(progress_range * done / total)
+            return progress_cb
         
         # 處理論文資料（提取 metadata 並嵌入向量）
-        paper_results: List[Dict[str, Any]] = []
+        paper_results: List[Dict[str, Any]] = list(deduplicated_papers)
         
         # 初始化進度變量
         current_progress = 10
@@ -249,30 +564,28 @@ async def process_files_background(task_id: str, file_paths: List[str], temp_dir
         
         def extraction_progress_callback(msg: str):
                 nonlocal extraction_progress
+                # 在提取線程中檢查取消，已取消時中止剩餘文件的提取
+                check_cancelled()
                 # 根據消息內容更新進度
-                if "提取第" in msg and "個文件元數據" in msg:
-                    try:
-                        # 匹配 "提取第 X/Y 個文件元數據：{filename}" 格式
-                        match = re.search(r'提取第 (\d+)/(\d+) 個文件元數據', msg)
-                        if match:
-                            current_file = int(match.group(1))
-                            total_files = int(match.group(2))
-                            # 計算進度：25% 到 50% 之間
-                            progress = 25 + int((current_file / total_files) * 25)
-                            extraction_progress = progress
-                            update_progress(msg, progress)
-                            logger.info(f"📈 元數據提取進度: {current_file}/{total_files} ({progress}%)")
-                        else:
-                            update_progress(msg, extraction_progress)
-                    except Exception as e:
-                        logger.warning(f"⚠️ 進度解析失敗: {e}")
-                        update_progress(msg, extraction_progress)
+                # 匹配 "提取第 X/Y 個文件元數據：{filename}" 格式
+                match = _RE_EXTRACT_PROG.search(msg)
+                if match:
+                    current_file = int(match.group(1))
+                    total_files = int(match.group(2))
+                    # 計算進度：25% 到 50% 之間
+                    progress = 25 + int((current_file / total_files) * 25)
+                    extraction_progress = progress
+                    update_progress(msg, progress)
+                    logger.info(f"📈 元數據提取進度: {current_file}/{total_files} ({progress}%)")
                 else:
                     update_progress(msg, extraction_progress)
         
         if has_papers:
-            metadata_list: List[Dict[str, Any]] = process_uploaded_files(
-                file_info["papers"], 
+            # 元數據提取以網絡請求（DOI 查詢）為主，放在預設執行器中
+            metadata_list: List[Dict[str, Any]] = await run_blocking(
+                None,
+                process_uploaded_files,
+                file_info["papers"],
                 status_callback=extraction_progress_callback
             )
             
@@ -289,6 +602,8 @@ async def process_files_background(task_id: str, file_paths: List[str], temp_dir
         else:
             metadata_list = []
         
+        check_cancelled()
+        
         # 節點3: 向量嵌入開始 (50%)
         current_progress = 50  # 進入向量嵌入階段，設置為50%
         update_progress("✅ 開始向量嵌入", current_progress)
@@ -300,61 +615,26 @@ async def process_files_background(task_id: str, file_paths: List[str], temp_dir
         logger.info("🔢 開始向量嵌入...")
         update_progress("📚 開始向量嵌入...", current_progress)
         
-        # 計算每個文件的嵌入進度
+        # 數值進度只由 progress_cb 更新（50%→90%），狀態回調僅更新訊息，避免兩個來源互相覆蓋進度
         def embedding_progress_callback(msg: str):
-            nonlocal current_progress  # 聲明使用外部變量
-            # 從消息中提取當前處理的文件索引
-            if "處理第" in msg and "個文件" in msg:
-                try:
-                    # 提取 "處理第 X/Y 個文件" 中的 X
-                    match = re.search(r'處理第 (\d+)/(\d+) 個文件', msg)
-                    if match:
-                        current_file = int(match.group(1))
-                        total_files = int(match.group(2))
-                        # 計算進度：50% 到 90% 之間
-                        progress = 50 + int((current_file / total_files) * 40)
-                        update_progress(msg, progress)
-                        logger.info(f"🔢 向量嵌入進度: {current_file}/{total_files} ({progress}%)")
-                    else:
-                        update_progress(msg, current_progress)  # 使用當前進度
-                except (ValueError, AttributeError) as parse_error:
-                    logger.warning(f"解析進度信息失敗: {parse_error}")
-                    update_progress(msg, current_progress)  # 使用當前進度
-            elif "向量嵌入批次" in msg:
-                try:
-                    # 提取 "向量嵌入批次 X/Y" 中的進度信息
-                    match = re.search(r'向量嵌入批次 (\d+)/(\d+)', msg)
-                    if match:
-                        current_batch = int(match.group(1))
-                        total_batches = int(match.group(2))
-                        # 向量嵌入階段：90% 到 95% 之間
-                        progress = 90 + int((current_batch / total_batches) * 5)
-                        update_progress(msg, progress)
-                        logger.info(f"🔢 向量嵌入批次: {current_batch}/{total_batches} ({progress}%)")
-                    else:
-                        update_progress(msg, current_progress)  # 使用當前進度
-                except (ValueError, AttributeError) as parse_error:
-                    logger.warning(f"解析批次進度信息失敗: {parse_error}")
-                    update_progress(msg, current_progress)  # 使用當前進度
-            elif "開始向量嵌入" in msg:
-                # 向量嵌入開始，設置進度為50%
-                update_progress(msg, 50)
-                logger.info("🔢 向量嵌入開始")
-            elif "向量嵌入完成" in msg:
-                # 向量嵌入完成，設置進度為95%
-                update_progress(msg, 95)
-                embedding_end_time = time.time()
-                logger.info(f"✅ 向量嵌入完成，耗時: {embedding_end_time - embedding_start_time:.2f}秒")
+            if "向量嵌入完成" in msg:
+                logger.info(f"✅ 向量嵌入完成，耗時: {time.time() - embedding_start_time:.2f}秒")
             else:
-                update_progress(msg, current_progress)  # 使用當前進度
                 logger.info(f"📝 嵌入進度: {msg}")
+            task_state["message"] = msg
         
         logger.info(f"🔢 開始對 {len(metadata_list)} 個文件進行向量嵌入...")
-        embed_documents_from_metadata(
-            metadata_list, 
-            status_callback=embedding_progress_callback
+        await run_blocking(
+            embed_pool,
+            embed_documents_from_metadata,
+            metadata_list,
+            status_callback=embedding_progress_callback,
+            progress_cb=make_progress_cb(50, 40)
         )
         
+        if metadata_list and paper_hashes:
+            await run_blocking(None, _record_paper_hashes, metadata_list, paper_hashes)
+        
         paper_end_time = time.time()
         logger.info(f"✅ 論文處理完成，總耗時: {paper_end_time - paper_start_time:.2f}秒")
         
@@ -366,65 +646,93 @@ async def process_files_background(task_id: str, file_paths: List[str], temp_dir
             
             # 設置實驗處理的起始進度
             experiment_start_progress = 50  # 實驗處理從50%開始
-            processing_tasks[task_id]["progress"] = experiment_start_progress
-            processing_tasks[task_id]["message"] = "處理實驗資料..."
+            task_state["progress"] = experiment_start_progress
+            task_state["message"] = "處理實驗資料..."
             
-            for i, f in enumerate(file_info["experiments"]):
-                try:
-                    logger.info(f"🧪 處理實驗文件 {i+1}/{len(file_info['experiments'])}: {os.path.basename(f)}")
-                    processing_tasks[task_id]["message"] = f"處理實驗文件 {i+1}/{len(file_info['experiments'])}..."
-                    processing_tasks[task_id]["progress"] = experiment_start_progress + int((i / len(file_info["experiments"])) * experiment_progress_range)
-                    
-                    # 記錄文件大小
-                    file_size = os.path.getsize(f) if os.path.exists(f) else 0
-                    logger.info(f"   📊 文件大小: {file_size} bytes")
-                    
-                    # 轉換Excel為TXT
-                    logger.info(f"   📄 開始轉換Excel為TXT...")
-                    excel_start_time = time.time()
-                    df, txt_paths = export_new_experiments_to_txt(
-                        excel_path=f,
-                        output_dir=EXPERIMENT_DIR
-                    )
-                    excel_end_time = time.time()
-                    logger.info(f"   ✅ Excel轉換完成，生成 {len(txt_paths)} 個TXT文件，耗時: {excel_end_time - excel_start_time:.2f}秒")
-                    
-                    # 向量嵌入
-                    logger.info(f"   🔢 開始實驗數據向量嵌入...")
-                    embed_start_time = time.time()
-                    result = embed_experiment_txt_batch(txt_paths)
-                    embed_end_time = time.time()
-                    logger.info(f"   ✅ 實驗數據向量嵌入完成，耗時: {embed_end_time - embed_start_time:.2f}秒")
-                    
-                    experiment_results.append({
-                        "file": f,
-                        "txt_paths": txt_paths,
-                        "embedded_count": len(txt_paths)
-                    })
-                    
-                except Exception as e:
-                    logger.error(f"❌ 實驗文件處理失敗 {os.path.basename(f)}: {e}")
+            experiments = file_info["experiments"]
+            completed_count = 0
+            experiment_sem = asyncio.Semaphore(EXPERIMENT_MAX_PARALLEL)
+            # 前半段讀取 Excel，後半段合併所有文件的資料一次批量嵌入
+            read_progress_range = experiment_progress_range // 2
+            experiment_errors: Dict[str, str] = {}
+            
+            def read_experiment_file(f: str) -> List[Tuple[str, str]]:
+                # 記錄文件大小
+                logger.info(f"   📊 {os.path.basename(f)} 文件大小: {file_sizes.get(f, 0)} bytes")
+                
+                excel_start_time = time.time()
+                rows = list(iter_new_experiment_rows(f, output_dir=EXPERIMENT_DIR))
+                excel_end_time = time.time()
+                logger.info(f"   ✅ Excel讀取完成，{len(rows)} 筆新資料，耗時: {excel_end_time - excel_start_time:.2f}秒")
+                return rows
+            
+            async def read_one(i: int, f: str) -> Optional[List[Tuple[str, str]]]:
+                nonlocal completed_count
+                async with experiment_sem:
+                    check_cancelled()
+                    logger.info(f"🧪 讀取實驗文件 {i+1}/{len(experiments)}: {os.path.basename(f)}")
+                    try:
+                        rows = await run_blocking(None, read_experiment_file, f)
+                    except Exception as e:
+                        logger.error(f"❌ 實驗文件處理失敗 {os.path.basename(f)}: {e}")
+                        experiment_errors[f] = str(e)
+                        rows = None
+                # 進度在事件循環線程中更新，不需要額外加鎖
+                completed_count += 1
+                task_state["progress"] = experiment_start_progress + int((completed_count / len(experiments)) * read_progress_range)
+                task_state["message"] = f"已讀取實驗文件 {completed_count}/{len(experiments)}"
+                return rows
+            
+            rows_per_file = await asyncio.gather(
+                *(read_one(i, f) for i, f in enumerate(experiments))
+            )
+            check_cancelled()
+            
+            # 所有文件的資料合併為同一批次嵌入，減少向量庫寫入次數
+            all_rows = [row for rows in rows_per_file if rows for row in rows]
+            logger.info(f"🔢 開始實驗數據向量嵌入，共 {len(all_rows)} 筆（{len(experiments)} 個文件）")
+            task_state["message"] = f"嵌入實驗資料 {len(all_rows)} 筆..."
+            embed_start_time = time.time()
+            embedded_ids = set(await run_blocking(
+                embed_pool,
+                embed_experiment_rows,
+                all_rows,
+                progress_cb=make_progress_cb(
+                    experiment_start_progress + read_progress_range,
+                    experiment_progress_range - read_progress_range
+                )
+            ))
+            embed_end_time = time.time()
+            logger.info(f"   ✅ 實驗數據向量嵌入完成，共 {len(embedded_ids)} 筆，耗時: {embed_end_time - embed_start_time:.2f}秒")
+            
+            # 依各文件的資料將嵌入結果歸屬回文件
+            for f, rows in zip(experiments, rows_per_file):
+                if rows is None:
+                    experiment_results.append({"file": f, "error": experiment_errors[f]})
+                else:
                     experiment_results.append({
                         "file": f,
-                        "error": str(e)
+                        "embedded_count": sum(1 for exp_id, _ in rows if exp_id in embedded_ids)
                     })
             
             experiment_end_time = time.time()
             logger.info(f"✅ 實驗處理完成，總耗時: {experiment_end_time - experiment_start_time:.2f}秒")
         
+        check_cancelled()
+        
         # 節點4: 處理完成 (100%)
         # 添加短暫延遲，讓前端有機會看到95%的進度
-        time.sleep(0.5)  # 延遲0.5秒
+        await asyncio.sleep(0.5)  # 延遲0.5秒
         
         # 更新進度到98%，表示正在完成最後的統計更新
-        processing_tasks[task_id]["progress"] = 98
-        processing_tasks[task_id]["message"] = "正在完成處理..."
+        task_state["progress"] = 98
+        task_state["message"] = "正在完成處理..."
         
         # 再延遲一下，讓前端看到98%的進度
-        time.sleep(0.3)
+        await asyncio.sleep(0.3)
         
-        processing_tasks[task_id]["progress"] = 100
-        processing_tasks[task_id]["message"] = "處理完成"
+        task_state["progress"] = 100
+        task_state["message"] = "處理完成"
         
         # 更新向量統計緩存
         logger.info("📊 開始更新向量統計緩存...")
@@ -450,10 +758,10 @@ async def process_files_background(task_id: str, file_paths: List[str], temp_dir
         total_time = end_time - start_time
         logger.info(f"🎉 任務 {task_id} 處理完成，總耗時: {total_time:.2f}秒")
         
-        processing_tasks[task_id]["status"] = "completed"
+        task_state["status"] = "completed"
         # 進度已經在之前設置為100%，這裡不需要重複設置
-        processing_tasks[task_id]["message"] = "處理完成"
-        processing_tasks[task_id]["results"] = {
+        task_state["message"] = "處理完成"
+        task_state["results"] = {
             "paper_results": paper_results,
             "experiment_results": experiment_results,
             "file_info": file_info,
@@ -461,22 +769,29 @@ async def process_files_background(task_id: str, file_paths: List[str], temp_dir
             "processing_time": total_time
         }
         
+    except (TaskCancelledError, asyncio.CancelledError):
+        logger.info(f"🛑 任務 {task_id} 已取消，耗時: {time.time() - start_time:.2f}秒")
+        task_state["status"] = "cancelled"
+        task_state["message"] = "任務已取消"
     except Exception as e:
         error_time = time.time()
         total_time = error_time - start_time
         logger.error(f"❌ 任務 {task_id} 處理失敗，耗時: {total_time:.2f}秒，錯誤: {e}")
-        processing_tasks[task_id]["status"] = "failed"
-        processing_tasks[task_id]["message"] = f"處理失敗: {str(e)}"
+        task_state["status"] = "failed"
+        task_state["message"] = f"處理失敗: {str(e)}"
     finally:
-        # 清理臨時目錄
-        try:
-            shutil.rmtree(temp_dir)
-            logger.info(f"🧹 清理臨時目錄: {temp_dir}")
-        except Exception as e:
-            logger.warning(f"⚠️ 清理臨時目錄失敗: {e}")
-            pass
+        # 協程被外部取消（如服務關閉）時線程仍在運行，等待它們結束後再清理
+        if running_futures:
+            logger.info(f"⏳ 任務 {task_id} 等待 {len(running_futures)} 個進行中的處理線程結束")
+            done, _ = await asyncio.wait(set(running_futures))
+            for future in done:
+                # 取出異常，避免 "exception was never retrieved" 警告
+                if not future.cancelled():
+                    future.exception()
+        # 清理臨時目錄（背景執行，釋放並行名額後下一個任務可立即開始）
+        _schedule_temp_cleanup(temp_dir)
 
-@router.get("/upload/status/{task_id}", response_model=ProcessingStatus)
+@router.get("/upload/status/{task_id}", response_model=ProcessingStatus, response_class=ORJSONResponse)
 async def get_processing_status(task_id: str):
     """
     獲取文件處理狀態
@@ -487,10 +802,7 @@ async def get_processing_status(task_id: str):
     Returns:
         處理狀態信息
     """
-    if task_id not in processing_tasks:
-        raise HTTPException(status_code=404, detail="任務不存在")
-    
-    task = processing_tasks[task_id]
+    task = await _get_task_state(task_id)
     return ProcessingStatus(
         task_id=task_id,
         status=task["status"],
@@ -499,6 +811,67 @@ async def get_processing_status(task_id: str):
         results=task["results"]
     )
 
+# SSE 無更新時的心跳間隔，避免代理伺服器中斷閒置連線
+SSE_KEEPALIVE_INTERVAL = 15  # 秒
+
+def _sse_event(data: Dict[str, Any]) -> bytes:
+    return b"data: " + orjson.dumps(data, default=str) + b"\n\n"
+
+@router.get("/upload/stream/{task_id}")
+async def stream_processing_status(task_id: str):
+    """
+    以 Server-Sent Events 推送文件處理進度，取代輪詢 /upload/status
+    
+    Args:
+        task_id: 任務 ID
+        
+    Returns:
+        text/event-stream，每則事件為 {status, progress, message}；結束時附帶 results
+    """
+    task_state = await _get_task_state(task_id)
+    
+    async def local_events():
+        queue: asyncio.Queue = asyncio.Queue()
+        task_state.subscribers.add(queue)
+        try:
+            snapshot = task_state.snapshot()
+            yield _sse_event(snapshot)
+            while snapshot["status"] not in _TERMINAL_STATUSES:
+                try:
+                    snapshot = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                yield _sse_event(snapshot)
+            yield _sse_event({**snapshot, "results": task_state["results"]})
+        finally:
+            task_state.subscribers.discard(queue)
+    
+    async def remote_events():
+        # 任務由其他 worker 執行時，改為讀取 Redis 中同步的狀態
+        last = None
+        while True:
+            try:
+                state = await _get_task_state(task_id)
+            except HTTPException:
+                # 任務狀態已過期
+                return
+            snapshot = {key: state[key] for key in TaskState._WATCHED_KEYS}
+            if snapshot["status"] in _TERMINAL_STATUSES:
+                yield _sse_event({**snapshot, "results": state["results"]})
+                return
+            if snapshot != last:
+                yield _sse_event(snapshot)
+                last = snapshot
+            await asyncio.sleep(TASK_STATE_SYNC_INTERVAL)
+    
+    events = local_events() if isinstance(task_state, TaskState) else remote_events()
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/upload/download/{task_id}")
 async def download_processed_files(task_id: str):
     """
@@ -510,10 +883,7 @@ async def download_processed_files(task_id: str):
     Returns:
         處理後的文件
     """
-    if task_id not in processing_tasks:
-        raise HTTPException(status_code=404, detail="任務不存在")
-    
-    task = processing_tasks[task_id]
+    task = await _get_task_state(task_id)
     if task["status"] != "completed":
         raise HTTPException(status_code=400, detail="任務尚未完成")
     
@@ -531,11 +901,13 @@ async def cancel_processing(task_id: str):
     Returns:
         取消結果
     """
-    if task_id not in processing_tasks:
-        raise HTTPException(status_code=404, detail="任務不存在")
-    
-    processing_tasks[task_id]["status"] = "cancelled"
-    processing_tasks[task_id]["message"] = "任務已取消"
+    task_state = await _get_task_state(task_id)
+    if task_state.get("_remote"):
+        # 任務由其他 worker 執行，透過 Redis 通知其取消；讀取後任務已過期時回傳 404
+        if not await _redis_request_cancel(keys=[_task_key(task_id)]):
+            raise HTTPException(status_code=404, detail="任務不存在")
+    else:
+        _cancel_local_task(task_state)
     
     return {"message": "任務已取消", "task_id": task_id}
 
@@ -591,6 +963,24 @@ async def refresh_vector_stats():
             total_vectors=0
         )
 
+# 文檔下載的項目根目錄與允許目錄（模組載入時計算一次）
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+_PAPERS_DIR = os.path.join(_PROJECT_ROOT, "experiment_data", "papers")
+# 結尾加上分隔符，避免 papers_xxx 之類的同前綴目錄通過檢查
+_ALLOWED_DOWNLOAD_DIRS = tuple(
+    os.path.join(d, "") for d in (_PAPERS_DIR, os.path.join(_PROJECT_ROOT, "uploads"))
+)
+
+# 設置MIME類型映射
+_DOCUMENT_MIME_TYPES = {
+    '.pdf': 'application/pdf',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    '.doc': 'application/msword',
+    '.txt': 'text/plain',
+    '.html': 'text/html',
+    '.htm': 'text/html'
+}
+
 @router.get("/documents/{filename:path}")
 async def download_document(filename: str):
     """
@@ -603,53 +993,26 @@ async def download_document(filename: str):
         文件內容
     """
     try:
-        import os
-        # 獲取項目根目錄（從backend目錄向上兩級到項目根目錄）
-        current_file_dir = os.path.dirname(__file__)  # backend/api/routes/
-        backend_dir = os.path.dirname(os.path.dirname(current_file_dir))  # backend/
-        project_root = os.path.dirname(backend_dir)  # 項目根目錄
-        print(f"🔍 DEBUG: current_file_dir = {current_file_dir}")
-        print(f"🔍 DEBUG: backend_dir = {backend_dir}")
-        print(f"🔍 DEBUG: project_root = {project_root}")
-        print(f"🔍 DEBUG: filename = {filename}")
-        
         # 檢查是否為直接文件名（不包含路徑）
         if not os.path.dirname(filename):
             # 如果是直接文件名，則假設在papers目錄中
-            file_path = os.path.join(project_root, "experiment_data", "papers", filename)
+            file_path = os.path.join(_PAPERS_DIR, filename)
         else:
             # 如果包含路徑，則使用完整路徑
-            file_path = os.path.join(project_root, filename)
+            file_path = os.path.join(_PROJECT_ROOT, filename)
         
         # 安全檢查：確保文件路徑在允許的目錄內
-        allowed_dirs = [
-            os.path.join(project_root, "experiment_data", "papers"),
-            os.path.join(project_root, "uploads")
-        ]
-        
         file_path_abs = os.path.abspath(file_path)
-        is_allowed = any(file_path_abs.startswith(allowed_dir) for allowed_dir in allowed_dirs)
-        
-        if not is_allowed:
-            print(f"❌ 訪問被拒絕: {file_path_abs}")
-            print(f"❌ 允許的目錄: {allowed_dirs}")
+        if not file_path_abs.startswith(_ALLOWED_DOWNLOAD_DIRS):
+            logger.warning(f"❌ 訪問被拒絕: {file_path_abs}")
             raise HTTPException(status_code=403, detail="訪問被拒絕")
         
-        if not os.path.exists(file_path):
-            print(f"❌ 文件不存在: {file_path}")
+        if not os.path.isfile(file_path_abs):
+            logger.warning(f"❌ 文件不存在: {file_path_abs}")
             raise HTTPException(status_code=404, detail="文件不存在")
         
-        print(f"✅ 提供文件: {file_path}")
-        
-        # 設置MIME類型映射
-        mime_types = {
-            '.pdf': 'application/pdf',
-            '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            '.doc': 'application/msword',
-            '.txt': 'text/plain',
-            '.html': 'text/html',
-            '.htm': 'text/html'
-        }
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"✅ 提供文件: {file_path_abs}")
         
         # 根據文件類型設置正確的MIME類型和響應頭
         # 特殊處理：檢查文件名是否以_SI.pdf結尾，也應該識別為PDF
@@ -658,7 +1021,7 @@ async def download_document(filename: str):
         else:
             file_extension = os.path.splitext(filename)[1].lower()
         
-        media_type = mime_types.get(file_extension, 'application/octet-stream')
+        media_type = _DOCUMENT_MIME_TYPES.get(file_extension, 'application/octet-stream')
         
         # 對於PDF文件，設置響應頭讓瀏覽器直接顯示而不是下載
         headers = {}
@@ -677,7 +1040,7 @@ async def download_document(filename: str):
         
         # 返回文件
         return FileResponse(
-            path=file_path,
+            path=file_path_abs,
             filename=os.path.basename(filename),
             media_type=media_type,
             headers=headers
@@ -686,5 +1049,5 @@ async def download_document(filename: str):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ 文件下載失敗: {str(e)}")
+        logger.error(f"❌ 文件下載失敗: {str(e)}")
         raise HTTPException(status_code=500, detail=f"文件下載失敗: {str(e)}") 
\ No newline at end of file
@@ -5,12 +5,15 @@
 負責根據文件副檔名將文件分類為論文、實驗資料等類型
 """
 
-import os
 import logging
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict, List, Tuple
 
 logger = logging.getLogger(__name__)
 
+# 分類結果快取的批次數量上限
+CLASSIFY_CACHE_SIZE = 256
+
 
 class FileClassifier:
     """文件分類器"""
@@ -18,6 +21,9 @@ class FileClassifier:
     # 支援的文件類型
     PAPER_EXTENSIONS = [".pdf", ".docx", ".doc"]
     EXPERIMENT_EXTENSIONS = [".xlsx", ".xls"]
+    # 分類時使用的集合，成員判斷為 O(1)
+    PAPER_EXT_SET = frozenset(PAPER_EXTENSIONS)
+    EXPERIMENT_EXT_SET = frozenset(EXPERIMENT_EXTENSIONS)
     
     @classmethod
     def classify_files(cls, file_paths: List[str]) -> Dict[str, List[str]]:
@@ -33,15 +39,17 @@ class FileClassifier:
         papers: List[str] = []
         experiments: List[str] = []
         others: List[str] = []
+        
+        # 大批次上傳時迴圈為熱點：副檔名直接對應到目標列表的 append 方法，迴圈內無分支
+        route = {
+            **dict.fromkeys(cls.PAPER_EXT_SET, papers.append),
+            **dict.fromkeys(cls.EXPERIMENT_EXT_SET, experiments.append),
+        }
+        get_append, add_other = route.get, others.append
 
         for path in file_paths:
-            ext = os.path.splitext(path)[1].lower()
-            if ext in cls.PAPER_EXTENSIONS:
-                papers.append(path)
-            elif ext in cls.EXPERIMENT_EXTENSIONS:
-                experiments.append(path)
-            else:
-                others.append(path)
+            dot, _, ext = path.rpartition(".")
+            get_append("." + ext.lower() if dot else "", add_other)(path)
 
         # 確定主要類型
         if papers and experiments:
@@ -67,6 +75,20 @@ class FileClassifier:
         
         return result
     
+    @classmethod
+    def classify_files_cached(cls, file_paths: Tuple[str, ...]) -> Dict[str, List[str]]:
+        """
+        帶快取的 classify_files，同一批文件重試時不再重新分類
+        
+        Args:
+            file_paths: 文件路徑元組（需可雜湊）
+            
+        Returns:
+            分類結果字典（每次返回新的列表，調用方可自由修改）
+        """
+        result = _classify_cached(cls, tuple(file_paths))
+        return {key: list(value) if isinstance(value, list) else value for key, value in result.items()}
+    
     @classmethod
     def get_supported_extensions(cls) -> Dict[str, List[str]]:
         """獲取支援的文件類型"""
@@ -74,3 +96,9 @@ class FileClassifier:
             "papers": cls.PAPER_EXTENSIONS,
             "experiments": cls.EXPERIMENT_EXTENSIONS
         }
+
+
+@lru_cache(maxsize=CLASSIFY_CACHE_SIZE)
+def _classify_cached(classifier: type, file_paths: Tuple[str, ...]) -> Dict[str, List[str]]:
+    """以 (分類器, 路徑元組) 為鍵快取分類結果"""
+    return classifier.classify_files(list(file_paths))
@@ -8,16 +8,19 @@
 import os
 import sys
 import time
+import asyncio
+import functools
+import uuid
 import logging
-import shutil
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Callable
 
 # 添加原項目路徑到 sys.path
 # sys.path.append(os.path.join(os.path.dirname(__file__), '../../../app'))  # 已重組，不再需要
 
 from backend.services.file_service import process_uploaded_files
-from backend.services.embedding_service import embed_documents_from_metadata, embed_experiment_txt_batch
-from backend.services.excel_service import export_new_experiments_to_txt
+from backend.services.embedding_service import embed_documents_from_metadata, embed_experiment_rows, embed_pool
+from backend.services.excel_service import iter_new_experiment_rows
 from backend.config import EXPERIMENT_DIR
 
 from .file_classifier import FileClassifier
@@ -25,6 +28,33 @@ from .progress_tracker import progress_tracker
 
 logger = logging.getLogger(__name__)
 
+# 臨時目錄在背景刪除，不佔用請求處理流程
+_cleanup_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cleanup")
+
+# 並行讀取 Excel 文件的線程池（模組級共用，任務取消時不需等待整個線程池關閉）
+EXCEL_READ_MAX_WORKERS = 8
+_excel_read_pool = ThreadPoolExecutor(max_workers=EXCEL_READ_MAX_WORKERS, thread_name_prefix="excel-read")
+
+
+def _fast_rmtree(path: str) -> None:
+    """以 os.scandir 遞迴刪除目錄（直接使用 DirEntry 的類型資訊，省去逐項 stat）"""
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                _fast_rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
+    os.rmdir(path)
+
+
+def _remove_trash_dir(trash_dir: str, temp_dir: str) -> None:
+    """背景刪除已改名的臨時目錄"""
+    try:
+        _fast_rmtree(trash_dir)
+        logger.info(f"🧹 清理臨時目錄: {temp_dir}")
+    except Exception as e:
+        logger.warning(f"⚠️ 清理臨時目錄失敗: {e}")
+
 
 class FileProcessor:
     """文件處理器"""
@@ -49,14 +79,21 @@ class FileProcessor:
             progress_tracker.update_task(task_id, status="processing", progress=0, message="開始處理...")
             
             # 分類文件
-            file_info = self.classifier.classify_files(file_paths)
+            file_info = self.classifier.classify_files_cached(tuple(file_paths))
             progress_tracker.update_task(task_id, progress=10, message="文件分類完成")
             
-            # 處理論文資料
-            paper_results = await self._process_papers(task_id, file_info)
-            
-            # 處理實驗資料
-            experiment_results = await self._process_experiments(task_id, file_info)
+            # 論文與實驗資料寫入不同的向量庫，兩條流程並行處理
+            # return_exceptions=True：一條流程失敗時仍等待另一條結束，避免其線程仍在讀取時清理臨時目錄
+            callbacks = self._create_pipeline_callbacks(task_id, ["papers", "experiments"])
+            pipeline_results = await asyncio.gather(
+                self._process_papers(task_id, file_info, callbacks["papers"]),
+                self._process_experiments(task_id, file_info, callbacks["experiments"]),
+                return_exceptions=True
+            )
+            for result in pipeline_results:
+                if isinstance(result, BaseException):
+                    raise result
+            paper_results, experiment_results = pipeline_results
             
             # 更新向量統計
             vector_stats = await self._update_vector_stats()
@@ -78,70 +115,124 @@ class FileProcessor:
             # 清理臨時目錄
             self._cleanup_temp_dir(temp_dir)
     
-    async def _process_papers(self, task_id: str, file_info: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """處理論文資料"""
+    def _create_pipeline_callbacks(self, task_id: str, pipelines: List[str],
+                                   start_progress: int = 10, end_progress: int = 90) -> Dict[str, Callable]:
+        """
+        為並行的處理流程各建立一個進度回調（流程內進度 0-100），
+        總進度取各流程平均並映射到 [start_progress, end_progress]
+        """
+        pipeline_progress = {name: 0 for name in pipelines}
+        # 總進度 = start + 各流程進度總和 * span / (100 * 流程數)，全部以整數運算
+        span = end_progress - start_progress
+        denominator = 100 * len(pipelines)
+        
+        def make_callback(name: str) -> Callable[[str, int], None]:
+            def progress_callback(message: str, progress_percent: int = None):
+                if progress_percent is None:
+                    progress_tracker.update_task(task_id, message=message)
+                    return
+                pipeline_progress[name] = int(progress_percent)
+                mapped_progress = start_progress + sum(pipeline_progress.values()) * span // denominator
+                progress_tracker.update_task(task_id, progress=mapped_progress, message=message)
+            return progress_callback
+        
+        return {name: make_callback(name) for name in pipelines}
+    
+    async def _process_papers(self, task_id: str, file_info: Dict[str, Any],
+                              progress_callback: Callable[[str, int], None]) -> List[Dict[str, Any]]:
+        """處理論文資料（同步的提取與嵌入在線程中執行，以便與實驗流程並行）"""
         papers = file_info.get("papers", [])
         if not papers:
+            progress_callback("📚 沒有論文文件", 100)
             return []
         
         logger.info(f"📚 開始處理 {len(papers)} 個論文文件")
         
-        # 創建進度回調
-        progress_callback = progress_tracker.create_progress_callback(
-            task_id, start_progress=10, end_progress=50
-        )
-        
-        # 提取元數據
+        # 提取元數據（流程進度 0-50%）
         progress_callback("📄 開始元數據提取...", 0)
-        metadata_list = process_uploaded_files(papers, status_callback=progress_callback)
+        # PDF 解析為 CPU 密集，使用進程池並行提取（小批次自動串行）
+        metadata_list = await asyncio.to_thread(
+            process_uploaded_files, papers, status_callback=progress_callback, use_processes=True
+        )
         
-        # 向量嵌入
+        # 向量嵌入（流程進度 50-100%）
         progress_callback("🔢 開始向量嵌入...", 50)
-        embed_progress_callback = progress_tracker.create_progress_callback(
-            task_id, start_progress=50, end_progress=90
+        
+        def embed_progress(done: int, total: int) -> None:
+            if total:
+                progress_callback(f"🔢 向量嵌入 {done}/{total}", 50 + int(done / total * 50))
+        
+        await asyncio.get_running_loop().run_in_executor(
+            embed_pool,
+            functools.partial(
+                embed_documents_from_metadata, metadata_list,
+                status_callback=progress_callback, progress_cb=embed_progress
+            )
         )
-        embed_documents_from_metadata(metadata_list, status_callback=embed_progress_callback)
         
         logger.info(f"✅ 論文處理完成，共處理 {len(metadata_list)} 個文件")
         return metadata_list
     
-    async def _process_experiments(self, task_id: str, file_info: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """處理實驗資料"""
+    async def _process_experiments(self, task_id: str, file_info: Dict[str, Any],
+                                   progress_callback: Callable[[str, int], None]) -> List[Dict[str, Any]]:
+        """處理實驗資料（同步的讀取與嵌入在線程中執行，以便與論文流程並行）"""
         experiments = file_info.get("experiments", [])
         if not experiments:
+            progress_callback("🧪 沒有實驗文件", 100)
             return []
         
         logger.info(f"🧪 開始處理 {len(experiments)} 個實驗文件")
         
         experiment_results = []
-        progress_callback = progress_tracker.create_progress_callback(
-            task_id, start_progress=90, end_progress=98
-        )
         
-        for i, file_path in enumerate(experiments):
+        # 第一輪：以線程池並行讀取各 Excel 的新資料（流程進度 0-50%）
+        # 每個文件對應其資料列表；讀取失敗時為錯誤訊息字串
+        rows_per_file: List[Any] = [None] * len(experiments)
+        loop = asyncio.get_running_loop()
+        
+        def read_rows(index: int):
+            file_path = experiments[index]
             try:
-                progress_callback(f"處理實驗文件 {i+1}/{len(experiments)}: {os.path.basename(file_path)}")
-                
-                # 轉換 Excel 為 TXT
-                df, txt_paths = export_new_experiments_to_txt(
-                    excel_path=file_path,
-                    output_dir=EXPERIMENT_DIR
-                )
-                
-                # 向量嵌入
-                result = embed_experiment_txt_batch(txt_paths)
-                
+                return index, list(iter_new_experiment_rows(file_path, output_dir=EXPERIMENT_DIR))
+            except Exception as e:
+                logger.error(f"❌ 實驗文件處理失敗 {os.path.basename(file_path)}: {e}")
+                return index, str(e)
+        
+        futures = [loop.run_in_executor(_excel_read_pool, read_rows, i) for i in range(len(experiments))]
+        try:
+            for done_count, future in enumerate(asyncio.as_completed(futures), start=1):
+                index, rows = await future
+                rows_per_file[index] = rows
+                progress_callback(f"處理實驗文件 {done_count}/{len(experiments)}: "
+                                  f"{os.path.basename(experiments[index])}",
+                                  int(done_count / len(experiments) * 50))
+        finally:
+            # 中途取消時撤銷尚未開始的讀取
+            for future in futures:
+                future.cancel()
+        
+        # 第二輪：所有文件的資料合併後一次嵌入，批次可跨文件填滿（流程進度 50-100%）
+        all_rows = [row for rows in rows_per_file if isinstance(rows, list) for row in rows]
+        
+        def embed_progress(done: int, total: int) -> None:
+            if total:
+                progress_callback(f"嵌入實驗資料 {done}/{total}", 50 + int(done / total * 50))
+        
+        embedded_ids = set(await loop.run_in_executor(
+            embed_pool, functools.partial(embed_experiment_rows, all_rows, progress_cb=embed_progress)
+        ))
+        
+        # 將嵌入結果歸屬回各文件
+        for file_path, rows in zip(experiments, rows_per_file):
+            if isinstance(rows, str):
                 experiment_results.append({
                     "file": file_path,
-                    "txt_paths": txt_paths,
-                    "embedded_count": len(txt_paths)
+                    "error": rows
                 })
-                
-            except Exception as e:
-                logger.error(f"❌ 實驗文件處理失敗 {os.path.basename(file_path)}: {e}")
+            else:
                 experiment_results.append({
                     "file": file_path,
-                    "error": str(e)
+                    "embedded_count": sum(1 for exp_id, _ in rows if exp_id in embedded_ids)
                 })
         
         logger.info(f"✅ 實驗處理完成，共處理 {len(experiments)} 個文件")
@@ -168,13 +259,18 @@ class FileProcessor:
             return {"paper_vectors": 0, "experiment_vectors": 0, "total_vectors": 0}
     
     def _cleanup_temp_dir(self, temp_dir: str) -> None:
-        """清理臨時目錄"""
+        """清理臨時目錄：先改名為同層的 .trash 目錄使原路徑立即消失，再交由背景線程刪除"""
+        if not os.path.exists(temp_dir):
+            return
+        trash_dir = os.path.join(
+            os.path.dirname(os.path.abspath(temp_dir)), f".trash-{uuid.uuid4().hex}"
+        )
         try:
-            if os.path.exists(temp_dir):
-                shutil.rmtree(temp_dir)
-                logger.info(f"🧹 清理臨時目錄: {temp_dir}")
-        except Exception as e:
-            logger.warning(f"⚠️ 清理臨時目錄失敗: {e}")
+            os.rename(temp_dir, trash_dir)
+        except OSError:
+            # 無法改名（如跨裝置）時直接在背景刪除原目錄
+            trash_dir = temp_dir
+        _cleanup_pool.submit(_remove_trash_dir, trash_dir, temp_dir)
 
 
 # 全局文件處理器實例
@@ -7,53 +7,108 @@
 
 import time
 import logging
+import threading
+from collections import OrderedDict
 from typing import Dict, Any, Optional, Callable
 from ..models.upload_models import ProcessingStatus
 
 logger = logging.getLogger(__name__)
 
+# 鎖分片數量（需為 2 的冪），不同任務的更新互不阻塞
+TASK_LOCK_SHARDS = 16
+
+# 保留的任務上限，超出時優先淘汰最久未使用的已結束任務
+MAX_TASKS = 1024
+FINISHED_STATUSES = frozenset({"completed", "failed", "cancelled"})
+
+# 進度至少前進此百分比才以 INFO 輸出日誌，避免大批次處理時日誌洪泛
+PROGRESS_LOG_STEP = 1
+
 
 class ProgressTracker:
-    """進度追蹤器"""
+    """進度追蹤器（進度回調可能在工作線程中執行，任務狀態的修改以分片鎖保護）"""
     
-    def __init__(self):
-        self.tasks: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, max_tasks: int = MAX_TASKS):
+        self.max_tasks = max_tasks
+        self.tasks: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._locks = [threading.Lock() for _ in range(TASK_LOCK_SHARDS)]
+        # 保護 tasks 本身的插入、淘汰與排序（分片鎖只保護單個任務的內容）
+        self._order_lock = threading.Lock()
+    
+    def _lock(self, task_id: str) -> threading.Lock:
+        """取得任務所屬分片的鎖"""
+        return self._locks[hash(task_id) & (TASK_LOCK_SHARDS - 1)]
     
     def create_task(self, task_id: str) -> None:
         """創建新任務"""
-        self.tasks[task_id] = {
+        task = {
             "status": "pending",
             "progress": 0,
             "message": "任務已創建",
             "results": None,
-            "start_time": time.time()
+            "start_time": time.time(),
+            "_last_logged_progress": 0
         }
+        with self._order_lock:
+            while len(self.tasks) >= self.max_tasks:
+                self._evict_one()
+            self.tasks[task_id] = task
         logger.info(f"📋 創建任務: {task_id}")
     
+    def _evict_one(self) -> None:
+        """淘汰一個任務：優先最久未使用的已結束任務，全部仍在進行時淘汰最舊的（需持有 _order_lock）"""
+        for task_id, task in self.tasks.items():
+            if task["status"] in FINISHED_STATUSES:
+                del self.tasks[task_id]
+                return
+        task_id, _ = self.tasks.popitem(last=False)
+        logger.warning(f"⚠️ 任務數量超過上限 {self.max_tasks}，淘汰進行中的任務: {task_id}")
+    
     def update_task(self, task_id: str, status: str = None, 
                    progress: int = None, message: str = None,
                    results: Dict[str, Any] = None) -> None:
         """更新任務狀態"""
-        if task_id not in self.tasks:
-            logger.warning(f"⚠️ 任務不存在: {task_id}")
-            return
+        with self._lock(task_id):
+            task = self.tasks.get(task_id)
+            if task is None:
+                logger.warning(f"⚠️ 任務不存在: {task_id}")
+                return
             
-        task = self.tasks[task_id]
-        
-        if status is not None:
-            task["status"] = status
-        if progress is not None:
-            task["progress"] = progress
-        if message is not None:
-            task["message"] = message
-        if results is not None:
-            task["results"] = results
+            status_changed = status is not None and status != task["status"]
+            progress_changed = progress is not None and progress != task["progress"]
+            message_changed = message is not None and message != task["message"]
+            if not (status_changed or progress_changed or message_changed or results is not None):
+                return
+            
+            if status is not None:
+                task["status"] = status
+            if progress is not None:
+                task["progress"] = progress
+            if message is not None:
+                task["message"] = message
+            if results is not None:
+                task["results"] = results
             
-        logger.info(f"📈 任務 {task_id} 更新: {task['status']} - {task['progress']}% - {task['message']}")
+            # 僅在狀態變化或進度跨過門檻時以 INFO 輸出，其餘降為 DEBUG
+            should_log = status_changed or results is not None or (
+                task["progress"] - task["_last_logged_progress"] >= PROGRESS_LOG_STEP
+            )
+            if should_log:
+                task["_last_logged_progress"] = task["progress"]
+            snapshot = (task["status"], task["progress"], task["message"])
+        
+        log = logger.info if should_log else logger.debug
+        log(f"📈 任務 {task_id} 更新: {snapshot[0]} - {snapshot[1]}% - {snapshot[2]}")
     
     def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
-        """獲取任務狀態"""
-        return self.tasks.get(task_id)
+        """獲取任務狀態快照（返回副本，讀取時不受並行更新影響）"""
+        with self._order_lock:
+            task = self.tasks.get(task_id)
+            if task is None:
+                return None
+            self.tasks.move_to_end(task_id)
+        with self._lock(task_id):
+            return dict(task)
     
     def get_task_status(self, task_id: str) -> Optional[ProcessingStatus]:
         """獲取任務狀態模型"""
@@ -80,8 +135,8 @@ class ProgressTracker:
     def complete_task(self, task_id: str, results: Dict[str, Any]) -> None:
         """完成任務"""
         end_time = time.time()
-        start_time = self.tasks[task_id].get("start_time", end_time)
-        processing_time = end_time - start_time
+        task = self.get_task(task_id) or {}
+        processing_time = end_time - task.get("start_time", end_time)
         
         self.update_task(
             task_id,
@@ -94,8 +149,8 @@ class ProgressTracker:
     def fail_task(self, task_id: str, error_message: str) -> None:
         """標記任務失敗"""
         end_time = time.time()
-        start_time = self.tasks[task_id].get("start_time", end_time)
-        processing_time = end_time - start_time
+        task = self.get_task(task_id) or {}
+        processing_time = end_time - task.get("start_time", end_time)
         
         self.update_task(
             task_id,
@@ -108,10 +163,12 @@ class ProgressTracker:
                                start_progress: int = 0, 
                                end_progress: int = 100) -> Callable[[str, int], None]:
         """創建進度回調函數"""
+        span = end_progress - start_progress
+        
         def progress_callback(message: str, progress_percent: int = None):
             if progress_percent is not None:
-                # 將進度映射到指定範圍
-                mapped_progress = start_progress + int((progress_percent / 100) * (end_progress - start_progress))
+                # 將進度映射到指定範圍（整數運算）
+                mapped_progress = start_progress + int(progress_percent) * span // 100
                 self.update_task(task_id, progress=mapped_progress, message=message)
             else:
                 self.update_task(task_id, message=message)
@@ -25,6 +25,10 @@ SUPPORTED_FORMATS = {
     "text": [".txt"]
 }
 
+# 模組載入時預先展開，避免每次調用重建列表
+_SUPPORTED_EXTENSIONS = tuple(ext for format_exts in SUPPORTED_FORMATS.values() for ext in format_exts)
+_SUPPORTED_EXTENSION_SET = frozenset(_SUPPORTED_EXTENSIONS)
+
 def get_supported_extensions() -> list:
     """
     獲取所有支持的文件擴展名
@@ -32,10 +36,16 @@ def get_supported_extensions() -> list:
     Returns:
         list: 支持的文件擴展名列表
     """
-    extensions = []
-    for format_exts in SUPPORTED_FORMATS.values():
-        extensions.extend(format_exts)
-    return extensions
+    return list(_SUPPORTED_EXTENSIONS)
+
+def get_supported_extension_set() -> frozenset:
+    """
+    獲取所有支持的文件擴展名集合（供成員判斷使用）
+    
+    Returns:
+        frozenset: 支持的文件擴展名集合
+    """
+    return _SUPPORTED_EXTENSION_SET
 
 # API 配置
 API_CONFIG = {
@@ -72,6 +82,7 @@ __all__ = [
     "PARSED_CHEMICALS_DIR",
     "SUPPORTED_FORMATS",
     "get_supported_extensions",
+    "get_supported_extension_set",
     "API_CONFIG",
     "MODEL_CONFIG",
     "SYSTEM_CONFIG",
@@ -14,17 +14,64 @@ Backend Core Module
 - 處理器
 """
 
-from .llm_manager import *
-from .retrieval import *
-# 移除直接導入generation模組，避免循環依賴
-# from .generation import *
-from .schema_manager import *
-from .vector_store import *
-from .query_expander import *
-from .mode_manager import *
-from .format_converter import *
-from .processors import *
-from .prompt_builder import *
+import importlib
+
+# 各子模組在首次存取其屬性時才導入（PEP 562），避免套件導入時載入 LLM 客戶端、chromadb 等重量級依賴
+# 與原本的 star import 順序一致：名稱重複時以後導入的模組為準（如 vector_store 覆蓋 retrieval）
+_LAZY_MODULES = {
+    "llm_manager": [
+        "OPENAI_API_KEY", "LLM_PARAMS", "LLMManager", "create_llm_manager", "get_default_llm_manager",
+    ],
+    "retrieval": [
+        "load_paper_vectorstore", "load_experiment_vectorstore", "retrieve_chunks_multi_query",
+        "retrieve_chunks_single_query", "preview_chunks", "expand_query_with_llm_client",
+        "get_vectorstore_stats",
+    ],
+    # 移除直接導入generation模組，避免循環依賴（generation 的函數見檔案末尾的延遲導入）
+    "schema_manager": [
+        "get_dynamic_schema_params", "create_research_proposal_schema", "create_experimental_detail_schema",
+        "create_revision_proposal_schema", "create_revision_experimental_detail_schema", "get_schema_by_type",
+        "invalidate_schemas",
+    ],
+    "vector_store": [
+        "load_paper_vectorstore", "load_experiment_vectorstore", "search_documents", "get_vectorstore_stats",
+        "preview_chunks", "combine_search_results", "format_search_results",
+    ],
+    "query_expander": ["expand_query", "expand_query_with_fallback"],
+    "mode_manager": [
+        "AVAILABLE_MODES", "get_available_modes", "validate_mode", "get_mode_description", "get_mode_config",
+        "get_modes_by_category", "is_structured_output_mode", "requires_experiment_data", "allows_inference",
+        "get_mode_summary",
+    ],
+    "format_converter": [
+        "structured_proposal_to_text", "structured_experimental_detail_to_text",
+        "structured_revision_proposal_to_text", "structured_revision_experimental_detail_to_text",
+    ],
+    "processors": [
+        "BaseProcessor", "AdvancedInferenceProcessor", "ProposalProcessor", "InferenceProcessor",
+        "StrictProcessor", "ExperimentDetailProcessor", "InnovationProcessor", "PROCESSOR_MAP", "get_processor",
+    ],
+    "prompt_builder": [
+        "build_prompt", "build_proposal_prompt", "build_detail_experimental_plan_prompt", "build_inference_prompt",
+        "build_dual_inference_prompt", "build_iterative_proposal_prompt",
+    ],
+}
+_LAZY_MAP = {name: module for module, names in _LAZY_MODULES.items() for name in names}
+
+
+def __getattr__(name):
+    """延遲導入子模組中的公開名稱，首次存取後緩存到模組命名空間"""
+    module_name = _LAZY_MAP.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f".{module_name}", __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_MAP))
 
 __all__ = [
     # LLM 管理
@@ -0,0 +1,206 @@
+"""
+嵌入向量快取模組
+==============
+
+以 SHA-256(模型名稱 + "\\0" + 文本) 為鍵快取嵌入向量，
+重複上傳或重新嵌入相同文本塊時直接返回已計算的向量。
+記憶體中使用 LRU，並持久化到 SQLite 以便重啟後仍能命中。
+"""
+
+import os
+import sqlite3
+import hashlib
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+from contextlib import closing
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+# 記憶體 LRU 容量（筆數）
+EMBED_CACHE_CAPACITY = 10_000
+# 持久化快取路徑（以套件目錄為基準，與工作目錄無關）
+EMBED_CACHE_PATH = os.path.join(os.path.dirname(__file__), "..", "experiment_data", "embed_cache", "embeddings.db")
+# 持久化鍵的布隆過濾器：2^23 位元（1 MiB），7 個雜湊位置，約 80 萬筆時誤判率 ~1%
+BLOOM_BITS = 1 << 23
+BLOOM_HASHES = 7
+
+
+class _BloomFilter:
+    """
+    以 SHA-256 摘要為輸入的布隆過濾器
+
+    鍵本身已是均勻分佈的雜湊值，直接切出 BLOOM_HASHES 段 4 位元組作為位元位置，無需額外雜湊函數
+    """
+
+    def __init__(self, num_bits: int = BLOOM_BITS, num_hashes: int = BLOOM_HASHES):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self._bits = bytearray(num_bits // 8)
+
+    def _positions(self, key: bytes):
+        for i in range(self.num_hashes):
+            yield int.from_bytes(key[i * 4:i * 4 + 4], "little") % self.num_bits
+
+    def add(self, key: bytes) -> None:
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: bytes) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+class CachedEmbedder(Embeddings):
+    """
+    帶快取的嵌入模型包裝器
+
+    實作 LangChain Embeddings 介面，可直接作為 Chroma 的 embedding_function；
+    embed_documents 只把未命中的文本一次性交給底層模型，結果按原順序合併。
+    """
+
+    def __init__(self, inner: Embeddings, model_name: str,
+                 capacity: int = EMBED_CACHE_CAPACITY,
+                 db_path: Optional[str] = EMBED_CACHE_PATH):
+        """
+        Args:
+            inner: 實際計算向量的嵌入模型
+            model_name: 模型名稱，作為快取鍵的一部分，換模型時不會誤用舊向量
+            capacity: 記憶體 LRU 容量
+            db_path: SQLite 持久化路徑，為 None 時僅使用記憶體快取
+        """
+        self.inner = inner
+        self.model_name = model_name
+        self.capacity = capacity
+        self.db_path = db_path
+        self._memory: "OrderedDict[bytes, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # 持久化鍵的預篩：不在過濾器中的鍵必定未持久化，可略過 SQLite 查詢；首次使用時從資料庫載入
+        self._bloom: Optional[_BloomFilter] = None
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, text: str) -> bytes:
+        return hashlib.sha256((self.model_name + "\0" + text).encode("utf-8")).digest()
+
+    def _connect(self) -> sqlite3.Connection:
+        """建立連線並確保資料表存在（每次呼叫使用獨立連線，可跨線程使用）"""
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)")
+        return conn
+
+    def _remember(self, key: bytes, vector: List[float]) -> None:
+        """寫入記憶體 LRU（需持有 _lock）"""
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+
+    def _get_bloom(self) -> _BloomFilter:
+        """取得持久化鍵的布隆過濾器（首次調用時掃描資料庫建立）"""
+        if self._bloom is None:
+            bloom = _BloomFilter()
+            try:
+                with closing(self._connect()) as conn:
+                    for (key,) in conn.execute("SELECT key FROM embeddings"):
+                        bloom.add(bytes(key))
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ 建立嵌入快取過濾器失敗: {e}")
+            self._bloom = bloom
+        return self._bloom
+
+    def _load_persisted(self, keys: List[bytes]) -> Dict[bytes, List[float]]:
+        """從 SQLite 讀取向量（先以布隆過濾器排除必定未持久化的鍵）"""
+        if not self.db_path or not keys:
+            return {}
+        bloom = self._get_bloom()
+        keys = [key for key in keys if key in bloom]
+        if not keys:
+            return {}
+        found: Dict[bytes, List[float]] = {}
+        try:
+            with closing(self._connect()) as conn:
+                # SQLite 參數數量有限，分段查詢
+                for start in range(0, len(keys), 500):
+                    part = keys[start:start + 500]
+                    placeholders = ",".join("?" * len(part))
+                    rows = conn.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", part
+                    ).fetchall()
+                    for key, blob in rows:
+                        found[bytes(key)] = array("d", blob).tolist()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ 讀取嵌入快取失敗: {e}")
+        return found
+
+    def _persist(self, items: Dict[bytes, List[float]]) -> None:
+        """將新計算的向量寫入 SQLite"""
+        if not self.db_path or not items:
+            return
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, array("d", vector).tobytes()) for key, vector in items.items()]
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ 寫入嵌入快取失敗: {e}")
+            return
+        bloom = self._get_bloom()
+        for key in items:
+            bloom.add(key)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """嵌入多個文本，僅對快取未命中的文本呼叫底層模型"""
+        keys = [self._key(text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    results[i] = vector
+
+        pending = [i for i, vector in enumerate(results) if vector is None]
+        if pending:
+            persisted = self._load_persisted(list({keys[i] for i in pending}))
+            with self._lock:
+                for key, vector in persisted.items():
+                    self._remember(key, vector)
+            for i in pending:
+                results[i] = persisted.get(keys[i])
+
+        # 同一批中重複的文本只計算一次
+        miss_positions: Dict[bytes, List[int]] = {}
+        for i, vector in enumerate(results):
+            if vector is None:
+                miss_positions.setdefault(keys[i], []).append(i)
+
+        hit_count = len(texts) - sum(len(p) for p in miss_positions.values())
+        with self._lock:
+            self.hits += hit_count
+            self.misses += len(miss_positions)
+
+        if miss_positions:
+            miss_keys = list(miss_positions)
+            vectors = self.inner.embed_documents([texts[miss_positions[k][0]] for k in miss_keys])
+            computed = dict(zip(miss_keys, vectors))
+            with self._lock:
+                for key, vector in computed.items():
+                    self._remember(key, vector)
+            self._persist(computed)
+            for key, positions in miss_positions.items():
+                for i in positions:
+                    results[i] = computed[key]
+
+        logger.debug(f"🗃️ 嵌入快取 - 命中: {hit_count}, 計算: {len(miss_positions)}")
+        return results
+
+    def embed_query(self, text: str) -> List[float]:
+        """查詢向量直接計算（查詢文本重複率低，不寫入快取）"""
+        return self.inner.embed_query(text)
@@ -13,6 +13,14 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+
+def _unquote(value: str) -> str:
+    """移除成對包住整個值的引號"""
+    if value[:1] in ('"', "'") and value.endswith(value[0]):
+        return value[1:-1]
+    return value
+
+
 class EnvManager:
     """環境變量管理器"""
     
@@ -21,45 +29,41 @@ class EnvManager:
         current_file = Path(__file__)
         self.project_root = current_file.parent.parent.parent
         self.env_file = self.project_root / ".env"
+        # 解析結果快取：((st_mtime_ns, st_size), env_vars)，檔案變更時自動失效
+        self._cache: Optional[Tuple[Tuple[int, int], Dict[str, str]]] = None
         
         logger.info(f"EnvManager 初始化: {self.env_file}")
     
     def read_env_file(self) -> Dict[str, str]:
         """
-        讀取 .env 檔案內容
+        讀取 .env 檔案內容（檔案未變更時直接返回快取的解析結果）
         
         Returns:
             Dict[str, str]: 環境變量字典
         """
         env_vars = {}
         
-        if not self.env_file.exists():
+        try:
+            st = self.env_file.stat()
+        except FileNotFoundError:
+            self._cache = None
             logger.warning(f".env 檔案不存在: {self.env_file}")
             return env_vars
         
+        signature = (st.st_mtime_ns, st.st_size)
+        if self._cache is not None and self._cache[0] == signature:
+            return self._cache[1].copy()
+        
         try:
-            with open(self.env_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    # 跳過空行和註釋
-                    if not line or line.startswith('#'):
-                        continue
-                    
-                    # 解析 key=value 格式
-                    if '=' in line:
-                        key, value = line.split('=', 1)
-                        key = key.strip()
-                        value = value.strip()
-                        
-                        # 移除引號
-                        if (value.startswith('"') and value.endswith('"')) or \
-                           (value.startswith("'") and value.endswith("'")):
-                            value = value[1:-1]
-                        
-                        env_vars[key] = value
+            text = self.env_file.read_text(encoding='utf-8')
+            # 一次讀入後解析 key=value，跳過空行和註釋
+            lines = (line.strip() for line in text.splitlines())
+            pairs = (line.split('=', 1) for line in lines if line and line[0] != '#' and '=' in line)
+            env_vars = {key.strip(): _unquote(value.strip()) for key, value in pairs}
             
             logger.info(f"成功讀取 .env 檔案，包含 {len(env_vars)} 個變量")
-            return env_vars
+            self._cache = (signature, env_vars)
+            return env_vars.copy()
             
         except Exception as e:
             logger.error(f"讀取 .env 檔案失敗: {e}")
@@ -75,6 +79,7 @@ class EnvManager:
         Returns:
             bool: 是否成功寫入
         """
+        self._cache = None
         try:
             # 確保目錄存在
             self.env_file.parent.mkdir(parents=True, exist_ok=True)
@@ -102,6 +107,18 @@ class EnvManager:
             key: 變量名稱
             value: 變量值
             
+        Returns:
+            bool: 是否成功更新
+        """
+        return self.update_env_variables({key: value})
+    
+    def update_env_variables(self, updates: Dict[str, str]) -> bool:
+        """
+        批次更新環境變量（只讀寫檔案各一次）
+        
+        Args:
+            updates: 要更新的 {變量名稱: 變量值}
+            
         Returns:
             bool: 是否成功更新
         """
@@ -110,7 +127,7 @@ class EnvManager:
             env_vars = self.read_env_file()
             
             # 更新變量
-            env_vars[key] = value
+            env_vars.update(updates)
             
             # 寫回檔案
             return self.write_env_file(env_vars)
@@ -6,13 +6,87 @@
 """
 
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 from backend.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+def _dump_materials(materials: Any) -> str:
+    """以 2 空格縮排序列化材料清單（優先使用 orjson，未安裝時退回標準庫 json）"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(materials, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(materials, ensure_ascii=False, indent=2)
+
+
+_EMPTY_DATA: Dict[str, Any] = {}
+
+
+def _compile_sections(sections):
+    """模組載入時把每個模板在 "{}" 處切成 (前綴, 後綴)，渲染時直接拼接，無需每次重新解析模板"""
+    compiled = []
+    for key, template, convert in sections:
+        prefix, _, suffix = template.partition('{}')
+        compiled.append((key, prefix, suffix, convert))
+    return tuple(compiled)
+
+
+# 各轉換器的段落表：(欄位, 模板, 值轉換函數)；非空欄位依序輸出，段落之間以空行分隔
+_PROPOSAL_SECTIONS = _compile_sections((
+    ('proposal_title', 'Proposal: {}\n', None),
+    ('need', 'Need:\n\n{}\n', None),
+    ('solution', 'Solution:\n\n{}\n', None),
+    ('differentiation', 'Differentiation:\n\n{}\n', None),
+    ('benefit', 'Benefit:\n\n{}\n', None),
+    ('experimental_overview', 'Experimental overview:\n\n{}\n', None),
+    ('materials_list', '```json\n{}\n```\n', _dump_materials),
+))
+
+_EXPERIMENTAL_DETAIL_SECTIONS = _compile_sections((
+    ('synthesis_process', '## Synthesis Process\n{}\n', None),
+    ('materials_and_conditions', '## Materials and Conditions\n{}\n', None),
+    ('analytical_methods', '## Analytical Methods\n{}\n', None),
+    ('precautions', '## Precautions\n{}\n', None),
+))
+
+_REVISION_PROPOSAL_SECTIONS = _compile_sections((
+    ('revision_explanation', 'Revision Explanation:\n{}\n', None),
+    ('proposal_title', 'Proposal: {}\n', None),
+    ('need', 'Need:\n\n{}\n', None),
+    ('solution', 'Solution:\n\n{}\n', None),
+    ('differentiation', 'Differentiation:\n\n{}\n', None),
+    ('benefit', 'Benefit:\n\n{}\n', None),
+    ('experimental_overview', 'Experimental Overview:\n\n{}\n', None),
+    ('materials_list', '```json\n{}\n```\n', _dump_materials),
+))
+
+_REVISION_EXPERIMENTAL_DETAIL_SECTIONS = _compile_sections((
+    ('revision_explanation', 'Revision Explanation:\n{}\n', None),
+    ('synthesis_process', 'SYNTHESIS PROCESS:\n{}\n', None),
+    ('materials_and_conditions', 'MATERIALS AND CONDITIONS:\n{}\n', None),
+    ('analytical_methods', 'ANALYTICAL METHODS:\n{}\n', None),
+    ('precautions', 'PRECAUTIONS:\n{}\n', None),
+))
+
+
+def _render(data: Optional[Dict[str, Any]], sections) -> str:
+    """依段落表輸出非空欄位（data 為空或 None 時所有段落都被略過，返回空字串）"""
+    get = (data or _EMPTY_DATA).get
+    # 以列表推導式交給 join：join 本身會先把生成器轉成列表，直接傳列表可省去這一步
+    return "\n".join([
+        f"{prefix}{convert(value) if convert else value}{suffix}"
+        for key, prefix, suffix, convert in sections
+        if (value := get(key))
+    ])
+
+
 def structured_proposal_to_text(proposal_data: Dict[str, Any]) -> str:
     """
     將結構化提案轉換為傳統文本格式
@@ -23,46 +97,7 @@ def structured_proposal_to_text(proposal_data: Dict[str, Any]) -> str:
     Returns:
         str: 格式化的文本提案
     """
-    if not proposal_data:
-        return ""
-    
-    text_parts = []
-    
-    # 標題
-    if proposal_data.get('proposal_title'):
-        text_parts.append(f"Proposal: {proposal_data['proposal_title']}\n")
-    
-    # Need
-    if proposal_data.get('need'):
-        text_parts.append("Need:\n")
-        text_parts.append(f"{proposal_data['need']}\n")
-    
-    # Solution
-    if proposal_data.get('solution'):
-        text_parts.append("Solution:\n")
-        text_parts.append(f"{proposal_data['solution']}\n")
-    
-    # Differentiation
-    if proposal_data.get('differentiation'):
-        text_parts.append("Differentiation:\n")
-        text_parts.append(f"{proposal_data['differentiation']}\n")
-    
-    # Benefit
-    if proposal_data.get('benefit'):
-        text_parts.append("Benefit:\n")
-        text_parts.append(f"{proposal_data['benefit']}\n")
-    
-    # Experimental overview
-    if proposal_data.get('experimental_overview'):
-        text_parts.append("Experimental overview:\n")
-        text_parts.append(f"{proposal_data['experimental_overview']}\n")
-    
-    # Materials list
-    if proposal_data.get('materials_list'):
-        materials_json = json.dumps(proposal_data['materials_list'], ensure_ascii=False, indent=2)
-        text_parts.append(f"```json\n{materials_json}\n```\n")
-    
-    return "\n".join(text_parts)
+    return _render(proposal_data, _PROPOSAL_SECTIONS)
 
 
 def structured_experimental_detail_to_text(experimental_data: Dict[str, Any]) -> str:
@@ -75,32 +110,7 @@ def structured_experimental_detail_to_text(experimental_data: Dict[str, Any]) ->
     Returns:
         str: 格式化的文本實驗細節
     """
-    if not experimental_data:
-        return ""
-    
-    text_parts = []
-    
-    # Synthesis Process
-    if experimental_data.get('synthesis_process'):
-        text_parts.append("## Synthesis Process")
-        text_parts.append(f"{experimental_data['synthesis_process']}\n")
-    
-    # Materials and Conditions
-    if experimental_data.get('materials_and_conditions'):
-        text_parts.append("## Materials and Conditions")
-        text_parts.append(f"{experimental_data['materials_and_conditions']}\n")
-    
-    # Analytical Methods
-    if experimental_data.get('analytical_methods'):
-        text_parts.append("## Analytical Methods")
-        text_parts.append(f"{experimental_data['analytical_methods']}\n")
-    
-    # Precautions
-    if experimental_data.get('precautions'):
-        text_parts.append("## Precautions")
-        text_parts.append(f"{experimental_data['precautions']}\n")
-    
-    return "\n".join(text_parts)
+    return _render(experimental_data, _EXPERIMENTAL_DETAIL_SECTIONS)
 
 
 def structured_revision_proposal_to_text(revision_data: Dict[str, Any]) -> str:
@@ -113,51 +123,7 @@ def structured_revision_proposal_to_text(revision_data: Dict[str, Any]) -> str:
     Returns:
         str: 格式化的文本提案
     """
-    if not revision_data:
-        return ""
-    
-    text_parts = []
-    
-    # 修訂說明
-    if revision_data.get('revision_explanation'):
-        text_parts.append("Revision Explanation:")
-        text_parts.append(f"{revision_data['revision_explanation']}\n")
-    
-    # 標題
-    if revision_data.get('proposal_title'):
-        text_parts.append(f"Proposal: {revision_data['proposal_title']}\n")
-    
-    # Need
-    if revision_data.get('need'):
-        text_parts.append("Need:\n")
-        text_parts.append(f"{revision_data['need']}\n")
-    
-    # Solution
-    if revision_data.get('solution'):
-        text_parts.append("Solution:\n")
-        text_parts.append(f"{revision_data['solution']}\n")
-    
-    # Differentiation
-    if revision_data.get('differentiation'):
-        text_parts.append("Differentiation:\n")
-        text_parts.append(f"{revision_data['differentiation']}\n")
-    
-    # Benefit
-    if revision_data.get('benefit'):
-        text_parts.append("Benefit:\n")
-        text_parts.append(f"{revision_data['benefit']}\n")
-    
-    # Experimental Overview
-    if revision_data.get('experimental_overview'):
-        text_parts.append("Experimental Overview:\n")
-        text_parts.append(f"{revision_data['experimental_overview']}\n")
-    
-    # Materials list
-    if revision_data.get('materials_list'):
-        materials_json = json.dumps(revision_data['materials_list'], ensure_ascii=False, indent=2)
-        text_parts.append(f"```json\n{materials_json}\n```\n")
-    
-    return "\n".join(text_parts)
+    return _render(revision_data, _REVISION_PROPOSAL_SECTIONS)
 
 
 def structured_revision_experimental_detail_to_text(revision_data: Dict[str, Any]) -> str:
@@ -170,37 +136,7 @@ def structured_revision_experimental_detail_to_text(revision_data: Dict[str, Any
     Returns:
         str: 格式化的文本實驗細節
     """
-    if not revision_data:
-        return ""
-    
-    text_parts = []
-    
-    # 修訂說明
-    if revision_data.get('revision_explanation'):
-        text_parts.append("Revision Explanation:")
-        text_parts.append(f"{revision_data['revision_explanation']}\n")
-    
-    # Synthesis Process
-    if revision_data.get('synthesis_process'):
-        text_parts.append("SYNTHESIS PROCESS:")
-        text_parts.append(f"{revision_data['synthesis_process']}\n")
-    
-    # Materials and Conditions
-    if revision_data.get('materials_and_conditions'):
-        text_parts.append("MATERIALS AND CONDITIONS:")
-        text_parts.append(f"{revision_data['materials_and_conditions']}\n")
-    
-    # Analytical Methods
-    if revision_data.get('analytical_methods'):
-        text_parts.append("ANALYTICAL METHODS:")
-        text_parts.append(f"{revision_data['analytical_methods']}\n")
-    
-    # Precautions
-    if revision_data.get('precautions'):
-        text_parts.append("PRECAUTIONS:")
-        text_parts.append(f"{revision_data['precautions']}\n")
-    
-    return "\n".join(text_parts)
+    return _render(revision_data, _REVISION_EXPERIMENTAL_DETAIL_SECTIONS)
 
 __all__ = [
     'structured_proposal_to_text',
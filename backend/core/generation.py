@@ -8,16 +8,123 @@
 
 import time
 import json
-from typing import Dict, Any, Optional, List
+import logging
+from operator import attrgetter, methodcaller
+from typing import Dict, Any, Callable, Optional, List, Tuple
 
 from backend.utils.logger import get_logger
 from backend.utils.exceptions import LLMError, APIRequestError
 from backend.core.llm_client import get_llm_client
-from backend.core.model_config import get_current_model, get_model_params
+from backend.core.model_config import get_model_info
 
 logger = get_logger(__name__)
 
 
+# 結構化生成支援的模型名稱前綴
+_SUPPORTED_MODEL_PREFIXES = ('gpt-5',)
+
+
+def _ensure_supported_model(model: str) -> None:
+    """檢查模型是否支援結構化生成（Responses API），不支援時拋出 LLMError"""
+    if not model.startswith(_SUPPORTED_MODEL_PREFIXES):
+        raise LLMError(f"不支援的模型：{model}，只支援 GPT-5 系列")
+
+
+def _chunk_accessors(chunks: List) -> Tuple[Callable, Callable]:
+    """
+    依第一個元素判斷 chunks 的格式（同一列表內格式一致），返回 (取 metadata, 取 page_content) 的存取函數
+    
+    支援 LangChain Document 與字典格式的 chunks
+    """
+    if chunks and hasattr(chunks[0], 'metadata'):
+        return attrgetter('metadata'), attrgetter('page_content')
+    return methodcaller('get', 'metadata', {}), methodcaller('get', 'page_content', '')
+
+
+# 效能備註：此處及修訂提示詞的熱點都是字串格式化與字典存取，不要套用 numba.jit ——
+# numba 無法以 nopython 模式編譯 str/dict 操作，會退回 object 模式，比純 Python 更慢
+def _render_chunks(chunks: List, snippet_len: Optional[int] = 80) -> str:
+    """
+    將 chunks 渲染為帶編號的文獻列表文字
+    
+    Args:
+        chunks: 文檔塊列表（LangChain Document 或字典）
+        snippet_len: 內容截取長度，截取後的換行替換為空格；為 None 時保留完整內容
+        
+    Returns:
+        str: 每塊一段 "[編號] 標題 | Page 頁碼" 加內容的文字
+    """
+    get_meta, get_content = _chunk_accessors(chunks)
+    if snippet_len is None:
+        render_content = get_content
+    else:
+        def render_content(doc):
+            return get_content(doc)[:snippet_len].replace("\n", " ")
+    return "".join([
+        f"    [{i+1}] {(meta := get_meta(doc)).get('title', 'Untitled')} | "
+        f"Page {meta.get('page_number') or meta.get('page', '?')}\n{render_content(doc)}\n\n"
+        for i, doc in enumerate(chunks)
+    ])
+
+
+# 修訂提案的系統提示詞（靜態內容，模組載入時建立一次）
+_REVISION_PROPOSAL_SYSTEM_PROMPT = """
+        You are an experienced materials experiment design consultant. Please help modify parts of the research proposal based on user feedback, original proposal, and literature content.
+
+        Your task is to generate a modified research proposal based on user feedback, original proposal, and literature content. The proposal should be innovative, scientifically rigorous, and feasible.
+
+        IMPORTANT: You must respond in valid JSON format only. Do not include any text before or after the JSON object.
+
+        The JSON must have the following structure:
+        {
+            "revision_explanation": "Brief explanation of revision logic and key improvements based on user feedback",
+            "proposal_title": "Title of the research proposal",
+            "need": "Research need and current limitations",
+            "solution": "Proposed design and development strategies",
+            "differentiation": "Comparison with existing technologies",
+            "benefit": "Expected improvements and benefits",
+            "experimental_overview": "Experimental approach and methodology",
+            "materials_list": ["material1", "material2", "material3"]
+        }
+
+        Key requirements:
+        1. Prioritize the areas that the user wants to modify and look for possible improvement directions from the literature
+        2. Except for the areas that the user is dissatisfied with, other parts should maintain the original proposal content without changes
+        3. Maintain scientific rigor, clarity, and avoid vague descriptions
+        4. Use only the provided literature labels ([1], [2], etc.) for citations, and do not fabricate sources
+        5. Ensure every claim is supported by a cited source or reasonable extension from the literature
+        6. For materials_list, include ONLY IUPAC chemical names without any descriptions, notes, or parenthetical explanations. Each item must be a single chemical name only.
+        7. The revision_explanation should briefly explain the logic of changes and key improvements based on user feedback
+        """
+
+# 修訂實驗細節的系統提示詞
+_REVISION_EXPERIMENTAL_DETAIL_SYSTEM_PROMPT = """
+        You are an experienced materials experiment design consultant. Please help modify parts of the experimental details based on user feedback, original proposal, original experimental details, and literature content.
+
+        Your task is to generate modified experimental details based on user feedback, original proposal, original experimental details, and literature content. The experimental details should be scientifically rigorous, feasible, and address the user's specific modification requests.
+
+        IMPORTANT: You must respond in valid JSON format only. Do not include any text before or after the JSON object.
+
+        The JSON must have the following structure:
+        {
+            "revision_explanation": "Brief explanation of revision logic and key improvements based on user feedback",
+            "synthesis_process": "Detailed synthesis steps, conditions, durations, etc. with modifications",
+            "materials_and_conditions": "Materials used, concentrations, temperatures, pressures, and other reaction conditions with modifications",
+            "analytical_methods": "Characterization techniques such as XRD, SEM, NMR, etc. with modifications",
+            "precautions": "Experimental notes and safety precautions with modifications"
+        }
+
+        Key requirements:
+        1. Prioritize the areas that the user wants to modify and look for possible improvement directions from the literature
+        2. Except for the areas that the user is dissatisfied with, other parts should maintain the original experimental detail content without changes
+        3. Maintain scientific rigor, clarity, and avoid vague descriptions
+        4. Use only the provided literature labels ([1], [2], etc.) for citations, and do not fabricate sources
+        5. Ensure every claim is supported by a cited source or reasonable extension from the literature
+        6. The revision_explanation should briefly explain the logic of changes and key improvements based on user feedback
+        7. Focus on the specific experimental step or section that the user wants to modify
+        """
+
+
 def call_llm(prompt: str, **kwargs) -> str:
     """
     調用 LLM 生成文本
@@ -28,18 +135,12 @@ def call_llm(prompt: str, **kwargs) -> str:
         
     返回：
         str: 生成的文本
-    """
-    try:
-        current_model = get_current_model()
-        llm_params = get_model_params()
         
-        # 使用新的 LLM 客戶端
-        llm_client = get_llm_client()
-        return llm_client.call_llm(prompt, current_model, llm_params, **kwargs)
-            
-    except Exception as e:
-        logger.error(f"LLM 調用失敗：{e}")
-        raise LLMError(f"LLM 調用失敗：{str(e)}")
+    異常：
+        LLMError: 由 LLM 客戶端記錄並拋出，此處不再重複包裝
+    """
+    current_model, llm_params = get_model_info()
+    return get_llm_client().call_llm(prompt, current_model, llm_params, **kwargs)
 
 
 # 舊的實現函數已被新的 LLM 客戶端替代
@@ -57,24 +158,12 @@ def call_structured_llm(prompt: str, schema: Dict[str, Any], **kwargs) -> Dict[s
         
     返回：
         Dict[str, Any]: 結構化數據
-    """
-    try:
-        current_model = get_current_model()
-        llm_params = get_model_params()
-        
-        logger.info(f"調用結構化 LLM，模型：{current_model}")
         
-        # 只支援 GPT-5 系列
-        if not current_model.startswith('gpt-5'):
-            raise LLMError(f"不支援的模型：{current_model}，只支援 GPT-5 系列")
-        
-        # 使用新的 LLM 客戶端
-        llm_client = get_llm_client()
-        return llm_client.call_structured_llm(prompt, schema, current_model, llm_params, **kwargs)
-            
-    except Exception as e:
-        logger.error(f"結構化 LLM 調用失敗：{e}")
-        raise LLMError(f"結構化 LLM 調用失敗：{str(e)}")
+    異常：
+        LLMError: 由 LLM 客戶端記錄並拋出（含模型不支援的情況），此處不再重複包裝
+    """
+    current_model, llm_params = get_model_info()
+    return get_llm_client().call_structured_llm(prompt, schema, current_model, llm_params, **kwargs)
 
 
 # 舊的 _call_gpt5_structured_api 函數已被新的 LLM 客戶端替代
@@ -100,22 +189,20 @@ def call_llm_structured_proposal(system_prompt: str, user_prompt: str) -> Dict[s
     Returns:
         Dict[str, Any]: 符合RESEARCH_PROPOSAL_SCHEMA的結構化提案
     """
-    logger.info(f"調用結構化LLM，系統提示詞長度：{len(system_prompt)} 字符")
-    logger.info(f"用戶提示詞長度：{len(user_prompt)} 字符")
+    logger.info(f"調用結構化LLM，系統提示詞長度：{len(system_prompt)} 字符，用戶提示詞長度：{len(user_prompt)} 字符")
     
     try:
-        current_model = get_current_model()
-        llm_params = get_model_params()
+        current_model, llm_params = get_model_info()
         logger.info(f"使用模型：{current_model}")
-        logger.debug(f"模型參數：{llm_params}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"模型參數：{dict(llm_params)}")
     except Exception as e:
         logger.error(f"無法獲取模型信息：{e}")
         raise LLMError(f"無法獲取模型信息：{str(e)}")
     
     try:
         # 只支援 GPT-5 系列使用 Responses API
-        if not current_model.startswith('gpt-5'):
-            raise LLMError(f"不支援的模型：{current_model}，只支援 GPT-5 系列")
+        _ensure_supported_model(current_model)
         
         from backend.core.schema_manager import create_research_proposal_schema
         
@@ -123,18 +210,17 @@ def call_llm_structured_proposal(system_prompt: str, user_prompt: str) -> Dict[s
         current_schema = create_research_proposal_schema()
         
         # 添加調試日誌
-        logger.info(f"🔍 [DEBUG] 獲取到的 schema: {current_schema is not None}")
-        if current_schema:
-            logger.info(f"🔍 [DEBUG] Schema 類型: {current_schema.get('type', 'unknown')}")
-            logger.info(f"🔍 [DEBUG] Schema 標題: {current_schema.get('title', 'unknown')}")
-            logger.info(f"🔍 [DEBUG] Schema 必需字段: {current_schema.get('required', [])}")
-        else:
+        if not current_schema:
             logger.warning("⚠️ [DEBUG] Schema 為空，將回退到傳統文本生成")
+        elif logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"🔍 Schema 類型: {current_schema.get('type', 'unknown')}，"
+                f"標題: {current_schema.get('title', 'unknown')}，"
+                f"必需字段: {current_schema.get('required', [])}"
+            )
         
-        # 構建完整的提示詞
-        full_prompt = f"{system_prompt}\n\n{user_prompt}"
-        
-        return call_structured_llm(full_prompt, current_schema)
+        # 系統提示詞作為獨立的首條消息發送，保持請求前綴穩定
+        return call_structured_llm(user_prompt, current_schema, system_prompt=system_prompt)
         
     except Exception as e:
         logger.error(f"結構化LLM調用失敗：{e}")
@@ -152,22 +238,20 @@ def call_llm_structured_experimental_detail(chunks: List, proposal: str) -> Dict
     Returns:
         Dict[str, Any]: 符合EXPERIMENTAL_DETAIL_SCHEMA的結構化實驗細節
     """
-    logger.info(f"調用結構化實驗細節LLM，文獻片段數量：{len(chunks)}")
-    logger.info(f"提案長度：{len(proposal)} 字符")
+    logger.info(f"調用結構化實驗細節LLM，文獻片段數量：{len(chunks)}，提案長度：{len(proposal)} 字符")
     
     try:
-        current_model = get_current_model()
-        llm_params = get_model_params()
+        current_model, llm_params = get_model_info()
         logger.info(f"使用模型：{current_model}")
-        logger.debug(f"模型參數：{llm_params}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"模型參數：{dict(llm_params)}")
     except Exception as e:
         logger.error(f"無法獲取模型信息：{e}")
         raise LLMError(f"無法獲取模型信息：{str(e)}")
     
     try:
         # 只支援 GPT-5 系列使用 Responses API
-        if not current_model.startswith('gpt-5'):
-            raise LLMError(f"不支援的模型：{current_model}，只支援 GPT-5 系列")
+        _ensure_supported_model(current_model)
         
         from backend.core.schema_manager import create_experimental_detail_schema
         
@@ -188,21 +272,19 @@ def call_llm_structured_experimental_detail(chunks: List, proposal: str) -> Dict
         """
         
         # 構建用戶提示詞（包含文獻摘要）
-        context_text = ""
-        citations = []
-        for i, doc in enumerate(chunks):
-            meta = doc.metadata
-            title = meta.get("title", "Untitled")
-            filename = meta.get("filename") or meta.get("source", "Unknown")
-            page = meta.get("page_number") or meta.get("page", "?")
-            
-            context_text += f"[{i+1}] {title} | Page {page}\n{doc.page_content}\n\n"
-            citations.append({
-                "label": f"[{i+1}]",
-                "title": title,
-                "source": filename,
-                "page": page
-            })
+        citations = [
+            {
+                "label": f"[{i}]",
+                "title": meta.get("title", "Untitled"),
+                "source": meta.get("filename") or meta.get("source", "Unknown"),
+                "page": meta.get("page_number") or meta.get("page", "?")
+            }
+            for i, meta in enumerate(map(attrgetter("metadata"), chunks), 1)
+        ]
+        context_text = "".join([
+            f"{citation['label']} {citation['title']} | Page {citation['page']}\n{doc.page_content}\n\n"
+            for citation, doc in zip(citations, chunks)
+        ])
         
         user_prompt = f"""
         Based on the following literature information, generate detailed experimental procedures:
@@ -250,24 +332,23 @@ def call_llm_structured_revision_proposal(question: str, new_chunks: List, old_c
     Returns:
         Dict[str, Any]: 符合REVISION_PROPOSAL_SCHEMA的結構化修訂提案
     """
-    logger.info(f"調用結構化修訂提案LLM，用戶反饋長度：{len(question)}")
-    logger.info(f"新文檔塊數量：{len(new_chunks)}")
-    logger.info(f"原文檔塊數量：{len(old_chunks)}")
-    logger.info(f"原始提案長度：{len(proposal)} 字符")
+    logger.info(
+        f"調用結構化修訂提案LLM，用戶反饋長度：{len(question)}，新文檔塊數量：{len(new_chunks)}，"
+        f"原文檔塊數量：{len(old_chunks)}，原始提案長度：{len(proposal)} 字符"
+    )
     
     try:
-        current_model = get_current_model()
-        llm_params = get_model_params()
+        current_model, llm_params = get_model_info()
         logger.info(f"使用模型：{current_model}")
-        logger.debug(f"模型參數：{llm_params}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"模型參數：{dict(llm_params)}")
     except Exception as e:
         logger.error(f"無法獲取模型信息：{e}")
         raise LLMError(f"無法獲取模型信息：{str(e)}")
     
     try:
         # 只支援 GPT-5 系列使用 Responses API
-        if not current_model.startswith('gpt-5'):
-            raise LLMError(f"不支援的模型：{current_model}，只支援 GPT-5 系列")
+        _ensure_supported_model(current_model)
         
         from backend.core.schema_manager import create_revision_proposal_schema
         
@@ -275,76 +356,18 @@ def call_llm_structured_revision_proposal(question: str, new_chunks: List, old_c
         current_schema = create_revision_proposal_schema()
         
         # 添加調試日誌
-        logger.info(f"🔍 [DEBUG] 獲取到的 schema: {current_schema is not None}")
-        if current_schema:
-            logger.info(f"🔍 [DEBUG] Schema 類型: {current_schema.get('type', 'unknown')}")
-            logger.info(f"🔍 [DEBUG] Schema 標題: {current_schema.get('title', 'unknown')}")
-            logger.info(f"🔍 [DEBUG] Schema 必需字段: {current_schema.get('required', [])}")
-        else:
+        if not current_schema:
             logger.warning("⚠️ [DEBUG] Schema 為空，將回退到傳統文本生成")
-        
-        # 構建提示詞
-        system_prompt = """
-        You are an experienced materials experiment design consultant. Please help modify parts of the research proposal based on user feedback, original proposal, and literature content.
-
-        Your task is to generate a modified research proposal based on user feedback, original proposal, and literature content. The proposal should be innovative, scientifically rigorous, and feasible.
-
-        IMPORTANT: You must respond in valid JSON format only. Do not include any text before or after the JSON object.
-
-        The JSON must have the following structure:
-        {
-            "revision_explanation": "Brief explanation of revision logic and key improvements based on user feedback",
-            "proposal_title": "Title of the research proposal",
-            "need": "Research need and current limitations",
-            "solution": "Proposed design and development strategies",
-            "differentiation": "Comparison with existing technologies",
-            "benefit": "Expected improvements and benefits",
-            "experimental_overview": "Experimental approach and methodology",
-            "materials_list": ["material1", "material2", "material3"]
-        }
-
-        Key requirements:
-        1. Prioritize the areas that the user wants to modify and look for possible improvement directions from the literature
-        2. Except for the areas that the user is dissatisfied with, other parts should maintain the original proposal content without changes
-        3. Maintain scientific rigor, clarity, and avoid vague descriptions
-        4. Use only the provided literature labels ([1], [2], etc.) for citations, and do not fabricate sources
-        5. Ensure every claim is supported by a cited source or reasonable extension from the literature
-        6. For materials_list, include ONLY IUPAC chemical names without any descriptions, notes, or parenthetical explanations. Each item must be a single chemical name only.
-        7. The revision_explanation should briefly explain the logic of changes and key improvements based on user feedback
-        """
+        elif logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"🔍 Schema 類型: {current_schema.get('type', 'unknown')}，"
+                f"標題: {current_schema.get('title', 'unknown')}，"
+                f"必需字段: {current_schema.get('required', [])}"
+            )
         
         # 構建文檔內容
-        old_text = ""
-        for i, doc in enumerate(old_chunks):
-            # 處理可能是字典格式的 chunks
-            if hasattr(doc, 'metadata'):
-                metadata = doc.metadata
-                page_content = doc.page_content
-            else:
-                metadata = doc.get('metadata', {})
-                page_content = doc.get('page_content', '')
-            
-            title = metadata.get("title", "Untitled")
-            filename = metadata.get("filename") or metadata.get("source", "Unknown")
-            page = metadata.get("page_number") or metadata.get("page", "?")
-            snippet = page_content[:80].replace("\n", " ")
-            old_text += f"    [{i+1}] {title} | Page {page}\n{snippet}\n\n"
-        
-        new_text = ""
-        for i, doc in enumerate(new_chunks):
-            # 處理可能是字典格式的 chunks
-            if hasattr(doc, 'metadata'):
-                metadata = doc.metadata
-                page_content = doc.page_content
-            else:
-                metadata = doc.get('metadata', {})
-                page_content = doc.get('page_content', '')
-            
-            title = metadata.get("title", "Untitled")
-            filename = metadata.get("filename") or metadata.get("source", "Unknown")
-            page = metadata.get("page_number") or metadata.get("page", "?")
-            snippet = page_content[:80].replace("\n", " ")
-            new_text += f"    [{i+1}] {title} | Page {page}\n{snippet}\n\n"
+        old_text = _render_chunks(old_chunks)
+        new_text = _render_chunks(new_chunks)
         
         user_prompt = f"""
         --- User Feedback ---
@@ -360,10 +383,8 @@ def call_llm_structured_revision_proposal(question: str, new_chunks: List, old_c
         {new_text}
         """
         
-        # 構建完整的提示詞
-        full_prompt = f"{system_prompt}\n\n{user_prompt}"
-        
-        return call_structured_llm(full_prompt, current_schema)
+        # 固定的系統提示詞作為首條消息，與 schema 一起構成可被 OpenAI 快取的前綴
+        return call_structured_llm(user_prompt, current_schema, system_prompt=_REVISION_PROPOSAL_SYSTEM_PROMPT)
         
     except Exception as e:
         logger.error(f"結構化修訂提案LLM調用失敗：{e}")
@@ -390,24 +411,23 @@ def call_llm_structured_revision_experimental_detail(
     Returns:
         Dict[str, Any]: 符合REVISION_EXPERIMENTAL_DETAIL_SCHEMA的結構化修訂實驗細節
     """
-    logger.info(f"調用結構化修訂實驗細節LLM，用戶反饋長度：{len(question)}")
-    logger.info(f"原文檔塊數量：{len(old_chunks)}")
-    logger.info(f"原始提案長度：{len(proposal)} 字符")
-    logger.info(f"原始實驗細節長度：{len(original_experimental_detail)} 字符")
+    logger.info(
+        f"調用結構化修訂實驗細節LLM，用戶反饋長度：{len(question)}，原文檔塊數量：{len(old_chunks)}，"
+        f"原始提案長度：{len(proposal)} 字符，原始實驗細節長度：{len(original_experimental_detail)} 字符"
+    )
     
     try:
-        current_model = get_current_model()
-        llm_params = get_model_params()
+        current_model, llm_params = get_model_info()
         logger.info(f"使用模型：{current_model}")
-        logger.debug(f"模型參數：{llm_params}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"模型參數：{dict(llm_params)}")
     except Exception as e:
         logger.error(f"無法獲取模型信息：{e}")
         raise LLMError(f"無法獲取模型信息：{str(e)}")
     
     try:
         # 只支援 GPT-5 系列使用 Responses API
-        if not current_model.startswith('gpt-5'):
-            raise LLMError(f"不支援的模型：{current_model}，只支援 GPT-5 系列")
+        _ensure_supported_model(current_model)
         
         from backend.core.schema_manager import create_revision_experimental_detail_schema
         
@@ -415,58 +435,17 @@ def call_llm_structured_revision_experimental_detail(
         current_schema = create_revision_experimental_detail_schema()
         
         # 添加調試日誌
-        logger.info(f"🔍 [DEBUG] 獲取到的 schema: {current_schema is not None}")
-        if current_schema:
-            logger.info(f"🔍 [DEBUG] Schema 類型: {current_schema.get('type', 'unknown')}")
-            logger.info(f"🔍 [DEBUG] Schema 標題: {current_schema.get('title', 'unknown')}")
-            logger.info(f"🔍 [DEBUG] Schema 必需字段: {current_schema.get('required', [])}")
-        else:
+        if not current_schema:
             logger.warning("⚠️ [DEBUG] Schema 為空，將回退到傳統文本生成")
+        elif logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"🔍 Schema 類型: {current_schema.get('type', 'unknown')}，"
+                f"標題: {current_schema.get('title', 'unknown')}，"
+                f"必需字段: {current_schema.get('required', [])}"
+            )
         
-        # 構建提示詞
-        system_prompt = """
-        You are an experienced materials experiment design consultant. Please help modify parts of the experimental details based on user feedback, original proposal, original experimental details, and literature content.
-
-        Your task is to generate modified experimental details based on user feedback, original proposal, original experimental details, and literature content. The experimental details should be scientifically rigorous, feasible, and address the user's specific modification requests.
-
-        IMPORTANT: You must respond in valid JSON format only. Do not include any text before or after the JSON object.
-
-        The JSON must have the following structure:
-        {
-            "revision_explanation": "Brief explanation of revision logic and key improvements based on user feedback",
-            "synthesis_process": "Detailed synthesis steps, conditions, durations, etc. with modifications",
-            "materials_and_conditions": "Materials used, concentrations, temperatures, pressures, and other reaction conditions with modifications",
-            "analytical_methods": "Characterization techniques such as XRD, SEM, NMR, etc. with modifications",
-            "precautions": "Experimental notes and safety precautions with modifications"
-        }
-
-        Key requirements:
-        1. Prioritize the areas that the user wants to modify and look for possible improvement directions from the literature
-        2. Except for the areas that the user is dissatisfied with, other parts should maintain the original experimental detail content without changes
-        3. Maintain scientific rigor, clarity, and avoid vague descriptions
-        4. Use only the provided literature labels ([1], [2], etc.) for citations, and do not fabricate sources
-        5. Ensure every claim is supported by a cited source or reasonable extension from the literature
-        6. The revision_explanation should briefly explain the logic of changes and key improvements based on user feedback
-        7. Focus on the specific experimental step or section that the user wants to modify
-        """
-        
-        # 構建文檔內容（只使用原始chunks）
-        old_text = ""
-        for i, doc in enumerate(old_chunks):
-            # 處理可能是字典格式的 chunks
-            if hasattr(doc, 'metadata'):
-                metadata = doc.metadata
-                page_content = doc.page_content
-            else:
-                metadata = doc.get('metadata', {})
-                page_content = doc.get('page_content', '')
-            
-            title = metadata.get("title", "Untitled")
-            filename = metadata.get("filename") or metadata.get("source", "Unknown")
-            page = metadata.get("page_number") or metadata.get("page", "?")
-            
-            # 顯示完整的文檔內容，而不是只有前80個字符
-            old_text += f"    [{i+1}] {title} | Page {page}\n{page_content}\n\n"
+        # 構建文檔內容（只使用原始chunks，顯示完整的文檔內容，而不是只有前80個字符）
+        old_text = _render_chunks(old_chunks, snippet_len=None)
         
         user_prompt = f"""
         --- User Feedback ---
@@ -482,10 +461,10 @@ def call_llm_structured_revision_experimental_detail(
         {old_text}
         """
         
-        # 構建完整的提示詞
-        full_prompt = f"{system_prompt}\n\n{user_prompt}"
-        
-        return call_structured_llm(full_prompt, current_schema)
+        # 固定的系統提示詞作為首條消息，與 schema 一起構成可被 OpenAI 快取的前綴
+        return call_structured_llm(
+            user_prompt, current_schema, system_prompt=_REVISION_EXPERIMENTAL_DETAIL_SYSTEM_PROMPT
+        )
         
     except Exception as e:
         logger.error(f"結構化修訂實驗細節LLM調用失敗：{e}")
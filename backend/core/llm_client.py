@@ -5,54 +5,190 @@ LLM 客戶端模組
 負責 LLM 調用的核心功能，避免循環導入問題
 """
 
+import os
+import re
+import copy
 import time
 import json
-from typing import Dict, Any, Optional, List
-from openai import OpenAI
+import atexit
+import logging
+import random
+import asyncio
+import threading
+from typing import Dict, Any, Optional, List, Union, Callable, Awaitable, Tuple, Iterator, Mapping
+import httpx
+from openai import OpenAI, AsyncOpenAI, APIStatusError, DefaultHttpxClient, DefaultAsyncHttpxClient
 
 from backend.utils.logger import get_logger
 from backend.utils.exceptions import LLMError, APIRequestError
+from backend.core.llm_response_cache import LLMResponseCache, make_cache_key, is_cacheable
+from backend.core.model_config import get_model_info
+
+# orjson 解析較快；其 JSONDecodeError 是 json.JSONDecodeError 的子類，現有的異常處理不變
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# HTTP/2 需要 h2 套件，未安裝時退回 HTTP/1.1
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 logger = get_logger(__name__)
 
+# 共用 HTTP 連線池：保持長連線，避免每次請求重新握手 TLS
+HTTP_MAX_CONNECTIONS = 64
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 32
+# 允許用戶在企業網路環境（自簽證書）下禁用 SSL 驗證
+SSL_VERIFY = os.getenv('DISABLE_SSL_VERIFY', 'false').lower() != 'true'
+
+_shared_http_client: Optional[httpx.Client] = None
+_shared_http_client_lock = threading.Lock()
+
+
+def _http_client_options() -> Dict[str, Any]:
+    """同步與異步 HTTP 客戶端共用的連線設定"""
+    return {
+        "http2": HTTP2_AVAILABLE,
+        "verify": SSL_VERIFY,
+        "limits": httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS
+        ),
+    }
+
+
+def _get_shared_http_client() -> httpx.Client:
+    """獲取進程內共用的同步 HTTP 客戶端（首次調用時建立，進程結束時關閉）"""
+    global _shared_http_client
+    with _shared_http_client_lock:
+        if _shared_http_client is None:
+            _shared_http_client = DefaultHttpxClient(**_http_client_options())
+            atexit.register(_shared_http_client.close)
+            logger.info(f"🔌 建立共用 HTTP 連線池（HTTP/2: {HTTP2_AVAILABLE}）")
+        return _shared_http_client
+
+# 批量調用時同時進行中的請求上限（受供應商速率限制約束）
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+
+# 重試退避：第 n 次重試等待 2^n 秒加 0~1 秒隨機抖動，上限 RETRY_MAX_DELAY 秒
+RETRY_MAX_DELAY = 60
+# 可重試的 HTTP 狀態碼（另加所有 5xx），其餘 4xx 如 schema 錯誤重試也不會成功
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429})
+
+
+def _retry_delay(retry_count: int) -> float:
+    """指數退避加隨機抖動，避免多個請求同時重試"""
+    return min(RETRY_MAX_DELAY, 2 ** retry_count + random.uniform(0, 1))
+
+
+def _is_retryable(error: Exception) -> bool:
+    """判斷 API 錯誤是否值得重試：連線/逾時、限流和服務端錯誤可重試，其他 4xx 直接失敗"""
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return True
+
+
+# 解析模型輸出的 JSON（優先使用 orjson，未安裝時退回標準庫 json）
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# 修復被截斷的 JSON 時使用：解碼器與括號掃描正則
+_JSON_DECODER = json.JSONDecoder()
+_BRACE_PATTERN = re.compile(r'[{}]')
+
+# 結構化請求參數骨架快取：(模型, id(參數), id(schema)) -> (參數, schema, 骨架)
+# model_config 在參數變更前返回同一個唯讀快照、schema_manager 返回同一個 schema 對象，穩定流量下總是命中；
+# 只快取 get_model_info() 的當前快照（其內容在參數變更前不會改變，變更後換成新對象）；
+# 其他映射（例如 model_config 的即時參數視圖）可能在同一 id 下改變內容，每次重新構建；
+# 保留參數與 schema 的引用，確保 id 不會被其他對象重用
+STRUCTURED_PARAMS_CACHE_SIZE = 32
+_structured_params_cache: Dict[Tuple[str, int, int], Tuple[Mapping[str, Any], Dict[str, Any], Dict[str, Any]]] = {}
+
+# Batch API：結束但未成功的狀態，以及輪詢間隔（秒，指數退避到上限）
+BATCH_FAILED_STATUSES = frozenset({"failed", "expired", "cancelled"})
+BATCH_POLL_INTERVAL = 30
+BATCH_MAX_POLL_INTERVAL = 600
+
 
 class LLMClient:
     """LLM 客戶端類，封裝所有 LLM 調用邏輯"""
     
     def __init__(self):
         self.client = None
+        # 異步客戶端按事件循環建立：httpx 連線池綁定建立時的事件循環，換循環後不能沿用
+        self._async_client = None
+        self._async_client_loop = None
+        self.response_cache = LLMResponseCache()
+        # 進行中的異步請求：(事件循環, 請求鍵) -> Task，相同請求並發時共用同一個 Task
+        self._inflight: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Task] = {}
         self._initialize_client()
     
     def _initialize_client(self):
         """初始化 OpenAI 客戶端"""
         try:
-            self.client = OpenAI()
-            
-            # 添加 SSL 驗證禁用選項，解決企業網路環境的證書問題
-            import httpx
-            import os
-            
-            # 檢查環境變數，允許用戶控制 SSL 驗證
-            disable_ssl_verify = os.getenv('DISABLE_SSL_VERIFY', 'false').lower() == 'true'
-            if disable_ssl_verify:
-                self.client._client = httpx.Client(verify=False)
+            self.client = OpenAI(http_client=_get_shared_http_client())
+            if not SSL_VERIFY:
                 logger.warning("⚠️ SSL 驗證已禁用（環境變數控制）")
-            else:
-                # 嘗試使用預設設置，如果失敗則自動禁用
-                try:
-                    # 測試連接
-                    test_client = httpx.Client()
-                    test_client.close()
-                except Exception as e:
-                    if "certificate verify failed" in str(e).lower():
-                        self.client._client = httpx.Client(verify=False)
-                        logger.warning("⚠️ 檢測到 SSL 證書問題，自動禁用 SSL 驗證")
-                    else:
-                        raise e
         except Exception as e:
             logger.error(f"初始化 OpenAI 客戶端失敗: {e}")
             raise
     
+    def _cache_key(self, prompt: str, model: str, llm_params: Dict[str, Any],
+                   schema: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """返回響應快取鍵；快取關閉或請求不適合快取時返回 None"""
+        if not self.response_cache.enabled or not is_cacheable(llm_params):
+            return None
+        return make_cache_key(model, prompt, llm_params, schema)
+    
+    async def _acall_coalesced(self, request_key: Optional[str], call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        執行異步請求：先查響應快取，再把同一事件循環中進行中的相同請求合併為一次調用
+        
+        參數：
+            request_key: 請求鍵；為 None 時（需要隨機性的請求）直接調用
+            call: 實際發出請求的協程工廠
+            
+        返回：
+            Any: 響應；合併到他人請求的調用方拿到深拷貝，避免共用可變結果
+        """
+        if request_key is None:
+            return await call()
+        
+        if self.response_cache.enabled:
+            cached = await asyncio.to_thread(self.response_cache.get, request_key)
+            if cached is not None:
+                return cached
+        
+        flight_key = (asyncio.get_running_loop(), request_key)
+        task = self._inflight.get(flight_key)
+        is_leader = task is None
+        if is_leader:
+            task = asyncio.ensure_future(call())
+            self._inflight[flight_key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(flight_key, None))
+        else:
+            logger.info(f"🔗 合併進行中的相同 LLM 請求: {request_key[:12]}")
+        
+        # shield：發起者被取消時不影響其他等待同一請求的調用方
+        result = await asyncio.shield(task)
+        if not is_leader:
+            return copy.deepcopy(result)
+        if self.response_cache.enabled:
+            await asyncio.to_thread(self.response_cache.set, request_key, result)
+        return result
+    
+    def _get_async_client(self) -> AsyncOpenAI:
+        """獲取當前事件循環的 AsyncOpenAI 客戶端（與同步客戶端相同的連線池與 SSL 設定）"""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            self._async_client = AsyncOpenAI(http_client=DefaultAsyncHttpxClient(**_http_client_options()))
+            self._async_client_loop = loop
+        return self._async_client
+    
     def call_llm(self, prompt: str, model: str, llm_params: Dict[str, Any], **kwargs) -> str:
         """
         調用 LLM 生成文本
@@ -70,19 +206,56 @@ class LLMClient:
             logger.info(f"調用 LLM，模型：{model}")
             logger.debug(f"提示詞長度：{len(prompt)} 字符")
             
+            cache_key = self._cache_key(prompt, model, llm_params)
+            if cache_key and (cached := self.response_cache.get(cache_key)) is not None:
+                return cached
+            
             # 根據模型類型選擇不同的調用方式
             if model.startswith('gpt-5'):
-                return self._call_gpt5_responses_api(prompt, model, llm_params, **kwargs)
+                output = self._call_gpt5_responses_api(prompt, model, llm_params, **kwargs)
             else:
-                return self._call_gpt4_chat_api(prompt, model, llm_params, **kwargs)
+                output = self._call_gpt4_chat_api(prompt, model, llm_params, **kwargs)
+            
+            if cache_key:
+                self.response_cache.set(cache_key, output)
+            return output
                 
         except Exception as e:
             logger.error(f"LLM 調用失敗：{e}")
             raise LLMError(f"LLM 調用失敗：{str(e)}")
     
-    def _call_gpt5_responses_api(self, prompt: str, model: str, llm_params: Dict[str, Any], **kwargs) -> str:
+    def call_llm_stream(self, prompt: str, model: str, llm_params: Dict[str, Any], **kwargs) -> Iterator[str]:
         """
-        調用 GPT-5 Responses API
+        以串流方式調用 LLM，逐段返回生成的文本（首個片段到達即可開始處理，無需等待完整生成）
+        
+        串流中途失敗時已輸出的片段無法撤回，因此不做重試，錯誤直接以 LLMError 拋出
+        
+        參數：
+            prompt: 提示詞
+            model: 模型名稱（只支援 GPT-5 系列）
+            llm_params: 模型參數
+            **kwargs: 額外參數
+            
+        返回：
+            Iterator[str]: 文本增量片段
+        """
+        if not model.startswith('gpt-5'):
+            raise LLMError(f"不支援的模型：{model}，只支援 GPT-5 系列")
+        
+        logger.info(f"串流調用 LLM，模型：{model}")
+        responses_params = self._build_responses_params(prompt, model, llm_params)
+        try:
+            with self.client.responses.stream(**responses_params) as stream:
+                for event in stream:
+                    if event.type == "response.output_text.delta":
+                        yield event.delta
+        except Exception as e:
+            logger.error(f"LLM 串流調用失敗：{e}")
+            raise LLMError(f"LLM 串流調用失敗：{str(e)}")
+    
+    async def acall_llm(self, prompt: str, model: str, llm_params: Dict[str, Any], **kwargs) -> str:
+        """
+        異步調用 LLM 生成文本（call_llm 的異步版本，可在事件循環中以 asyncio.gather 並發多個請求）
         
         參數：
             prompt: 提示詞
@@ -94,23 +267,119 @@ class LLMClient:
             str: 生成的文本
         """
         try:
-            # 構建 Responses API 參數
-            responses_params = {
-                "model": model,
-                "input": [{"role": "user", "content": prompt}],
-                "max_output_tokens": llm_params.get("max_output_tokens", 2000),
-                "timeout": llm_params.get("timeout", 60)
-            }
-            
-            # 添加可選參數
-            if "reasoning_effort" in llm_params:
-                responses_params["reasoning"] = {"effort": llm_params["reasoning_effort"]}
-            if "verbosity" in llm_params:
-                responses_params["text"] = {"verbosity": llm_params["verbosity"]}
-            if "temperature" in llm_params:
-                responses_params["temperature"] = llm_params["temperature"]
+            logger.info(f"異步調用 LLM，模型：{model}")
+            logger.debug(f"提示詞長度：{len(prompt)} 字符")
+            
+            request_key = make_cache_key(model, prompt, llm_params) if is_cacheable(llm_params) else None
+            # 根據模型類型選擇不同的調用方式
+            api = self._acall_gpt5_responses_api if model.startswith('gpt-5') else self._acall_gpt4_chat_api
+            return await self._acall_coalesced(request_key, lambda: api(prompt, model, llm_params, **kwargs))
+                
+        except Exception as e:
+            logger.error(f"LLM 調用失敗：{e}")
+            raise LLMError(f"LLM 調用失敗：{str(e)}")
+    
+    async def abatch_call_llm(self, prompts: List[str], model: str, llm_params: Dict[str, Any],
+                              max_concurrency: Optional[int] = None, **kwargs) -> List[Union[str, Exception]]:
+        """
+        異步批量調用 LLM，以信號量限制同時進行中的請求數
+        
+        參數：
+            prompts: 提示詞列表
+            model: 模型名稱
+            llm_params: 模型參數
+            max_concurrency: 同時請求上限，預設為 LLM_MAX_CONCURRENCY
+            **kwargs: 額外參數
             
+        返回：
+            List[Union[str, Exception]]: 與 prompts 順序對應的結果；單個請求失敗時該位置為異常對象，不影響其他請求
+        """
+        limit = max_concurrency or LLM_MAX_CONCURRENCY
+        semaphore = asyncio.Semaphore(limit)
+        in_flight = 0
+        
+        async def run_one(prompt: str) -> str:
+            nonlocal in_flight
+            async with semaphore:
+                in_flight += 1
+                logger.debug(f"批量 LLM 請求進行中：{in_flight}/{limit}")
+                try:
+                    return await self.acall_llm(prompt, model, llm_params, **kwargs)
+                finally:
+                    in_flight -= 1
+        
+        logger.info(f"🚀 批量調用 LLM，共 {len(prompts)} 個提示詞，並發上限 {limit}")
+        return await asyncio.gather(*(run_one(prompt) for prompt in prompts), return_exceptions=True)
+    
+    @staticmethod
+    def _build_responses_params(prompt: str, model: str, llm_params: Dict[str, Any]) -> Dict[str, Any]:
+        """構建文本生成的 Responses API 參數"""
+        responses_params = {
+            "model": model,
+            "input": [{"role": "user", "content": prompt}],
+            "max_output_tokens": llm_params.get("max_output_tokens", 2000),
+            "timeout": llm_params.get("timeout", 60)
+        }
+        
+        # 添加可選參數
+        if "reasoning_effort" in llm_params:
+            responses_params["reasoning"] = {"effort": llm_params["reasoning_effort"]}
+        if "verbosity" in llm_params:
+            responses_params["text"] = {"verbosity": llm_params["verbosity"]}
+        if "temperature" in llm_params:
+            responses_params["temperature"] = llm_params["temperature"]
+        
+        # 參數字典可能很大（含完整提示詞與 schema），僅在 DEBUG 啟用時格式化
+        if logger.isEnabledFor(logging.DEBUG):
             logger.debug(f"使用 Responses API，參數：{responses_params}")
+        return responses_params
+    
+    @staticmethod
+    def _join_output_parts(response) -> str:
+        """拼接 output 陣列中所有 message 的文本片段（每層只取一次屬性）"""
+        return "".join(
+            text
+            for item in getattr(response, 'output', None) or ()
+            for content in getattr(getattr(item, 'message', None), 'content', None) or ()
+            if (text := getattr(content, 'text', None))
+        )
+    
+    @staticmethod
+    def _extract_response_text(response) -> Optional[str]:
+        """從 Responses API 響應中提取文本（依序嘗試 output_text、output 陣列、content）"""
+        output_text = getattr(response, 'output_text', None)
+        if output_text:
+            logger.info(f"成功提取文本: {len(output_text)} 字符")
+            return output_text
+        
+        # 從 output 陣列中提取文本
+        output = LLMClient._join_output_parts(response)
+        if output:
+            logger.info(f"成功提取文本: {len(output)} 字符")
+            return output
+        
+        # 如果都失敗了，嘗試使用 content
+        output = getattr(response, 'content', None)
+        if output is not None:
+            logger.info(f"使用 content 提取文本: {len(output)} 字符")
+            return output
+        return None
+    
+    def _call_gpt5_responses_api(self, prompt: str, model: str, llm_params: Dict[str, Any], **kwargs) -> str:
+        """
+        調用 GPT-5 Responses API
+        
+        參數：
+            prompt: 提示詞
+            model: 模型名稱
+            llm_params: 模型參數
+            **kwargs: 額外參數
+            
+        返回：
+            str: 生成的文本
+        """
+        try:
+            responses_params = self._build_responses_params(prompt, model, llm_params)
             
             # 重試機制
             max_retries = 3
@@ -127,49 +396,95 @@ class LLMClient:
                     response = self.client.responses.create(**responses_params)
                     
                     # 檢查響應狀態
-                    if hasattr(response, 'status') and response.status == 'incomplete':
+                    if getattr(response, 'status', None) == 'incomplete':
                         logger.warning(f"檢測到 incomplete 狀態，嘗試提取部分內容")
                         
                         # 對於非結構化輸出，嘗試提取部分文本
-                        if hasattr(response, 'output_text') and response.output_text:
-                            output = response.output_text
+                        output = getattr(response, 'output_text', None)
+                        if output:
                             logger.info(f"從 incomplete 響應中提取部分文本: {len(output)} 字符")
                             return output
                         
                         # 如果無法提取部分內容，則重試
                         if retry_count < max_retries - 1:
                             logger.warning(f"無法提取部分內容，重試 {retry_count + 1}/{max_retries}")
-                            time.sleep(2)
+                            time.sleep(_retry_delay(retry_count))
                             continue
                     
                     # 提取文本內容
-                    if hasattr(response, 'output_text') and response.output_text:
-                        output = response.output_text
-                        logger.info(f"成功提取文本: {len(output)} 字符")
+                    output = self._extract_response_text(response)
+                    if output is not None:
                         return output
-                    elif hasattr(response, 'output') and response.output:
-                        # 從 output 陣列中提取文本
-                        output_parts = []
-                        for item in response.output:
-                            if hasattr(item, 'message') and hasattr(item.message, 'content'):
-                                for content in item.message.content:
-                                    if hasattr(content, 'text') and content.text:
-                                        output_parts.append(content.text)
-                        output = "".join(output_parts)
+                        
+                except Exception as e:
+                    logger.error(f"API 調用失敗 (嘗試 {retry_count + 1}/{max_retries}): {e}")
+                    if retry_count < max_retries - 1 and _is_retryable(e):
+                        time.sleep(_retry_delay(retry_count))
+                        continue
+                    raise
+            
+            raise APIRequestError("所有重試都失敗")
+            
+        except Exception as e:
+            logger.error(f"GPT-5 Responses API 調用失敗: {e}")
+            raise
+    
+    async def _acall_gpt5_responses_api(self, prompt: str, model: str, llm_params: Dict[str, Any], **kwargs) -> str:
+        """
+        異步調用 GPT-5 Responses API（重試邏輯與 _call_gpt5_responses_api 相同）
+        
+        參數：
+            prompt: 提示詞
+            model: 模型名稱
+            llm_params: 模型參數
+            **kwargs: 額外參數
+            
+        返回：
+            str: 生成的文本
+        """
+        try:
+            responses_params = self._build_responses_params(prompt, model, llm_params)
+            client = self._get_async_client()
+            
+            # 重試機制
+            max_retries = 3
+            base_tokens = llm_params.get("max_output_tokens", 2000)
+            
+            for retry_count in range(max_retries):
+                # 每次重試時增加 1000 tokens
+                current_tokens = base_tokens + (retry_count * 1000)
+                responses_params["max_output_tokens"] = current_tokens
+                
+                logger.info(f"嘗試 {retry_count + 1}/{max_retries}，使用 {current_tokens} tokens")
+                
+                try:
+                    response = await client.responses.create(**responses_params)
+                    
+                    # 檢查響應狀態
+                    if getattr(response, 'status', None) == 'incomplete':
+                        logger.warning(f"檢測到 incomplete 狀態，嘗試提取部分內容")
+                        
+                        # 對於非結構化輸出，嘗試提取部分文本
+                        output = getattr(response, 'output_text', None)
                         if output:
-                            logger.info(f"成功提取文本: {len(output)} 字符")
+                            logger.info(f"從 incomplete 響應中提取部分文本: {len(output)} 字符")
                             return output
+                        
+                        # 如果無法提取部分內容，則重試
+                        if retry_count < max_retries - 1:
+                            logger.warning(f"無法提取部分內容，重試 {retry_count + 1}/{max_retries}")
+                            await asyncio.sleep(_retry_delay(retry_count))
+                            continue
                     
-                    # 如果都失敗了，嘗試使用 content
-                    if hasattr(response, 'content'):
-                        output = response.content
-                        logger.info(f"使用 content 提取文本: {len(output)} 字符")
+                    # 提取文本內容
+                    output = self._extract_response_text(response)
+                    if output is not None:
                         return output
                         
                 except Exception as e:
                     logger.error(f"API 調用失敗 (嘗試 {retry_count + 1}/{max_retries}): {e}")
-                    if retry_count < max_retries - 1:
-                        time.sleep(2)
+                    if retry_count < max_retries - 1 and _is_retryable(e):
+                        await asyncio.sleep(_retry_delay(retry_count))
                         continue
                     raise
             
@@ -179,6 +494,29 @@ class LLMClient:
             logger.error(f"GPT-5 Responses API 調用失敗: {e}")
             raise
     
+    @staticmethod
+    def _build_chat_params(prompt: str, model: str, llm_params: Dict[str, Any]) -> Dict[str, Any]:
+        """構建 Chat Completions API 參數"""
+        chat_params = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "max_tokens": llm_params.get("max_tokens", 2000),
+            "temperature": llm_params.get("temperature", 0.7)
+        }
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"使用 Chat Completions API，參數：{chat_params}")
+        return chat_params
+    
+    @staticmethod
+    def _extract_chat_output(response) -> str:
+        """從 Chat Completions 響應中提取文本，空響應時拋出 APIRequestError"""
+        if response.choices and response.choices[0].message:
+            output = response.choices[0].message.content
+            logger.info(f"Chat API 調用成功，回應長度：{len(output)} 字符")
+            return output
+        raise APIRequestError("Chat API 返回空響應")
+    
     def _call_gpt4_chat_api(self, prompt: str, model: str, llm_params: Dict[str, Any], **kwargs) -> str:
         """
         調用 GPT-4 Chat Completions API
@@ -193,38 +531,47 @@ class LLMClient:
             str: 生成的文本
         """
         try:
-            # 構建 Chat Completions API 參數
-            chat_params = {
-                "model": model,
-                "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": llm_params.get("max_tokens", 2000),
-                "temperature": llm_params.get("temperature", 0.7)
-            }
-            
-            logger.debug(f"使用 Chat Completions API，參數：{chat_params}")
-            
+            chat_params = self._build_chat_params(prompt, model, llm_params)
             response = self.client.chat.completions.create(**chat_params)
+            return self._extract_chat_output(response)
+                
+        except Exception as e:
+            logger.error(f"Chat Completions API 調用失敗：{e}")
+            raise
+    
+    async def _acall_gpt4_chat_api(self, prompt: str, model: str, llm_params: Dict[str, Any], **kwargs) -> str:
+        """
+        異步調用 GPT-4 Chat Completions API
+        
+        參數：
+            prompt: 提示詞
+            model: 模型名稱
+            llm_params: 模型參數
+            **kwargs: 額外參數
             
-            if response.choices and response.choices[0].message:
-                output = response.choices[0].message.content
-                logger.info(f"Chat API 調用成功，回應長度：{len(output)} 字符")
-                return output
-            else:
-                raise APIRequestError("Chat API 返回空響應")
+        返回：
+            str: 生成的文本
+        """
+        try:
+            chat_params = self._build_chat_params(prompt, model, llm_params)
+            response = await self._get_async_client().chat.completions.create(**chat_params)
+            return self._extract_chat_output(response)
                 
         except Exception as e:
             logger.error(f"Chat Completions API 調用失敗：{e}")
             raise
     
-    def call_structured_llm(self, prompt: str, schema: Dict[str, Any], model: str, llm_params: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+    def call_structured_llm(self, prompt: str, schema: Dict[str, Any], model: str, llm_params: Dict[str, Any],
+                            system_prompt: Optional[str] = None, **kwargs) -> Dict[str, Any]:
         """
         調用結構化 LLM 生成 JSON 格式內容
         
         參數：
-            prompt: 提示詞
+            prompt: 提示詞（每次請求不同的部分）
             schema: JSON Schema
             model: 模型名稱
             llm_params: 模型參數
+            system_prompt: 固定的系統提示詞，作為獨立的首條消息發送以命中 OpenAI 前綴快取
             **kwargs: 額外參數
             
         返回：
@@ -237,64 +584,172 @@ class LLMClient:
             if not model.startswith('gpt-5'):
                 raise LLMError(f"不支援的模型：{model}，只支援 GPT-5 系列")
             
-            return self._call_gpt5_structured_api(prompt, schema, model, llm_params, **kwargs)
+            cache_key = self._cache_key(self._join_prompt(system_prompt, prompt), model, llm_params, schema)
+            if cache_key and (cached := self.response_cache.get(cache_key)) is not None:
+                return cached
+            
+            result = self._call_gpt5_structured_api(prompt, schema, model, llm_params, system_prompt=system_prompt, **kwargs)
+            if cache_key:
+                self.response_cache.set(cache_key, result)
+            return result
                 
         except Exception as e:
             logger.error(f"結構化 LLM 調用失敗：{e}")
             raise LLMError(f"結構化 LLM 調用失敗：{str(e)}")
     
-    def _call_gpt5_structured_api(self, prompt: str, schema: Dict[str, Any], model: str, llm_params: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+    async def acall_structured_llm(self, prompt: str, schema: Dict[str, Any], model: str, llm_params: Dict[str, Any],
+                                   system_prompt: Optional[str] = None, **kwargs) -> Dict[str, Any]:
         """
-        調用 GPT-5 結構化 API
+        異步調用結構化 LLM 生成 JSON 格式內容（call_structured_llm 的異步版本）
         
         參數：
-            prompt: 提示詞
+            prompt: 提示詞（每次請求不同的部分）
             schema: JSON Schema
             model: 模型名稱
             llm_params: 模型參數
+            system_prompt: 固定的系統提示詞，作為獨立的首條消息發送
             **kwargs: 額外參數
             
         返回：
             Dict[str, Any]: 結構化數據
         """
         try:
-            # 構建 Responses API 參數
-            responses_params = {
-                "model": model,
-                "input": [{"role": "user", "content": prompt}],
-                "text": {
-                    "format": {
-                        "type": "json_schema",
-                        "name": "ResearchProposal",
-                        "strict": True,
-                        "schema": schema,
-                    },
-                    "verbosity": llm_params.get("verbosity", "low")
-                },
-                "max_output_tokens": llm_params.get("max_output_tokens", 2000),
-                "timeout": llm_params.get("timeout", 60)
-            }
-            
-            # 處理 reasoning 參數
-            if 'reasoning' in llm_params:
-                logger.info(f"🔍 [DEBUG] 使用適配後的 reasoning 參數: {llm_params['reasoning']}")
-                responses_params['reasoning'] = llm_params['reasoning']
-            else:
-                logger.info(f"🔍 [DEBUG] 使用默認 reasoning 參數")
-                responses_params['reasoning'] = {"effort": llm_params.get("reasoning_effort", "medium")}
-            
-            # 處理 text 參數
-            if 'text' in llm_params:
-                logger.info(f"🔍 [DEBUG] 使用適配後的 text 參數: {llm_params['text']}")
-                # 保留 JSON Schema 格式信息，只更新 verbosity
-                if 'verbosity' in llm_params['text']:
-                    responses_params['text']['verbosity'] = llm_params['text']['verbosity']
-                logger.info(f"🔍 [DEBUG] 更新後的 text 參數: {responses_params['text']}")
-            else:
-                logger.info(f"🔍 [DEBUG] 使用默認 text 參數")
-                responses_params['text']['verbosity'] = llm_params.get("verbosity", "low")
+            logger.info(f"異步調用結構化 LLM，模型：{model}")
+            
+            # 只支援 GPT-5 系列
+            if not model.startswith('gpt-5'):
+                raise LLMError(f"不支援的模型：{model}，只支援 GPT-5 系列")
             
+            request_key = (make_cache_key(model, self._join_prompt(system_prompt, prompt), llm_params, schema)
+                           if is_cacheable(llm_params) else None)
+            return await self._acall_coalesced(
+                request_key,
+                lambda: self._acall_gpt5_structured_api(prompt, schema, model, llm_params, system_prompt=system_prompt, **kwargs)
+            )
+                
+        except Exception as e:
+            logger.error(f"結構化 LLM 調用失敗：{e}")
+            raise LLMError(f"結構化 LLM 調用失敗：{str(e)}")
+    
+    @staticmethod
+    def _join_prompt(system_prompt: Optional[str], prompt: str) -> str:
+        """合併系統與用戶提示詞，僅用於計算快取鍵"""
+        return prompt if system_prompt is None else f"{system_prompt}\n\n{prompt}"
+    
+    @staticmethod
+    def _build_structured_params(prompt: str, schema: Dict[str, Any], model: str, llm_params: Dict[str, Any],
+                                 system_prompt: Optional[str] = None) -> Dict[str, Any]:
+        """
+        構建結構化輸出（JSON Schema）的 Responses API 參數
+        
+        固定的系統提示詞放在第一條消息，連同 schema 構成逐字節相同的請求前綴，
+        超過 1024 tokens 時 OpenAI 會自動快取該前綴並以折扣價計費
+        """
+        messages = [{"role": "user", "content": prompt}]
+        if system_prompt:
+            messages.insert(0, {"role": "system", "content": system_prompt})
+        # 淺拷貝骨架：調用方只會改寫頂層鍵（max_output_tokens、timeout），巢狀字典共用
+        responses_params = dict(LLMClient._structured_params_skeleton(schema, model, llm_params))
+        responses_params["input"] = messages
+        return responses_params
+    
+    @staticmethod
+    def _structured_params_skeleton(schema: Dict[str, Any], model: str, llm_params: Mapping[str, Any]) -> Dict[str, Any]:
+        """獲取除 input 以外的結構化請求參數，同一組 (模型, 參數快照, schema) 只構建一次"""
+        cacheable = llm_params is get_model_info()[1]
+        cache_key = (model, id(llm_params), id(schema))
+        if cacheable:
+            entry = _structured_params_cache.get(cache_key)
+            if entry is not None and entry[0] is llm_params and entry[1] is schema:
+                return entry[2]
+        
+        responses_params = {
+            "model": model,
+            "text": {
+                "format": {
+                    "type": "json_schema",
+                    "name": "ResearchProposal",
+                    "strict": True,
+                    "schema": schema,
+                },
+                "verbosity": llm_params.get("verbosity", "low")
+            },
+            "max_output_tokens": llm_params.get("max_output_tokens", 2000),
+            "timeout": llm_params.get("timeout", 60)
+        }
+        
+        # 處理 reasoning 參數
+        if 'reasoning' in llm_params:
+            logger.info(f"🔍 [DEBUG] 使用適配後的 reasoning 參數: {llm_params['reasoning']}")
+            responses_params['reasoning'] = llm_params['reasoning']
+        else:
+            logger.info(f"🔍 [DEBUG] 使用默認 reasoning 參數")
+            responses_params['reasoning'] = {"effort": llm_params.get("reasoning_effort", "medium")}
+        
+        # 處理 text 參數
+        if 'text' in llm_params:
+            logger.info(f"🔍 [DEBUG] 使用適配後的 text 參數: {llm_params['text']}")
+            # 保留 JSON Schema 格式信息，只更新 verbosity
+            if 'verbosity' in llm_params['text']:
+                responses_params['text']['verbosity'] = llm_params['text']['verbosity']
+            logger.info(f"🔍 [DEBUG] 更新後的 text 參數: {responses_params['text']}")
+        else:
+            logger.info(f"🔍 [DEBUG] 使用默認 text 參數")
+            responses_params['text']['verbosity'] = llm_params.get("verbosity", "low")
+        
+        if logger.isEnabledFor(logging.DEBUG):
             logger.debug(f"使用 Responses API with JSON Schema，參數：{responses_params}")
+        if cacheable:
+            if len(_structured_params_cache) >= STRUCTURED_PARAMS_CACHE_SIZE:
+                _structured_params_cache.clear()
+            _structured_params_cache[cache_key] = (llm_params, schema, responses_params)
+        return responses_params
+    
+    @staticmethod
+    def _parse_structured_response(response) -> Optional[Dict[str, Any]]:
+        """從 Responses API 響應中解析 JSON（依序嘗試 output_text、output 陣列），失敗時返回 None"""
+        output_text = getattr(response, 'output_text', None)
+        if output_text:
+            try:
+                result = _json_loads(output_text)
+                logger.info("成功解析 JSON 結構化提案")
+                return result
+            except json.JSONDecodeError as e:
+                logger.error(f"JSON 解析失敗: {e}")
+                logger.debug(f"嘗試的文本: {output_text[:200]}...")
+        
+        # 如果 output_text 失敗，嘗試從 output 提取
+        text_content = LLMClient._join_output_parts(response)
+        if text_content:
+            try:
+                result = _json_loads(text_content)
+                logger.info("成功解析 JSON 結構化提案")
+                return result
+            except json.JSONDecodeError as e:
+                logger.error(f"JSON 解析失敗: {e}")
+                logger.debug(f"嘗試的文本: {text_content[:200]}...")
+        
+        logger.warning("無法從 Responses API 提取 JSON 內容")
+        return None
+    
+    def _call_gpt5_structured_api(self, prompt: str, schema: Dict[str, Any], model: str, llm_params: Dict[str, Any],
+                                  system_prompt: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """
+        調用 GPT-5 結構化 API
+        
+        參數：
+            prompt: 提示詞
+            schema: JSON Schema
+            model: 模型名稱
+            llm_params: 模型參數
+            system_prompt: 固定的系統提示詞
+            **kwargs: 額外參數
+            
+        返回：
+            Dict[str, Any]: 結構化數據
+        """
+        try:
+            responses_params = self._build_structured_params(prompt, schema, model, llm_params, system_prompt)
             
             # 重試機制
             max_retries = 3
@@ -311,7 +766,7 @@ class LLMClient:
                     response = self.client.responses.create(**responses_params)
                     
                     # 檢查響應狀態
-                    if hasattr(response, 'status') and response.status == 'incomplete':
+                    if getattr(response, 'status', None) == 'incomplete':
                         logger.warning(f"檢測到 incomplete 狀態，嘗試提取部分內容")
                         
                         # 嘗試從 incomplete 響應中提取部分 JSON
@@ -323,43 +778,86 @@ class LLMClient:
                         # 如果無法提取部分內容，則重試
                         if retry_count < max_retries - 1:
                             logger.warning(f"無法提取部分內容，重試 {retry_count + 1}/{max_retries}")
-                            time.sleep(2)
+                            time.sleep(_retry_delay(retry_count))
                             continue
                     
                     # 提取 JSON 內容
-                    if hasattr(response, 'output_text') and response.output_text:
-                        try:
-                            result = json.loads(response.output_text)
-                            logger.info("成功解析 JSON 結構化提案")
-                            return result
-                        except json.JSONDecodeError as e:
-                            logger.error(f"JSON 解析失敗: {e}")
-                            logger.debug(f"嘗試的文本: {response.output_text[:200]}...")
+                    result = self._parse_structured_response(response)
+                    if result is not None:
+                        return result
+                    
+                except Exception as e:
+                    logger.error(f"API 調用失敗 (嘗試 {retry_count + 1}/{max_retries}): {e}")
+                    if retry_count < max_retries - 1 and _is_retryable(e):
+                        time.sleep(_retry_delay(retry_count))
+                        continue
+                    raise
+            
+            raise APIRequestError("所有重試都失敗")
+            
+        except Exception as e:
+            logger.error(f"GPT-5 結構化 API 調用失敗: {e}")
+            raise
+    
+    async def _acall_gpt5_structured_api(self, prompt: str, schema: Dict[str, Any], model: str, llm_params: Dict[str, Any],
+                                         system_prompt: Optional[str] = None, **kwargs) -> Dict[str, Any]:
+        """
+        異步調用 GPT-5 結構化 API（重試邏輯與 _call_gpt5_structured_api 相同）
+        
+        參數：
+            prompt: 提示詞
+            schema: JSON Schema
+            model: 模型名稱
+            llm_params: 模型參數
+            system_prompt: 固定的系統提示詞
+            **kwargs: 額外參數
+            
+        返回：
+            Dict[str, Any]: 結構化數據
+        """
+        try:
+            responses_params = self._build_structured_params(prompt, schema, model, llm_params, system_prompt)
+            client = self._get_async_client()
+            
+            # 重試機制
+            max_retries = 3
+            base_tokens = llm_params.get("max_output_tokens", 2000)
+            
+            for retry_count in range(max_retries):
+                # 每次重試時增加 1000 tokens
+                current_tokens = base_tokens + (retry_count * 1000)
+                responses_params["max_output_tokens"] = current_tokens
+                
+                logger.info(f"嘗試 {retry_count + 1}/{max_retries}，使用 {current_tokens} tokens")
+                
+                try:
+                    response = await client.responses.create(**responses_params)
                     
-                    # 如果 output_text 失敗，嘗試從 output 提取
-                    if hasattr(response, 'output') and response.output:
-                        text_content = ""
-                        for item in response.output:
-                            if hasattr(item, 'message') and hasattr(item.message, 'content'):
-                                for content in item.message.content:
-                                    if hasattr(content, 'text') and content.text:
-                                        text_content += content.text
+                    # 檢查響應狀態
+                    if getattr(response, 'status', None) == 'incomplete':
+                        logger.warning(f"檢測到 incomplete 狀態，嘗試提取部分內容")
+                        
+                        # 嘗試從 incomplete 響應中提取部分 JSON
+                        partial_json = self._extract_partial_json_from_response(response)
+                        if partial_json:
+                            logger.info("成功從 incomplete 響應中提取部分 JSON")
+                            return partial_json
                         
-                        if text_content:
-                            try:
-                                result = json.loads(text_content)
-                                logger.info("成功解析 JSON 結構化提案")
-                                return result
-                            except json.JSONDecodeError as e:
-                                logger.error(f"JSON 解析失敗: {e}")
-                                logger.debug(f"嘗試的文本: {text_content[:200]}...")
+                        # 如果無法提取部分內容，則重試
+                        if retry_count < max_retries - 1:
+                            logger.warning(f"無法提取部分內容，重試 {retry_count + 1}/{max_retries}")
+                            await asyncio.sleep(_retry_delay(retry_count))
+                            continue
                     
-                    logger.warning("無法從 Responses API 提取 JSON 內容")
+                    # 提取 JSON 內容
+                    result = self._parse_structured_response(response)
+                    if result is not None:
+                        return result
                     
                 except Exception as e:
                     logger.error(f"API 調用失敗 (嘗試 {retry_count + 1}/{max_retries}): {e}")
-                    if retry_count < max_retries - 1:
-                        time.sleep(2)
+                    if retry_count < max_retries - 1 and _is_retryable(e):
+                        await asyncio.sleep(_retry_delay(retry_count))
                         continue
                     raise
             
@@ -369,6 +867,40 @@ class LLMClient:
             logger.error(f"GPT-5 結構化 API 調用失敗: {e}")
             raise
     
+    @staticmethod
+    def _repair_truncated_json(text: str) -> Optional[Dict[str, Any]]:
+        """
+        從可能被截斷的文本中取出第一個完整的 JSON 對象
+        
+        先以 raw_decode 從第一個 "{" 解碼（文本本身完整時一次完成）；
+        失敗時以正則單次掃描括號深度，截到最後一個深度歸零處再解析
+        """
+        start = text.find('{')
+        if start < 0:
+            return None
+        try:
+            return _JSON_DECODER.raw_decode(text, start)[0]
+        except json.JSONDecodeError:
+            pass
+        
+        depth = 0
+        last_complete_pos = -1
+        for match in _BRACE_PATTERN.finditer(text, start):
+            if match.group() == '{':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    last_complete_pos = match.start()
+        
+        if last_complete_pos < 0:
+            return None
+        try:
+            return json.loads(text[start:last_complete_pos + 1])
+        except json.JSONDecodeError as e:
+            logger.debug(f"JSON 修復失敗: {e}")
+            return None
+    
     def _extract_partial_json_from_response(self, response) -> Optional[Dict[str, Any]]:
         """
         從 incomplete 響應中提取部分 JSON 內容
@@ -381,63 +913,25 @@ class LLMClient:
         """
         try:
             # 嘗試從 output_text 提取
-            if hasattr(response, 'output_text') and response.output_text:
-                text = response.output_text
+            text = getattr(response, 'output_text', None)
+            if text:
                 logger.debug(f"嘗試從 output_text 提取部分 JSON: {text[:200]}...")
                 
-                # 嘗試找到最後一個完整的 JSON 對象
-                brace_count = 0
-                last_complete_pos = -1
-                
-                for i, char in enumerate(text):
-                    if char == '{':
-                        brace_count += 1
-                    elif char == '}':
-                        brace_count -= 1
-                        if brace_count == 0:
-                            last_complete_pos = i
-                
-                if last_complete_pos > 0:
-                    complete_json = text[:last_complete_pos + 1]
-                    try:
-                        result = json.loads(complete_json)
-                        logger.info(f"成功修復不完整的 JSON，長度: {len(complete_json)} 字符")
-                        return result
-                    except json.JSONDecodeError as e:
-                        logger.debug(f"JSON 修復失敗: {e}")
+                result = self._repair_truncated_json(text)
+                if result is not None:
+                    logger.info(f"成功修復不完整的 JSON，長度: {len(text)} 字符")
+                    return result
             
             # 嘗試從 output 陣列提取
-            if hasattr(response, 'output') and response.output:
-                text_content = ""
-                for item in response.output:
-                    if hasattr(item, 'message') and hasattr(item.message, 'content'):
-                        for content in item.message.content:
-                            if hasattr(content, 'text') and content.text:
-                                text_content += content.text
+            text_content = self._join_output_parts(response)
+            if text_content:
+                logger.debug(f"嘗試從 output 陣列提取部分 JSON: {text_content[:200]}...")
                 
-                if text_content:
-                    logger.debug(f"嘗試從 output 陣列提取部分 JSON: {text_content[:200]}...")
-                    
-                    # 同樣嘗試修復不完整的 JSON
-                    brace_count = 0
-                    last_complete_pos = -1
-                    
-                    for i, char in enumerate(text_content):
-                        if char == '{':
-                            brace_count += 1
-                        elif char == '}':
-                            brace_count -= 1
-                            if brace_count == 0:
-                                last_complete_pos = i
-                    
-                    if last_complete_pos > 0:
-                        complete_json = text_content[:last_complete_pos + 1]
-                        try:
-                            result = json.loads(complete_json)
-                            logger.info(f"成功從 output 陣列修復不完整的 JSON，長度: {len(complete_json)} 字符")
-                            return result
-                        except json.JSONDecodeError as e:
-                            logger.debug(f"output 陣列 JSON 修復失敗: {e}")
+                # 同樣嘗試修復不完整的 JSON
+                result = self._repair_truncated_json(text_content)
+                if result is not None:
+                    logger.info(f"成功從 output 陣列修復不完整的 JSON，長度: {len(text_content)} 字符")
+                    return result
             
             logger.warning("無法從 incomplete 響應中提取有效的 JSON 內容")
             return None
@@ -445,6 +939,117 @@ class LLMClient:
         except Exception as e:
             logger.error(f"提取部分 JSON 時發生錯誤: {e}")
             return None
+    
+    def submit_batch(self, prompts: List[str], model: str, llm_params: Dict[str, Any],
+                     schema: Optional[Dict[str, Any]] = None) -> str:
+        """
+        以 OpenAI Batch API 提交一批不需即時返回的請求（費用約為即時調用的一半，24 小時內完成）
+        
+        參數：
+            prompts: 提示詞列表，custom_id 為 "request-<索引>"
+            model: 模型名稱（只支援 GPT-5 系列）
+            llm_params: 模型參數
+            schema: 提供時使用結構化輸出
+            
+        返回：
+            str: batch ID，用於 fetch_batch / wait_for_batch
+        """
+        if not model.startswith('gpt-5'):
+            raise LLMError(f"不支援的模型：{model}，只支援 GPT-5 系列")
+        
+        lines = []
+        for i, prompt in enumerate(prompts):
+            if schema is None:
+                body = self._build_responses_params(prompt, model, llm_params)
+            else:
+                body = self._build_structured_params(prompt, schema, model, llm_params)
+            # timeout 是 SDK 的請求選項，不屬於請求體
+            body.pop("timeout", None)
+            lines.append(json.dumps(
+                {"custom_id": f"request-{i}", "method": "POST", "url": "/v1/responses", "body": body},
+                ensure_ascii=False
+            ))
+        
+        try:
+            input_file = self.client.files.create(
+                file=("batch.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch"
+            )
+            batch = self.client.batches.create(
+                input_file_id=input_file.id, endpoint="/v1/responses", completion_window="24h"
+            )
+        except Exception as e:
+            logger.error(f"提交 Batch 失敗：{e}")
+            raise APIRequestError(f"提交 Batch 失敗：{str(e)}")
+        
+        logger.info(f"📦 已提交 Batch {batch.id}，共 {len(prompts)} 個請求")
+        return batch.id
+    
+    def fetch_batch(self, batch_id: str, structured: bool = False) -> Optional[List[Optional[Any]]]:
+        """
+        獲取 Batch 結果
+        
+        參數：
+            batch_id: submit_batch 返回的 ID
+            structured: 是否將輸出解析為 JSON
+            
+        返回：
+            Optional[List[Optional[Any]]]: 尚未完成時返回 None；完成後按提交順序返回結果，失敗的請求為 None
+        """
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status in BATCH_FAILED_STATUSES:
+            raise APIRequestError(f"Batch {batch_id} 未完成，狀態：{batch.status}")
+        if batch.status != "completed":
+            return None
+        
+        results: List[Optional[Any]] = [None] * batch.request_counts.total
+        if not batch.output_file_id:
+            return results
+        
+        for line in self.client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = _json_loads(line)
+            index = int(record["custom_id"].rpartition("-")[2])
+            body = (record.get("response") or {}).get("body") or {}
+            # 原始響應沒有 SDK 的 output_text 屬性，需從 output 陣列拼接
+            text = "".join(
+                content.get("text", "")
+                for item in body.get("output") or ()
+                for content in item.get("content") or ()
+                if content.get("type") == "output_text"
+            )
+            if not text:
+                logger.warning(f"Batch 請求 {record['custom_id']} 無輸出：{record.get('error')}")
+                continue
+            try:
+                results[index] = _json_loads(text) if structured else text
+            except json.JSONDecodeError as e:
+                logger.error(f"Batch 請求 {record['custom_id']} JSON 解析失敗: {e}")
+        
+        logger.info(f"📦 Batch {batch_id} 完成，成功 {sum(r is not None for r in results)}/{len(results)}")
+        return results
+    
+    def wait_for_batch(self, batch_id: str, structured: bool = False,
+                       timeout: Optional[float] = None) -> List[Optional[Any]]:
+        """
+        阻塞輪詢直到 Batch 完成（輪詢間隔從 BATCH_POLL_INTERVAL 指數增長到 BATCH_MAX_POLL_INTERVAL）
+        
+        參數：
+            batch_id: submit_batch 返回的 ID
+            structured: 是否將輸出解析為 JSON
+            timeout: 最長等待秒數，None 表示不限
+            
+        返回：
+            List[Optional[Any]]: 同 fetch_batch
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        interval = BATCH_POLL_INTERVAL
+        while (results := self.fetch_batch(batch_id, structured)) is None:
+            if deadline is not None and time.monotonic() + interval > deadline:
+                raise APIRequestError(f"等待 Batch {batch_id} 超時")
+            time.sleep(interval)
+            interval = min(interval * 2, BATCH_MAX_POLL_INTERVAL)
+        return results
 
 
 # 全局 LLM 客戶端實例
@@ -8,8 +8,15 @@ LLM 管理模組
 import os
 import json
 import logging
-from typing import Dict, Any, Optional, List
-from langchain_openai import ChatOpenAI
+from typing import Dict, Any, Optional, List, Tuple
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# langchain_openai 依賴圖龐大，延遲到 _initialize_llm 中導入
 # 移除模組級別的openai導入，改為延遲導入
 # import openai
 
@@ -28,6 +35,36 @@ from ..utils.exceptions import LLMError, APIKeyError
 # 配置日誌
 logger = logging.getLogger(__name__)
 
+# 解析模型輸出的 JSON（優先使用 orjson；其 JSONDecodeError 是 json.JSONDecodeError 的子類）
+_json_loads = orjson.loads if ORJSON_AVAILABLE else json.loads
+
+# 結構化請求的固定指令頭，與 schema 一起作為首條系統消息，構成 OpenAI 可快取的穩定前綴
+STATIC_SCHEMA_HEADER = """請以指定的 JSON 格式返回回應。
+請嚴格按照以下 JSON Schema 格式回應，不要添加任何額外的文字或說明：
+
+"""
+
+# schema 序列化結果快取：id(schema) -> (schema, 文本)；保留 schema 引用，確保 id 不會被其他對象重用
+SCHEMA_TEXT_CACHE_SIZE = 32
+_schema_text_cache: Dict[int, Tuple[Dict[str, Any], str]] = {}
+
+
+def _schema_to_text(schema: Dict[str, Any]) -> str:
+    """
+    序列化 JSON Schema，同一個 schema 對象只序列化一次
+    
+    schema_manager 對相同參數返回同一個快取對象，結構化請求因此通常直接命中；
+    排序鍵並使用緊湊分隔符，內容相同的 schema 總是得到逐字節相同的文本
+    """
+    entry = _schema_text_cache.get(id(schema))
+    if entry is not None and entry[0] is schema:
+        return entry[1]
+    schema_str = json.dumps(schema, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    if len(_schema_text_cache) >= SCHEMA_TEXT_CACHE_SIZE:
+        _schema_text_cache.clear()
+    _schema_text_cache[id(schema)] = (schema, schema_str)
+    return schema_str
+
 # 設定OpenAI API Key - 延遲設置
 # if OPENAI_API_KEY:
 #     openai.api_key = OPENAI_API_KEY
@@ -54,6 +91,8 @@ class LLMManager:
             if not OPENAI_API_KEY:
                 raise APIKeyError("OpenAI")
             
+            from langchain_openai import ChatOpenAI
+            
             # 對於 GPT-5-mini 模型，不設置 temperature 參數，使用默認值
             llm_kwargs = {
                 "model": self.model_name,
@@ -121,13 +160,13 @@ class LLMManager:
             Dict[str, Any]: 結構化回應
         """
         try:
-            # 構建結構化提示
-            structured_prompt = self._build_structured_prompt(prompt, schema)
+            # 固定的指令頭與 schema 放在最前面，用戶提示單獨作為最後一條消息
+            structured_system_message = self._build_structured_prompt(schema, system_message)
             
             # 生成回應
             response_text = self.generate_response(
-                structured_prompt, 
-                system_message=system_message
+                prompt, 
+                system_message=structured_system_message
             )
             
             # 解析 JSON 回應
@@ -137,30 +176,23 @@ class LLMManager:
             logger.error(f"結構化回應生成失敗: {e}")
             raise LLMError(f"結構化回應失敗: {e}", model_name=self.model_name)
     
-    def _build_structured_prompt(self, prompt: str, schema: Dict[str, Any]) -> str:
+    def _build_structured_prompt(self, schema: Dict[str, Any], system_message: Optional[str] = None) -> str:
         """
-        構建結構化提示
+        構建結構化請求的系統消息
+        
+        指令頭與 schema 在前、調用方的系統消息在後，同一 schema 的請求前綴逐字節相同，
+        可命中 OpenAI 的自動前綴快取（≥1024 tokens 時生效）
         
         Args:
-            prompt: 原始提示
             schema: JSON Schema
+            system_message: 調用方的系統消息
             
         Returns:
-            str: 結構化提示
+            str: 系統消息
         """
-        schema_str = json.dumps(schema, ensure_ascii=False, indent=2)
-        
-        structured_prompt = f"""
-請根據以下提示生成回應，並以指定的 JSON 格式返回：
-
-提示：{prompt}
-
-請嚴格按照以下 JSON Schema 格式回應，不要添加任何額外的文字或說明：
-
-{schema_str}
-
-回應：
-"""
+        structured_prompt = STATIC_SCHEMA_HEADER + _schema_to_text(schema)
+        if system_message:
+            structured_prompt = f"{structured_prompt}\n\n{system_message}"
         return structured_prompt
     
     def _parse_json_response(self, response_text: str) -> Dict[str, Any]:
@@ -175,7 +207,7 @@ class LLMManager:
         """
         try:
             # 嘗試直接解析
-            return json.loads(response_text)
+            return _json_loads(response_text)
         except json.JSONDecodeError:
             # 嘗試提取 JSON 部分
             try:
@@ -185,7 +217,7 @@ class LLMManager:
                 
                 if start_idx != -1 and end_idx != 0:
                     json_str = response_text[start_idx:end_idx]
-                    return json.loads(json_str)
+                    return _json_loads(json_str)
                 else:
                     raise ValueError("未找到有效的 JSON 格式")
                     
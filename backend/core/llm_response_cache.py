@@ -0,0 +1,115 @@
+"""
+LLM 響應快取模組
+==============
+
+以 SHA-256(模型 + 提示詞 + 參數 + schema) 為鍵快取 LLM 的完整響應，
+相同請求在有效期內直接返回已保存的文本或 JSON，不再發出網路請求。
+快取保存在 SQLite，重啟後仍可命中；預設關閉，需以環境變數啟用。
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+from contextlib import closing
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 是否啟用響應快取（LLM 輸出非確定性，重新生成時通常期望不同結果，故預設關閉）
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true"
+# 快取有效期（秒）
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))
+# 持久化快取路徑
+LLM_CACHE_PATH = os.path.join("experiment_data", "llm_cache", "responses.db")
+
+
+def make_cache_key(model: str, prompt: str, llm_params: Dict[str, Any],
+                   schema: Optional[Dict[str, Any]] = None) -> str:
+    """
+    計算請求的快取鍵
+
+    Args:
+        model: 模型名稱
+        prompt: 提示詞
+        llm_params: 模型參數（可為唯讀映射）
+        schema: 結構化輸出的 JSON Schema，文本生成時為 None
+
+    Returns:
+        str: SHA-256 十六進位字串
+    """
+    payload = json.dumps(
+        {"model": model, "prompt": prompt, "params": dict(llm_params), "schema": schema},
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_cacheable(llm_params: Dict[str, Any]) -> bool:
+    """溫度大於 0 的請求需要隨機性，不使用快取"""
+    return (llm_params.get("temperature") or 0) <= 0
+
+
+class LLMResponseCache:
+    """
+    SQLite 持久化的 LLM 響應快取
+
+    值以 JSON 保存，文本與結構化結果共用同一張表；過期紀錄在寫入時清理。
+    """
+
+    def __init__(self, db_path: str = LLM_CACHE_PATH, ttl: int = LLM_CACHE_TTL,
+                 enabled: bool = LLM_CACHE_ENABLED):
+        """
+        Args:
+            db_path: SQLite 路徑
+            ttl: 有效期（秒）
+            enabled: 是否啟用；關閉時 get 總是未命中、set 不寫入
+        """
+        self.db_path = db_path
+        self.ttl = ttl
+        self.enabled = enabled
+
+    def _connect(self) -> sqlite3.Connection:
+        """建立連線並確保資料表存在（每次呼叫使用獨立連線，可跨線程使用）"""
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        """讀取未過期的快取響應，未命中時返回 None"""
+        if not self.enabled:
+            return None
+        try:
+            with closing(self._connect()) as conn:
+                row = conn.execute(
+                    "SELECT value FROM responses WHERE key = ? AND created_at >= ?",
+                    (key, time.time() - self.ttl)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ 讀取 LLM 響應快取失敗: {e}")
+            return None
+        if row is None:
+            return None
+        logger.info(f"🗃️ LLM 響應快取命中: {key[:12]}")
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        """保存響應並清理過期紀錄"""
+        if not self.enabled or value is None:
+            return
+        now = time.time()
+        try:
+            with closing(self._connect()) as conn, conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), now)
+                )
+                conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"⚠️ 寫入 LLM 響應快取失敗: {e}")
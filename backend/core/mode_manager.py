@@ -9,13 +9,14 @@
 """
 
 import logging
-from typing import Dict, List, Optional
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
 
 # 配置日誌
 logger = logging.getLogger(__name__)
 
 # 定義所有可用的處理模式
-AVAILABLE_MODES = {
+_MODE_DEFINITIONS = {
     "納入實驗資料，進行推論與建議": {
         "description": "整合文獻和實驗數據進行綜合推論",
         "category": "advanced",
@@ -60,6 +61,20 @@ AVAILABLE_MODES = {
     }
 }
 
+# 對外提供唯讀視圖，防止運行時意外修改模式配置
+AVAILABLE_MODES: Mapping[str, Mapping] = MappingProxyType({
+    mode: MappingProxyType(config) for mode, config in _MODE_DEFINITIONS.items()
+})
+
+# 模組載入時建立的索引，查詢時直接命中，無需每次掃描全部模式
+_MODES_BY_CATEGORY: Dict[str, Tuple[str, ...]] = {
+    category: tuple(m for m, c in _MODE_DEFINITIONS.items() if c["category"] == category)
+    for category in dict.fromkeys(c["category"] for c in _MODE_DEFINITIONS.values())
+}
+_STRUCTURED_OUTPUT_MODES = frozenset(m for m, c in _MODE_DEFINITIONS.items() if c["structured_output"])
+_EXPERIMENT_DATA_MODES = frozenset(m for m, c in _MODE_DEFINITIONS.items() if c["requires_experiment_data"])
+_INFERENCE_MODES = frozenset(m for m, c in _MODE_DEFINITIONS.items() if c["allows_inference"])
+
 
 def get_available_modes() -> List[str]:
     """
@@ -101,7 +116,7 @@ def get_mode_description(mode: str) -> str:
     return AVAILABLE_MODES[mode]["description"]
 
 
-def get_mode_config(mode: str) -> Optional[Dict]:
+def get_mode_config(mode: str) -> Optional[Mapping]:
     """
     獲取模式的完整配置信息
     
@@ -109,7 +124,7 @@ def get_mode_config(mode: str) -> Optional[Dict]:
         mode (str): 模式名稱
         
     Returns:
-        Optional[Dict]: 模式配置字典，如果模式不存在則返回 None
+        Optional[Mapping]: 模式配置（唯讀），如果模式不存在則返回 None
     """
     return AVAILABLE_MODES.get(mode)
 
@@ -124,10 +139,7 @@ def get_modes_by_category(category: str) -> List[str]:
     Returns:
         List[str]: 該類別下的模式列表
     """
-    return [
-        mode for mode, config in AVAILABLE_MODES.items()
-        if config["category"] == category
-    ]
+    return list(_MODES_BY_CATEGORY.get(category, ()))
 
 
 def is_structured_output_mode(mode: str) -> bool:
@@ -140,8 +152,7 @@ def is_structured_output_mode(mode: str) -> bool:
     Returns:
         bool: 是否為結構化輸出模式
     """
-    config = get_mode_config(mode)
-    return config.get("structured_output", False) if config else False
+    return mode in _STRUCTURED_OUTPUT_MODES
 
 
 def requires_experiment_data(mode: str) -> bool:
@@ -154,8 +165,7 @@ def requires_experiment_data(mode: str) -> bool:
     Returns:
         bool: 是否需要實驗數據
     """
-    config = get_mode_config(mode)
-    return config.get("requires_experiment_data", False) if config else False
+    return mode in _EXPERIMENT_DATA_MODES
 
 
 def allows_inference(mode: str) -> bool:
@@ -168,8 +178,7 @@ def allows_inference(mode: str) -> bool:
     Returns:
         bool: 是否允許推論
     """
-    config = get_mode_config(mode)
-    return config.get("allows_inference", False) if config else False
+    return mode in _INFERENCE_MODES
 
 
 def get_mode_summary() -> Dict[str, List[str]]:
@@ -179,11 +188,4 @@ def get_mode_summary() -> Dict[str, List[str]]:
     Returns:
         Dict[str, List[str]]: 按類別分組的模式字典
     """
-    summary = {}
-    for mode, config in AVAILABLE_MODES.items():
-        category = config["category"]
-        if category not in summary:
-            summary[category] = []
-        summary[category].append(mode)
-    
-    return summary
+    return {category: list(modes) for category, modes in _MODES_BY_CATEGORY.items()}
@@ -5,7 +5,8 @@
 負責模型參數和配置管理，避免循環導入問題
 """
 
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Tuple
 from backend.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -23,28 +24,69 @@ class ModelConfig:
             "reasoning_effort": "low",
             "verbosity": "low"
         }
+        # 參數的唯讀即時視圖（僅供明確需要追蹤變更的調用方），與版本號（每次變更遞增）
+        self._params_view: Mapping[str, Any] = MappingProxyType(self._model_params)
+        self._version = 0
+        # (模型名稱, 唯讀參數) 快照，參數變更時失效
+        self._model_info: Optional[Tuple[str, Mapping[str, Any]]] = None
+    
+    def _mark_changed(self):
+        """參數變更後：快照失效並遞增版本號"""
+        self._model_info = None
+        self._version += 1
     
     def get_current_model(self) -> str:
         """獲取當前模型名稱"""
         return self._current_model
     
+    def get_model_info(self) -> Tuple[str, Mapping[str, Any]]:
+        """
+        一次獲取模型名稱與參數（參數為唯讀視圖，不複製字典）
+        
+        Returns:
+            Tuple[str, Mapping[str, Any]]: (模型名稱, 唯讀模型參數)
+        """
+        info = self._model_info
+        if info is None:
+            info = self._model_info = (self._current_model, MappingProxyType(dict(self._model_params)))
+        return info
+    
+    def invalidate_model_info(self):
+        """使模型資訊快照失效"""
+        self._model_info = None
+    
     def set_current_model(self, model: str):
         """設置當前模型名稱"""
+        self._mark_changed()
         self._current_model = model
         self._model_params["model"] = model
         logger.info(f"模型已設置為: {model}")
     
-    def get_model_params(self) -> Dict[str, Any]:
-        """獲取模型參數"""
-        return self._model_params.copy()
+    def get_model_params(self) -> Mapping[str, Any]:
+        """獲取模型參數的唯讀快照（與 get_model_info 共用，之後的變更不影響已取得的快照）"""
+        return self.get_model_info()[1]
+    
+    def get_model_params_view(self) -> Mapping[str, Any]:
+        """
+        獲取模型參數的唯讀即時視圖（內容隨之後的變更改變）
+        
+        同一請求內需要固定參數、或要以對象身份作為快取鍵時，請改用 get_model_params()
+        """
+        return self._params_view
+    
+    def get_model_params_version(self) -> int:
+        """獲取參數版本號，版本號不變時先前複製的參數仍然有效"""
+        return self._version
     
     def set_model_params(self, params: Dict[str, Any]):
         """設置模型參數"""
+        self._mark_changed()
         self._model_params.update(params)
         logger.info(f"模型參數已更新: {params}")
     
     def update_model_param(self, key: str, value: Any):
         """更新單個模型參數"""
+        self._mark_changed()
         self._model_params[key] = value
         logger.debug(f"模型參數 {key} 已更新為: {value}")
     
@@ -54,6 +96,7 @@ class ModelConfig:
     
     def reset_to_defaults(self):
         """重置為默認參數"""
+        self._mark_changed()
         self._current_model = "gpt-5-nano"
         self._model_params = {
             "model": "gpt-5-nano",
@@ -62,6 +105,7 @@ class ModelConfig:
             "reasoning_effort": "low",
             "verbosity": "low"
         }
+        self._params_view = MappingProxyType(self._model_params)
         logger.info("模型參數已重置為默認值")
 
 
@@ -82,11 +126,26 @@ def get_current_model() -> str:
     return get_model_config().get_current_model()
 
 
-def get_model_params() -> Dict[str, Any]:
-    """獲取模型參數（向後兼容）"""
+def get_model_params() -> Mapping[str, Any]:
+    """獲取模型參數的唯讀快照（向後兼容）"""
     return get_model_config().get_model_params()
 
 
+def get_model_params_version() -> int:
+    """獲取模型參數版本號，用於判斷快取的參數副本是否過期"""
+    return get_model_config().get_model_params_version()
+
+
+def get_model_info() -> Tuple[str, Mapping[str, Any]]:
+    """一次獲取 (模型名稱, 唯讀模型參數)，參數變更前重複調用不重新建立"""
+    return get_model_config().get_model_info()
+
+
+def invalidate_model_cache():
+    """使模型資訊快照失效（切換模型後調用；通過 set_* 修改時會自動失效）"""
+    get_model_config().invalidate_model_info()
+
+
 def set_current_model(model: str):
     """設置當前模型名稱（向後兼容）"""
     get_model_config().set_current_model(model)
@@ -7,6 +7,9 @@
 
 import time
 import logging
+import threading
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Optional, Tuple
 
 from .vector_store import load_paper_vectorstore, load_experiment_vectorstore, search_documents
@@ -18,6 +21,27 @@ from ..utils.exceptions import LLMError, VectorStoreError
 # 配置日誌
 logger = logging.getLogger(__name__)
 
+# 向量庫文檔數僅用於日誌，短時間內重複使用上次查詢結果：名稱 -> (文檔數, 查詢時間)
+COLLECTION_COUNT_TTL = 5.0
+_collection_counts: Dict[str, Tuple[int, float]] = {}
+
+# 文獻與實驗向量庫的檢索互相獨立（嵌入 + 向量搜索），並行執行
+_retrieval_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="retrieval")
+
+
+def _log_collection_count(vectorstore: Any, name: str) -> None:
+    """記錄向量庫文檔數（INFO 未啟用時不查詢；COLLECTION_COUNT_TTL 秒內沿用快取值）"""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    now = time.monotonic()
+    cached = _collection_counts.get(name)
+    if cached is not None and now - cached[1] < COLLECTION_COUNT_TTL:
+        count = cached[0]
+    else:
+        count = vectorstore._collection.count()
+        _collection_counts[name] = (count, now)
+    logger.info(f"📦 {name} 向量庫：{count}")
+
 
 class BaseProcessor:
     """處理器基類"""
@@ -25,27 +49,45 @@ class BaseProcessor:
     def __init__(self):
         self.llm_manager = get_default_llm_manager()
     
+    @staticmethod
+    def _format_context_entry(i: int, chunk: Any) -> str:
+        """格式化單個文檔塊"""
+        metadata = chunk.metadata
+        clean_content = extract_text_snippet(chunk.page_content, max_length=300)
+        return f"文檔 {i}: {metadata.get('filename', 'Unknown')} (頁碼: {metadata.get('page', '')})\n{clean_content}\n"
+    
     def _build_context(self, chunks: List[Any]) -> str:
         """構建上下文文本"""
-        context_parts = []
+        format_entry = self._format_context_entry
+        try:
+            return "\n".join([format_entry(i, chunk) for i, chunk in enumerate(chunks, 1)])
+        except Exception:
+            pass
         
+        # 有文檔塊格式異常時逐個處理，跳過失敗的文檔塊
+        context_parts = []
         for i, chunk in enumerate(chunks, 1):
             try:
-                metadata = chunk.metadata
-                content = chunk.page_content
-                
-                filename = metadata.get("filename", "Unknown")
-                page = metadata.get("page", "")
-                
-                clean_content = extract_text_snippet(content, max_length=300)
-                
-                context_part = f"文檔 {i}: {filename} (頁碼: {page})\n{clean_content}\n"
-                context_parts.append(context_part)
-                
+                context_parts.append(format_entry(i, chunk))
             except Exception as e:
                 logger.warning(f"處理文檔塊 {i} 失敗: {e}")
         
         return "\n".join(context_parts)
+    
+    def _extract_citations(self, *chunk_lists: List[Any]) -> List[str]:
+        """提取引用信息（可傳入多個文檔塊列表；按首次出現的順序去重，重複的 (文件, 頁碼) 不再格式化）"""
+        seen = set()
+        citations = []
+        for chunk in chain.from_iterable(chunk_lists):
+            try:
+                key = (chunk.metadata.get("filename", ""), chunk.metadata.get("page", ""))
+                if key[0] and key not in seen:
+                    seen.add(key)
+                    citations.append(f"{key[0]} (頁碼: {key[1]})")
+            except Exception as e:
+                logger.warning(f"提取引用信息失敗: {e}")
+        
+        return citations
 
 
 class AdvancedInferenceProcessor(BaseProcessor):
@@ -59,12 +101,13 @@ class AdvancedInferenceProcessor(BaseProcessor):
         paper_vectorstore = load_paper_vectorstore()
         experiment_vectorstore = load_experiment_vectorstore()
         
-        logger.info(f"📦 Paper 向量庫：{paper_vectorstore._collection.count()}")
-        logger.info(f"📦 Experiment 向量庫：{experiment_vectorstore._collection.count()}")
+        _log_collection_count(paper_vectorstore, "Paper")
+        _log_collection_count(experiment_vectorstore, "Experiment")
         
-        # 檢索文獻和實驗數據
-        chunks_paper = search_documents(paper_vectorstore, question, k=k)
+        # 並行檢索文獻和實驗數據
+        paper_future = _retrieval_pool.submit(search_documents, paper_vectorstore, question, k=k)
         experiment_chunks = search_documents(experiment_vectorstore, question, k=k)
+        chunks_paper = paper_future.result()
         
         # 構建雙重推論提示詞
         prompt = self._build_dual_inference_prompt(question, chunks_paper, experiment_chunks)
@@ -74,7 +117,7 @@ class AdvancedInferenceProcessor(BaseProcessor):
         
         return {
             "answer": response,
-            "citations": self._extract_citations(chunks_paper + experiment_chunks),
+            "citations": self._extract_citations(chunks_paper, experiment_chunks),
             "chunks": chunks_paper + experiment_chunks,
             "paper_chunks": chunks_paper,
             "experiment_chunks": experiment_chunks
@@ -104,20 +147,6 @@ class AdvancedInferenceProcessor(BaseProcessor):
 
 請確保回答既有理論基礎，又有實驗支撐。
 """
-    
-    def _extract_citations(self, chunks: List[Any]) -> List[str]:
-        """提取引用信息"""
-        citations = []
-        for chunk in chunks:
-            try:
-                filename = chunk.metadata.get("filename", "")
-                page = chunk.metadata.get("page", "")
-                if filename:
-                    citations.append(f"{filename} (頁碼: {page})")
-            except Exception as e:
-                logger.warning(f"提取引用信息失敗: {e}")
-        
-        return list(set(citations))
 
 
 class ProposalProcessor(BaseProcessor):
@@ -128,7 +157,7 @@ class ProposalProcessor(BaseProcessor):
         logger.info("📝 啟用模式：make proposal (結構化輸出)")
         
         paper_vectorstore = load_paper_vectorstore()
-        logger.info(f"📦 Paper 向量庫：{paper_vectorstore._collection.count()}")
+        _log_collection_count(paper_vectorstore, "Paper")
         
         chunks = search_documents(paper_vectorstore, question, k=k)
         logger.info(f"📄 檢索到 {len(chunks)} 個文檔塊")
@@ -237,7 +266,7 @@ class InferenceProcessor(BaseProcessor):
         paper_vectorstore = load_paper_vectorstore()
         chunks = search_documents(paper_vectorstore, question, k=k)
         
-        logger.info(f"📦 Paper 向量庫：{paper_vectorstore._collection.count()}")
+        _log_collection_count(paper_vectorstore, "Paper")
         
         prompt = self._build_inference_prompt(question, chunks)
         response = self.llm_manager.generate_response(prompt)
@@ -268,20 +297,6 @@ class InferenceProcessor(BaseProcessor):
 
 請確保推論有理有據，基於文獻但不局限於文獻。
 """
-    
-    def _extract_citations(self, chunks: List[Any]) -> List[str]:
-        """提取引用信息"""
-        citations = []
-        for chunk in chunks:
-            try:
-                filename = chunk.metadata.get("filename", "")
-                page = chunk.metadata.get("page", "")
-                if filename:
-                    citations.append(f"{filename} (頁碼: {page})")
-            except Exception as e:
-                logger.warning(f"提取引用信息失敗: {e}")
-        
-        return list(set(citations))
 
 
 class StrictProcessor(BaseProcessor):
@@ -294,7 +309,7 @@ class StrictProcessor(BaseProcessor):
         paper_vectorstore = load_paper_vectorstore()
         chunks = search_documents(paper_vectorstore, question, k=k)
         
-        logger.info(f"📦 Paper 向量庫：{paper_vectorstore._collection.count()}")
+        _log_collection_count(paper_vectorstore, "Paper")
         
         prompt = self._build_strict_prompt(question, chunks)
         response = self.llm_manager.generate_response(prompt)
@@ -320,20 +335,6 @@ class StrictProcessor(BaseProcessor):
 請嚴格基於上述文獻資料回答問題，不要進行任何推論或延伸。
 如果文獻資料不足以回答問題，請明確說明。
 """
-    
-    def _extract_citations(self, chunks: List[Any]) -> List[str]:
-        """提取引用信息"""
-        citations = []
-        for chunk in chunks:
-            try:
-                filename = chunk.metadata.get("filename", "")
-                page = chunk.metadata.get("page", "")
-                if filename:
-                    citations.append(f"{filename} (頁碼: {page})")
-            except Exception as e:
-                logger.warning(f"提取引用信息失敗: {e}")
-        
-        return list(set(citations))
 
 
 class ExperimentDetailProcessor(BaseProcessor):
@@ -439,7 +440,7 @@ class InnovationProcessor(BaseProcessor):
         logger.info("💡 啟用模式：generate new idea (結構化輸出)")
         
         paper_vectorstore = load_paper_vectorstore()
-        logger.info(f"📦 Paper 向量庫：{paper_vectorstore._collection.count()}")
+        _log_collection_count(paper_vectorstore, "Paper")
         
         # 檢索新的文檔塊
         new_chunks = search_documents(paper_vectorstore, question, k=k)
@@ -561,10 +562,14 @@ PROCESSOR_MAP = {
     "generate new idea": InnovationProcessor
 }
 
+# 處理器實例快取：處理器除 llm_manager 外無狀態，各模式共用一個實例
+_processor_instances: Dict[str, BaseProcessor] = {}
+_processor_instances_lock = threading.Lock()
+
 
 def get_processor(mode: str) -> Optional[BaseProcessor]:
     """
-    根據模式獲取對應的處理器
+    根據模式獲取對應的處理器（每個模式首次調用時建立，之後返回同一實例）
     
     Args:
         mode (str): 處理模式
@@ -572,7 +577,15 @@ def get_processor(mode: str) -> Optional[BaseProcessor]:
     Returns:
         Optional[BaseProcessor]: 對應的處理器實例，如果模式不存在則返回 None
     """
+    processor = _processor_instances.get(mode)
+    if processor is not None:
+        return processor
+    
     processor_class = PROCESSOR_MAP.get(mode)
-    if processor_class:
-        return processor_class()
-    return None
+    if processor_class is None:
+        return None
+    with _processor_instances_lock:
+        processor = _processor_instances.get(mode)
+        if processor is None:
+            processor = _processor_instances[mode] = processor_class()
+    return processor
@@ -8,6 +8,7 @@ Schema 管理模組
 import os
 import sys
 import logging
+from functools import lru_cache
 from typing import Dict, Any, Optional
 
 # 配置日誌
@@ -19,9 +20,13 @@ __all__ = [
     'create_experimental_detail_schema',
     'create_revision_proposal_schema',
     'create_revision_experimental_detail_schema',
-    'get_schema_by_type'
+    'get_schema_by_type',
+    'invalidate_schemas'
 ]
 
+# 每種 schema 快取的參數組合數量（schema 只依賴長度參數，設定變更時以新參數為鍵重新建立）
+SCHEMA_CACHE_SIZE = 8
+
 def get_dynamic_schema_params() -> Dict[str, int]:
     """
     從設定管理器獲取動態的 JSON Schema 參數
@@ -52,15 +57,9 @@ def get_dynamic_schema_params() -> Dict[str, int]:
             "max_length": 2000
         }
 
-def create_research_proposal_schema() -> Dict[str, Any]:
-    """
-    創建研究提案的 JSON Schema
-    
-    Returns:
-        Dict[str, Any]: 研究提案的 schema
-    """
-    schema_params = get_dynamic_schema_params()
-    
+@lru_cache(maxsize=SCHEMA_CACHE_SIZE)
+def _build_research_proposal_schema(min_length: int, max_length: int) -> Dict[str, Any]:
+    """按長度參數建立 schema（結果被快取共享，調用方請勿修改）"""
     return {
         "type": "object",
         "title": "ResearchProposal",
@@ -79,37 +78,37 @@ def create_research_proposal_schema() -> Dict[str, Any]:
                 "type": "string",
                 "description": "研究提案的標題，總結研究目標和創新點",
                 "minLength": 10,
-                "maxLength": schema_params["max_length"]
+                "maxLength": max_length
             },
             "need": {
                 "type": "string",
                 "description": "研究需求背景，說明為什麼需要這個研究",
-                "minLength": schema_params["min_length"],
-                "maxLength": schema_params["max_length"]
+                "minLength": min_length,
+                "maxLength": max_length
             },
             "solution": {
                 "type": "string",
                 "description": "解決方案概述，描述如何解決研究需求",
-                "minLength": schema_params["min_length"],
-                "maxLength": schema_params["max_length"]
+                "minLength": min_length,
+                "maxLength": max_length
             },
             "differentiation": {
                 "type": "string",
                 "description": "創新點和差異化，說明與現有研究的區別",
-                "minLength": schema_params["min_length"],
-                "maxLength": schema_params["max_length"]
+                "minLength": min_length,
+                "maxLength": max_length
             },
             "benefit": {
                 "type": "string",
                 "description": "預期效益，說明研究的潛在影響和價值",
-                "minLength": schema_params["min_length"],
-                "maxLength": schema_params["max_length"]
+                "minLength": min_length,
+                "maxLength": max_length
             },
             "experimental_overview": {
                 "type": "string",
                 "description": "實驗概述，簡要描述實驗設計和方法",
-                "minLength": schema_params["min_length"],
-                "maxLength": schema_params["max_length"]
+                "minLength": min_length,
+                "maxLength": max_length
             },
             "materials_list": {
                 "type": "array",
@@ -125,15 +124,21 @@ def create_research_proposal_schema() -> Dict[str, Any]:
         }
     }
 
-def create_experimental_detail_schema() -> Dict[str, Any]:
+def create_research_proposal_schema() -> Dict[str, Any]:
     """
-    創建實驗詳情的 JSON Schema
+    創建研究提案的 JSON Schema
     
     Returns:
-        Dict[str, Any]: 實驗詳情的 schema
+        Dict[str, Any]: 研究提案的 schema
+        
+    Note:
+        相同參數下返回同一個快取物件，請勿修改
     """
-    schema_params = get_dynamic_schema_params()
-    
+    return _build_research_proposal_schema(**get_dynamic_schema_params())
+
+@lru_cache(maxsize=SCHEMA_CACHE_SIZE)
+def _build_experimental_detail_schema(min_length: int, max_length: int) -> Dict[str, Any]:
+    """按長度參數建立 schema（結果被快取共享，調用方請勿修改）"""
     return {
         "type": "object",
         "title": "ExperimentalDetail",
@@ -148,41 +153,47 @@ def create_experimental_detail_schema() -> Dict[str, Any]:
             "synthesis_process": {
                 "type": "string",
                 "description": "詳細的合成步驟、條件、時間等",
-                "minLength": schema_params["min_length"],
-                "maxLength": schema_params["max_length"]
+                "minLength": min_length,
+                "maxLength": max_length
             },
             "materials_and_conditions": {
                 "type": "string",
                 "description": "使用的材料、濃度、溫度、壓力和其他反應條件",
-                "minLength": schema_params["min_length"],
-                "maxLength": schema_params["max_length"]
+                "minLength": min_length,
+                "maxLength": max_length
             },
             "analytical_methods": {
                 "type": "string",
                 "description": "表徵技術，如 XRD、SEM、NMR 等",
-                "minLength": schema_params["min_length"],
-                "maxLength": schema_params["max_length"]
+                "minLength": min_length,
+                "maxLength": max_length
             },
             "precautions": {
                 "type": "string",
                 "description": "實驗注意事項和安全預防措施",
-                "minLength": schema_params["min_length"],
-                "maxLength": schema_params["max_length"]
+                "minLength": min_length,
+                "maxLength": max_length
             }
         }
     }
 
-
-
-def create_revision_proposal_schema() -> Dict[str, Any]:
+def create_experimental_detail_schema() -> Dict[str, Any]:
     """
-    創建修訂提案的 JSON Schema
+    創建實驗詳情的 JSON Schema
     
     Returns:
-        Dict[str, Any]: 修訂提案的 schema
+        Dict[str, Any]: 實驗詳情的 schema
+        
+    Note:
+        相同參數下返回同一個快取物件，請勿修改
     """
-    schema_params = get_dynamic_schema_params()
-    
+    return _build_experimental_detail_schema(**get_dynamic_schema_params())
+
+
+
+@lru_cache(maxsize=SCHEMA_CACHE_SIZE)
+def _build_revision_proposal_schema(min_length: int, max_length: int) -> Dict[str, Any]:
+    """按長度參數建立 schema（結果被快取共享，調用方請勿修改）"""
     return {
         "type": "object",
         "title": "RevisionProposal",
@@ -201,44 +212,44 @@ def create_revision_proposal_schema() -> Dict[str, Any]:
             "revision_explanation": {
                 "type": "string",
                 "description": "修訂邏輯和關鍵改進的簡要說明",
-                "minLength": schema_params["min_length"],
-                "maxLength": schema_params["max_length"]
+                "minLength": min_length,
+                "maxLength": max_length
             },
             "proposal_title": {
                 "type": "string",
                 "description": "研究提案標題",
                 "minLength": 10,
-                "maxLength": schema_params["max_length"]
+                "maxLength": max_length
             },
             "need": {
                 "type": "string",
                 "description": "研究需求背景和當前限制",
-                "minLength": schema_params["min_length"],
-                "maxLength": schema_params["max_length"]
+                "minLength": min_length,
+                "maxLength": max_length
             },
             "solution": {
                 "type": "string",
                 "description": "建議的設計和開發策略",
-                "minLength": schema_params["min_length"],
-                "maxLength": schema_params["max_length"]
+                "minLength": min_length,
+                "maxLength": max_length
             },
             "differentiation": {
                 "type": "string",
                 "description": "與現有技術的比較",
-                "minLength": schema_params["min_length"],
-                "maxLength": schema_params["max_length"]
+                "minLength": min_length,
+                "maxLength": max_length
             },
             "benefit": {
                 "type": "string",
                 "description": "預期改進和效益",
-                "minLength": schema_params["min_length"],
-                "maxLength": schema_params["max_length"]
+                "minLength": min_length,
+                "maxLength": max_length
             },
             "experimental_overview": {
                 "type": "string",
                 "description": "實驗方法和方法論",
-                "minLength": schema_params["min_length"],
-                "maxLength": schema_params["max_length"]
+                "minLength": min_length,
+                "maxLength": max_length
             },
             "materials_list": {
                 "type": "array",
@@ -254,15 +265,21 @@ def create_revision_proposal_schema() -> Dict[str, Any]:
         }
     }
 
-def create_revision_experimental_detail_schema() -> Dict[str, Any]:
+def create_revision_proposal_schema() -> Dict[str, Any]:
     """
-    創建修訂實驗細節的 JSON Schema
+    創建修訂提案的 JSON Schema
     
     Returns:
-        Dict[str, Any]: 修訂實驗細節的 schema
+        Dict[str, Any]: 修訂提案的 schema
+        
+    Note:
+        相同參數下返回同一個快取物件，請勿修改
     """
-    schema_params = get_dynamic_schema_params()
-    
+    return _build_revision_proposal_schema(**get_dynamic_schema_params())
+
+@lru_cache(maxsize=SCHEMA_CACHE_SIZE)
+def _build_revision_experimental_detail_schema(min_length: int, max_length: int) -> Dict[str, Any]:
+    """按長度參數建立 schema（結果被快取共享，調用方請勿修改）"""
     return {
         "type": "object",
         "title": "RevisionExperimentalDetail",
@@ -278,36 +295,54 @@ def create_revision_experimental_detail_schema() -> Dict[str, Any]:
             "revision_explanation": {
                 "type": "string",
                 "description": "修訂邏輯和關鍵改進的簡要說明，基於用戶反饋",
-                "minLength": schema_params["min_length"],
-                "maxLength": schema_params["max_length"]
+                "minLength": min_length,
+                "maxLength": max_length
             },
             "synthesis_process": {
                 "type": "string",
                 "description": "詳細的合成步驟、條件、時間等，包含修改後的內容",
-                "minLength": schema_params["min_length"],
-                "maxLength": schema_params["max_length"]
+                "minLength": min_length,
+                "maxLength": max_length
             },
             "materials_and_conditions": {
                 "type": "string",
                 "description": "使用的材料、濃度、溫度、壓力和其他反應條件，包含修改後的內容",
-                "minLength": schema_params["min_length"],
-                "maxLength": schema_params["max_length"]
+                "minLength": min_length,
+                "maxLength": max_length
             },
             "analytical_methods": {
                 "type": "string",
                 "description": "表徵技術，如 XRD、SEM、NMR 等，包含修改後的內容",
-                "minLength": schema_params["min_length"],
-                "maxLength": schema_params["max_length"]
+                "minLength": min_length,
+                "maxLength": max_length
             },
             "precautions": {
                 "type": "string",
                 "description": "實驗注意事項和安全預防措施，包含修改後的內容",
-                "minLength": schema_params["min_length"],
-                "maxLength": schema_params["max_length"]
+                "minLength": min_length,
+                "maxLength": max_length
             }
         }
     }
 
+def create_revision_experimental_detail_schema() -> Dict[str, Any]:
+    """
+    創建修訂實驗細節的 JSON Schema
+    
+    Returns:
+        Dict[str, Any]: 修訂實驗細節的 schema
+        
+    Note:
+        相同參數下返回同一個快取物件，請勿修改
+    """
+    return _build_revision_experimental_detail_schema(**get_dynamic_schema_params())
+
+def invalidate_schemas() -> None:
+    """清除所有 schema 快取"""
+    for builder in (_build_research_proposal_schema, _build_experimental_detail_schema,
+                    _build_revision_proposal_schema, _build_revision_experimental_detail_schema):
+        builder.cache_clear()
+
 def get_schema_by_type(schema_type: str) -> Optional[Dict[str, Any]]:
     """
     根據類型獲取對應的 schema
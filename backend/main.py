@@ -69,6 +69,30 @@ def check_and_create_env_file_before_startup():
 # 在載入環境變量前先檢查 .env 檔案
 check_and_create_env_file_before_startup()
 
+# ==================== 事件循環 ====================
+def install_fast_event_loop() -> bool:
+    """
+    安裝較快的事件循環實作：Linux/macOS 使用 uvloop，Windows 使用 winloop
+    
+    Returns:
+        bool: 是否已安裝（未安裝對應套件時沿用預設 asyncio 事件循環）
+    """
+    import asyncio
+    try:
+        if sys.platform == "win32":
+            import winloop
+            asyncio.set_event_loop_policy(winloop.EventLoopPolicy())
+        else:
+            import uvloop
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        return False
+    return True
+
+# 直接執行本檔時（含 reload 模式下以 __mp_main__ 重新導入的子進程）在 uvicorn 建立事件循環前安裝；
+# 以 uvicorn CLI 啟動時 --loop auto 已會自動使用 uvloop
+FAST_EVENT_LOOP = __name__ in ("__main__", "__mp_main__") and install_fast_event_loop()
+
 # 載入環境變量
 load_dotenv()
 
@@ -240,10 +264,12 @@ async def health_check():
     }
 
 if __name__ == "__main__":
+    # 已安裝 uvloop/winloop 時沿用上方設定的事件循環策略，uvicorn 不再覆蓋
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
         reload=True,
-        log_level="info"
+        log_level="info",
+        loop="none" if FAST_EVENT_LOOP else "auto"
     ) 
\ No newline at end of file
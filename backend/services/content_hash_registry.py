@@ -0,0 +1,94 @@
+"""
+上傳文件內容雜湊註冊表
+====================
+
+記錄已完成向量嵌入的文件 SHA-256 → tracing number，
+讓重複上傳的相同文件在元數據提取前即可跳過。
+"""
+
+import os
+import sqlite3
+import logging
+from contextlib import closing
+from typing import Dict, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 直接定義配置變量，避免循環導入
+HASH_REGISTRY_PATH = "experiment_data/content_hashes.db"
+# 每次 IN (...) 查詢的雜湊數量上限，低於舊版 SQLite 的 SQLITE_MAX_VARIABLE_NUMBER（999）
+LOOKUP_BATCH_SIZE = 500
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    """建立連線並確保資料表存在（每次呼叫使用獨立連線，可跨線程使用）"""
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS seen_hashes ("
+        "hash TEXT PRIMARY KEY, doc_id TEXT NOT NULL, filename TEXT, "
+        "created_at TEXT DEFAULT CURRENT_TIMESTAMP)"
+    )
+    return conn
+
+
+def lookup_hashes(hashes: Iterable[str], db_path: str = HASH_REGISTRY_PATH) -> Dict[str, str]:
+    """
+    查詢已嵌入過的內容雜湊
+
+    Args:
+        hashes: 待查詢的 SHA-256 十六進位字串
+        db_path: 註冊表路徑
+
+    Returns:
+        Dict[str, str]: 命中的 {hash: doc_id}
+    """
+    hashes = list(set(hashes))
+    if not hashes:
+        return {}
+    found: Dict[str, str] = {}
+    try:
+        with closing(_connect(db_path)) as conn:
+            for start in range(0, len(hashes), LOOKUP_BATCH_SIZE):
+                batch = hashes[start:start + LOOKUP_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                found.update(conn.execute(
+                    f"SELECT hash, doc_id FROM seen_hashes WHERE hash IN ({placeholders})", batch
+                ).fetchall())
+        return found
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️ 讀取內容雜湊註冊表失敗: {e}")
+        return {}
+
+
+def record_hash(content_hash: str, doc_id: str, filename: str = "", db_path: str = HASH_REGISTRY_PATH) -> None:
+    """
+    記錄已完成嵌入的文件雜湊；已存在時保留原紀錄
+
+    Args:
+        content_hash: 文件 SHA-256
+        doc_id: 對應的 tracing number
+        filename: 文件名稱（僅供追蹤）
+        db_path: 註冊表路徑
+    """
+    record_hashes([(content_hash, doc_id, filename)], db_path=db_path)
+
+
+def record_hashes(rows: Iterable[Tuple[str, str, str]], db_path: str = HASH_REGISTRY_PATH) -> None:
+    """
+    批次記錄已完成嵌入的文件雜湊（單一連線、單一交易）；已存在時保留原紀錄
+
+    Args:
+        rows: (文件 SHA-256, tracing number, 文件名稱) 序列
+        db_path: 註冊表路徑
+    """
+    rows = [(content_hash, str(doc_id), filename) for content_hash, doc_id, filename in rows]
+    if not rows:
+        return
+    try:
+        with closing(_connect(db_path)) as conn, conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO seen_hashes (hash, doc_id, filename) VALUES (?, ?, ?)", rows
+            )
+    except sqlite3.Error as e:
+        logger.warning(f"⚠️ 寫入內容雜湊註冊表失敗: {e}")
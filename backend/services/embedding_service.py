@@ -21,18 +21,20 @@ AI 研究助理 - 文檔分塊和向量嵌入模塊
 import os
 import time
 import logging
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Tuple
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_chroma import Chroma
 import chromadb
 from chromadb.config import Settings
+from ..core.embedding_cache import CachedEmbedder, EMBED_CACHE_PATH
 # 兼容性導入：支持相對導入和絕對導入
 try:
-    from .pdf_read_and_chunk_page_get import load_and_parse_file, get_page_number_for_chunk
+    from .pdf_read_and_chunk_page_get import load_pdf_pages, find_page_number
 except ImportError:
     # 當作為模組導入時使用絕對導入
-    from .pdf_read_and_chunk_page_get import load_and_parse_file, get_page_number_for_chunk
+    from .pdf_read_and_chunk_page_get import load_pdf_pages, find_page_number
 # 延遲導入torch，避免模組級別導入問題
 # import torch
 
@@ -44,6 +46,12 @@ logger = logging.getLogger(__name__)
 # 配置路徑
 VECTOR_INDEX_DIR = os.path.join(os.path.dirname(__file__), "..", "experiment_data", "vector_index")
 EMBEDDING_MODEL_NAME = "BAAI/bge-base-en-v1.5"
+# 實驗文本每次寫入向量庫的筆數
+EXPERIMENT_EMBED_BATCH_SIZE = 64
+# 計算密集的向量嵌入使用獨立線程池（上傳路由與文件處理服務共用），
+# 避免佔滿預設執行器而拖慢 I/O 密集的元數據提取
+EMBED_MAX_WORKERS = int(os.getenv("EMBED_MAX_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+embed_pool = ThreadPoolExecutor(max_workers=EMBED_MAX_WORKERS, thread_name_prefix="embed")
 
 # 設備配置 - 延遲設置
 # device = "cuda" if torch.cuda.is_available() else "cpu"
@@ -67,9 +75,13 @@ def get_chroma_instance(vectorstore_type: str = "paper"):
             import torch
             device = "cuda" if torch.cuda.is_available() else "cpu"
             
-            embedding_model = HuggingFaceEmbeddings(
+            embedding_model = CachedEmbedder(
+                HuggingFaceEmbeddings(
+                    model_name=EMBEDDING_MODEL_NAME,
+                    model_kwargs={"trust_remote_code": True, "device": device}
+                ),
                 model_name=EMBEDDING_MODEL_NAME,
-                model_kwargs={"trust_remote_code": True, "device": device}
+                db_path=EMBED_CACHE_PATH
             )
             
             if vectorstore_type == "paper":
@@ -106,7 +118,7 @@ def get_chroma_instance(vectorstore_type: str = "paper"):
 # logger.info(f"嵌入模型使用設備：{device.upper()}")
 
 
-def embed_documents_from_metadata(metadata_list, status_callback=None):
+def embed_documents_from_metadata(metadata_list, status_callback=None, progress_cb=None):
     """
     根據元數據列表嵌入文檔
     
@@ -119,6 +131,8 @@ def embed_documents_from_metadata(metadata_list, status_callback=None):
     參數：
         metadata_list: 文檔元數據列表
         status_callback: 進度回調函數
+        progress_cb: 數值進度回調 progress_cb(done, total)，每個文件開始處理前調用；
+            回調可拋出異常以中止嵌入（例如任務已取消）
     
     處理流程：
     1. 文本分割：將文檔分割為小塊
@@ -154,6 +168,9 @@ def embed_documents_from_metadata(metadata_list, status_callback=None):
     
     # 使用tqdm顯示進度條
     for i, metadata in enumerate(metadata_list):
+        if progress_cb:
+            progress_cb(i, len(metadata_list))
+        
         file_start_time = time.time()
         filename = metadata.get("new_filename", metadata.get("original_filename", "unknown"))
         title = metadata.get("title", "未知標題")
@@ -228,7 +245,9 @@ def embed_documents_from_metadata(metadata_list, status_callback=None):
         # 讀取文件內容
         try:
             read_start_time = time.time()
-            doc_chunks = load_and_parse_file(file_path)
+            # 每個文件只讀取解析一次，各頁文字同時用於分塊與頁碼比對
+            page_texts = load_pdf_pages(file_path)
+            doc_chunks = "\n".join(page_texts)
             read_end_time = time.time()
             logger.info(f"   ✅ 文件讀取完成，耗時: {read_end_time - read_start_time:.2f}秒")
             logger.info(f"   📄 原始文本長度: {len(doc_chunks)} 字符")
@@ -269,7 +288,7 @@ def embed_documents_from_metadata(metadata_list, status_callback=None):
                 
             # 獲取頁碼信息
             try:
-                page_num = get_page_number_for_chunk(file_path, chunk)
+                page_num = find_page_number(page_texts, chunk)
             except Exception as e:
                 logger.warning(f"⚠️ 無法獲取頁碼信息 {file_path}: {e}")
                 page_num = "?"
@@ -293,6 +312,9 @@ def embed_documents_from_metadata(metadata_list, status_callback=None):
         if status_callback:
             status_callback(f"✅ 完成文件 {filename} 的分塊處理")
     
+    if progress_cb:
+        progress_cb(len(metadata_list), len(metadata_list))
+    
     chunking_end_time = time.time()
     logger.info(f"✅ 所有文件分塊處理完成，總耗時: {chunking_end_time - chunking_start_time:.2f}秒")
     logger.info(f"📊 總共生成 {len(texts)} 個有效文本塊")
@@ -372,7 +394,7 @@ def embed_documents_from_metadata(metadata_list, status_callback=None):
     logger.info(f"📊 處理統計 - 文件數: {len(metadata_list)}, 文本塊數: {len(texts)}, 平均每文件: {len(texts)/len(metadata_list):.1f} 塊")
 
 
-def embed_experiment_txt_batch(txt_paths: List[str], status_callback=None):
+def embed_experiment_txt_batch(txt_paths: List[str], status_callback=None, progress_cb=None):
     """
     批量嵌入實驗文本文件
     
@@ -385,6 +407,8 @@ def embed_experiment_txt_batch(txt_paths: List[str], status_callback=None):
     參數：
         txt_paths (List[str]): TXT文件路徑列表
         status_callback: 進度回調函數
+        progress_cb: 數值進度回調 progress_cb(done, total)，每讀取一個文件前調用；
+            回調可拋出異常以中止嵌入（例如任務已取消）
     
     特點：
     - 每個TXT文件作為一個完整的實驗記錄
@@ -404,7 +428,10 @@ def embed_experiment_txt_batch(txt_paths: List[str], status_callback=None):
     texts, metadatas = [], []
 
     # ==================== 文件處理循環 ====================
-    for path in txt_paths:
+    for i, path in enumerate(txt_paths):
+        if progress_cb:
+            progress_cb(i, len(txt_paths))
+        
         # 只處理TXT文件
         if not path.endswith(".txt"):
             continue
@@ -457,6 +484,9 @@ def embed_experiment_txt_batch(txt_paths: List[str], status_callback=None):
             "filename": os.path.basename(path),
         })
 
+    if progress_cb:
+        progress_cb(len(txt_paths), len(txt_paths))
+    
     # ==================== 驗證處理結果 ====================
     if not texts:
         if status_callback:
@@ -494,6 +524,69 @@ def embed_experiment_txt_batch(txt_paths: List[str], status_callback=None):
             logger.warning(f"預覽顯示失敗: {e}")
 
 
+def embed_experiment_rows(rows: Iterable[Tuple[str, str]], status_callback=None, progress_cb=None,
+                          batch_size: int = EXPERIMENT_EMBED_BATCH_SIZE) -> List[str]:
+    """
+    直接嵌入實驗語意文本（不經過 TXT 讀回）
+
+    功能：
+    1. 逐筆讀取 (exp_id, content)，例如 excel_service.iter_new_experiment_rows 的輸出
+    2. 每累積 batch_size 筆即寫入實驗向量數據庫；可一次傳入多個 Excel 的資料以合併批次
+
+    參數：
+        rows (Iterable[Tuple[str, str]]): (實驗ID, 文本內容)
+        status_callback: 進度回調函數
+        progress_cb: 數值進度回調 progress_cb(done, total)，每寫入一批後調用；
+            rows 為迭代器時總數未知，total 傳 0；回調可拋出異常以中止嵌入
+        batch_size (int): 每次寫入向量庫的筆數
+
+    返回：
+        List[str]: 成功嵌入的實驗ID（依輸入順序）
+    """
+    vectorstore = get_chroma_instance("experiment")
+    total = len(rows) if hasattr(rows, "__len__") else 0
+    texts, metadatas = [], []
+    embedded: List[str] = []
+
+    def flush() -> bool:
+        try:
+            vectorstore.add_texts(texts=texts, metadatas=metadatas)
+        except Exception as e:
+            logger.error(f"實驗數據嵌入失敗: {e}")
+            if status_callback:
+                status_callback(f"實驗數據嵌入失敗: {e}")
+            return False
+        embedded.extend(m["exp_id"] for m in metadatas)
+        texts.clear()
+        metadatas.clear()
+        if progress_cb:
+            progress_cb(len(embedded), total)
+        return True
+
+    for exp_id, content in rows:
+        content = content.strip()
+        # 過濾過短的內容
+        if len(content) < 10:
+            continue
+        texts.append(content)
+        metadatas.append({
+            "type": "experiment",
+            "exp_id": exp_id,
+            "filename": f"{exp_id}.txt",
+        })
+        if len(texts) >= batch_size and not flush():
+            return embedded
+    if texts and not flush():
+        return embedded
+
+    if status_callback:
+        if embedded:
+            status_callback(f"✅ 嵌入完成，共 {len(embedded)} 筆實驗摘要")
+        else:
+            status_callback("⚠️ 沒有新的實驗摘要可嵌入")
+    return embedded
+
+
 # ==================== 輔助函數 ====================
 
 def get_vectorstore(vectorstore_type: str = "paper"):
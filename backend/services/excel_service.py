@@ -1,62 +1,58 @@
 import pandas as pd
 import os
+from typing import Iterator, List, Tuple
 # 直接定義配置變量，避免循環導入
 EXPERIMENT_DIR = "experiment_data/experiment"
 
-def export_new_experiments_to_txt(
+def _resolve_output_dir(output_dir: str) -> str:
+    """將輸出目錄轉為絕對路徑（兼容從 backend 目錄啟動）"""
+    if os.path.isabs(output_dir):
+        return output_dir
+    current_dir = os.getcwd()
+    if os.path.basename(current_dir) == "backend":
+        # 如果在 backend 目錄，向上兩級到項目根目錄
+        project_root = os.path.dirname(os.path.dirname(current_dir))
+        if os.path.basename(project_root) == "AI_research_agent":
+            return os.path.join(project_root, output_dir)
+        # 如果不在正確的項目結構中，嘗試其他方法
+        parent_dir = os.path.dirname(current_dir)
+        if os.path.exists(os.path.join(parent_dir, "experiment_data")):
+            return os.path.join(parent_dir, output_dir)
+    return os.path.abspath(output_dir)
+
+
+def _clean_value(val):
+    if pd.isna(val):
+        return "NA"
+    elif isinstance(val, pd.Timestamp):
+        return val.strftime("%Y-%m-%d")
+    else:
+        return str(val)
+
+
+def _iter_experiment_rows(
     excel_path: str,
     output_dir: str,
-    id_column_count: int = 3
-):
+    id_column_count: int,
+    write_txt: bool,
+    skipped: List[str]
+) -> Iterator[Tuple[str, str, str]]:
     """
-    將尚未嵌入的實驗資料從 Excel 匯出為語意文本 (.txt)，每列對應一筆。
-    若該筆資料已存在對應 txt 檔，則略過不重複建立。
-
-    Parameters:
-    - excel_path: Excel 檔案路徑
-    - output_dir: 輸出 txt 的資料夾路徑
-    - id_column_count: 用來產生唯一 ID 的前幾個欄位數（預設為前 3 欄）
+    逐列產生尚未嵌入的實驗資料 (exp_id, 語意文本, txt 路徑)，已存在 txt 的列記錄到 skipped。
+    write_txt 為 True 時同時寫出 txt（作為已嵌入的紀錄）。
     """
-    # 確保輸出目錄使用絕對路徑
-    if not os.path.isabs(output_dir):
-        current_dir = os.getcwd()
-        if os.path.basename(current_dir) == "backend":
-            # 如果在 backend 目錄，向上兩級到項目根目錄
-            project_root = os.path.dirname(os.path.dirname(current_dir))
-            if os.path.basename(project_root) == "AI_research_agent":
-                output_dir = os.path.join(project_root, output_dir)
-            else:
-                # 如果不在正確的項目結構中，嘗試其他方法
-                parent_dir = os.path.dirname(current_dir)
-                if os.path.exists(os.path.join(parent_dir, "experiment_data")):
-                    output_dir = os.path.join(parent_dir, output_dir)
-                else:
-                    output_dir = os.path.abspath(output_dir)
-        else:
-            output_dir = os.path.abspath(output_dir)
-    
+    output_dir = _resolve_output_dir(output_dir)
+
     # 確保 Excel 文件路徑使用絕對路徑
     if not os.path.isabs(excel_path):
         excel_path = os.path.abspath(excel_path)
-    
+
     os.makedirs(output_dir, exist_ok=True)
     df = pd.read_excel(excel_path)
 
-    embedded = []
-    skipped = []
-    txt_paths = []
-
-    def clean_value(val):
-        if pd.isna(val):
-            return "NA"
-        elif isinstance(val, pd.Timestamp):
-            return val.strftime("%Y-%m-%d")
-        else:
-            return str(val)
-
     for idx, row in df.iterrows():
         # 產生唯一識別 ID（依前幾欄組成）
-        raw_id = "_".join(clean_value(row[i]) for i in df.columns[:id_column_count])
+        raw_id = "_".join(_clean_value(row[i]) for i in df.columns[:id_column_count])
         exp_id = "".join(c if c.isalnum() or c in "-_." else "_" for c in raw_id)
         txt_path = os.path.join(output_dir, f"{exp_id}.txt")
 
@@ -68,8 +64,51 @@ def export_new_experiments_to_txt(
         content = "\n".join(
             [f"[{col}] {row[col]}" for col in df.columns if pd.notna(row[col])]
         )
-        with open(txt_path, "w", encoding="utf-8") as f:
-            f.write(content)
+        if write_txt:
+            with open(txt_path, "w", encoding="utf-8") as f:
+                f.write(content)
+        yield exp_id, content, txt_path
+
+
+def iter_new_experiment_rows(
+    excel_path: str,
+    output_dir: str = EXPERIMENT_DIR,
+    id_column_count: int = 3,
+    write_txt: bool = True
+) -> Iterator[Tuple[str, str]]:
+    """
+    逐列產生尚未嵌入的實驗語意文本 (exp_id, content)，可直接交給
+    embed_experiment_rows 嵌入，不需先寫出再讀回 txt。
+
+    Parameters:
+    - excel_path: Excel 檔案路徑
+    - output_dir: txt 資料夾路徑（用於判斷是否已嵌入）
+    - id_column_count: 用來產生唯一 ID 的前幾個欄位數（預設為前 3 欄）
+    - write_txt: 是否同時寫出 txt；關閉後同一列下次仍會被視為未嵌入
+    """
+    for exp_id, content, _ in _iter_experiment_rows(excel_path, output_dir, id_column_count, write_txt, []):
+        yield exp_id, content
+
+
+def export_new_experiments_to_txt(
+    excel_path: str,
+    output_dir: str,
+    id_column_count: int = 3
+):
+    """
+    將尚未嵌入的實驗資料從 Excel 匯出為語意文本 (.txt)，每列對應一筆。
+    若該筆資料已存在對應 txt 檔，則略過不重複建立。
+
+    Parameters:
+    - excel_path: Excel 檔案路徑
+    - output_dir: 輸出 txt 的資料夾路徑
+    - id_column_count: 用來產生唯一 ID 的前幾個欄位數（預設為前 3 欄）
+    """
+    embedded = []
+    skipped = []
+    txt_paths = []
+
+    for exp_id, _, txt_path in _iter_experiment_rows(excel_path, output_dir, id_column_count, True, skipped):
         embedded.append(exp_id)
         txt_paths.append(txt_path)
 
@@ -18,7 +18,11 @@ AI 研究助理 - 文件上傳處理模塊
 import os
 import time
 import logging
-from typing import List, Dict, Optional, Callable
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Optional, Callable, Iterator, Tuple, Union
 # 導入服務模塊
 from .metadata_extractor import extract_metadata
 from .semantic_lookup import lookup_semantic_scholar_metadata
@@ -29,6 +33,39 @@ from .metadata_registry import append_metadata_to_registry, get_existing_metadat
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# 元數據提取（Semantic Scholar 查詢）的最大並行數
+METADATA_MAX_WORKERS = int(os.getenv("METADATA_MAX_WORKERS", "4"))
+# 文件數不超過此值時直接串行提取，省去建立線程/進程池的開銷
+METADATA_PARALLEL_MIN_FILES = 2
+# 元數據提取進程池的最大進程數
+METADATA_PROCESS_WORKERS = int(os.getenv("METADATA_PROCESS_WORKERS", str(os.cpu_count() or 1)))
+
+# 長駐的元數據提取進程池，首次使用時建立並跨批次重用；
+# 以 spawn 啟動，避免 fork 複製伺服器中其他線程持有的鎖
+_metadata_process_pool: Optional[ProcessPoolExecutor] = None
+_metadata_process_pool_lock = threading.Lock()
+
+
+def _get_metadata_process_pool() -> ProcessPoolExecutor:
+    """取得（必要時建立）元數據提取進程池"""
+    global _metadata_process_pool
+    with _metadata_process_pool_lock:
+        if _metadata_process_pool is None:
+            _metadata_process_pool = ProcessPoolExecutor(
+                max_workers=METADATA_PROCESS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _metadata_process_pool
+
+
+def _discard_metadata_process_pool(pool: ProcessPoolExecutor) -> None:
+    """子進程異常退出導致進程池損壞時丟棄，下次使用時重新建立"""
+    global _metadata_process_pool
+    with _metadata_process_pool_lock:
+        if _metadata_process_pool is pool:
+            _metadata_process_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
 def check_batch_duplicate(current_metadata: dict, processed_metadata_list: List[Dict]) -> Dict[str, any]:
     """
     檢查當前文件是否與已處理的批次文件重複
@@ -147,7 +184,124 @@ def check_duplicate_file(file_path: str, metadata: dict) -> Dict[str, any]:
             "existing_metadata": None
         }
 
-def process_uploaded_files(file_paths: List[str], status_callback: Optional[Callable[[str], None]] = None) -> List[Dict]:
+def _extract_single_file_metadata(path: str) -> Dict:
+    """
+    提取單一文件的元數據並以 Semantic Scholar 補充（可在線程池中並行執行）
+    
+    參數：
+        path (str): 文件路徑
+    
+    返回：
+        Dict: 整合後的元數據，失敗時拋出例外
+    """
+    file_start_time = time.time()
+    filename = os.path.basename(path)
+    
+    # 記錄文件信息
+    file_size = os.path.getsize(path) if os.path.exists(path) else 0
+    file_ext = os.path.splitext(path)[1].lower()
+    logger.info(f"📄 開始提取文件元數據：{filename}")
+    logger.info(f"   📊 文件信息 - 大小: {file_size} bytes, 格式: {file_ext}")
+    
+    # 提取基本元數據
+    extract_start_time = time.time()
+    metadata = extract_metadata(path)
+    extract_end_time = time.time()
+    logger.info(f"   ✅ 基本元數據提取完成，耗時: {extract_end_time - extract_start_time:.2f}秒")
+    logger.info(f"   📝 提取結果 - 標題: {metadata.get('title', '未知')}, DOI: {metadata.get('doi', '無')}")
+    
+    # Semantic Scholar補充信息
+    try:
+        logger.info(f"   🔍 開始Semantic Scholar查詢...")
+        semantic_start_time = time.time()
+        semantic_data = lookup_semantic_scholar_metadata(
+            doi=metadata.get("doi", "") or None,
+            title=metadata.get("title", "") or None
+        )
+        semantic_end_time = time.time()
+        logger.info(f"   ✅ Semantic Scholar查詢完成，耗時: {semantic_end_time - semantic_start_time:.2f}秒")
+        
+        if semantic_data:
+            logger.info(f"   📊 Semantic Scholar結果 - 標題: {semantic_data.get('title', '無')}, 作者數: {len(semantic_data.get('authors', []))}")
+        else:
+            logger.info(f"   ⚠️ Semantic Scholar無結果")
+            
+    except Exception as e:
+        logger.warning(f"⚠️ Semantic Scholar 查詢失敗 {path}: {e}")
+        semantic_data = {}
+    
+    # 元數據整合
+    merge_start_time = time.time()
+    metadata.update({
+        "title": semantic_data.get("title", metadata.get("title", "")),
+        "authors": "; ".join(a["name"] for a in semantic_data.get("authors", [])),
+        "year": semantic_data.get("year", ""),
+        "venue": semantic_data.get("venue", ""),
+        "url": semantic_data.get("url", ""),
+        "original_path": path  # 保存原始路徑
+    })
+    merge_end_time = time.time()
+    logger.info(f"   ✅ 元數據整合完成，耗時: {merge_end_time - merge_start_time:.2f}秒")
+    
+    # 如果原始文件沒有DOI但Semantic Scholar找到了DOI，則補回DOI
+    if not metadata.get("doi") and semantic_data.get("externalIds", {}).get("DOI"):
+        semantic_doi = semantic_data["externalIds"]["DOI"]
+        metadata["doi"] = semantic_doi
+        logger.info(f"✅ 通過Semantic Scholar補回DOI: {semantic_doi}")
+    
+    file_end_time = time.time()
+    logger.info(f"   ✅ 文件 {filename} 元數據提取完成，耗時: {file_end_time - file_start_time:.2f}秒")
+    logger.info(f"   📝 最終結果 - 標題: {metadata.get('title', '未知標題')}")
+    return metadata
+
+def _iter_extracted_metadata(file_paths: List[str], use_processes: bool = False) -> Iterator[Tuple[str, Union[Dict, Exception]]]:
+    """
+    依完成順序產生 (路徑, 元數據或例外)
+    
+    參數：
+        file_paths (List[str]): 文件路徑列表
+        use_processes (bool): 使用進程池（PDF 解析為 CPU 密集時可繞過 GIL）；預設使用線程池
+    """
+    if len(file_paths) <= METADATA_PARALLEL_MIN_FILES:
+        for path in file_paths:
+            try:
+                yield path, _extract_single_file_metadata(path)
+            except Exception as e:
+                yield path, e
+        return
+    
+    if use_processes:
+        pool = _get_metadata_process_pool()
+        futures = {pool.submit(_extract_single_file_metadata, path): path for path in file_paths}
+        try:
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                except BrokenProcessPool as e:
+                    _discard_metadata_process_pool(pool)
+                    yield futures[future], e
+                except Exception as e:
+                    yield futures[future], e
+        finally:
+            # 提前結束（例如任務取消）時，撤銷本批次尚未開始的提取
+            for future in futures:
+                future.cancel()
+        return
+    
+    executor = ThreadPoolExecutor(max_workers=min(METADATA_MAX_WORKERS, len(file_paths)), thread_name_prefix="metadata")
+    try:
+        futures = {executor.submit(_extract_single_file_metadata, path): path for path in file_paths}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result()
+            except Exception as e:
+                yield futures[future], e
+    finally:
+        # 不等待線程池：提前結束（例如任務取消）時撤銷尚未開始的提取，避免繼續執行排隊中的 DOI 查詢
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def process_uploaded_files(file_paths: List[str], status_callback: Optional[Callable[[str], None]] = None,
+                           use_processes: bool = False) -> List[Dict]:
     """
     處理上傳的文件，提取元數據並組織存儲
     
@@ -161,6 +315,7 @@ def process_uploaded_files(file_paths: List[str], status_callback: Optional[Call
     參數：
         file_paths (List[str]): 文件路徑列表
         status_callback (Optional[Callable]): 進度回調函數，用於更新UI狀態
+        use_processes (bool): 元數據提取改用進程池（CPU 密集的大批次 PDF）
     
     返回：
         List[Dict]: 處理結果列表，包含每個文件的元數據信息
@@ -203,79 +358,28 @@ def process_uploaded_files(file_paths: List[str], status_callback: Optional[Call
     batch_metadata = []
     extraction_errors = []
     
-    for i, path in enumerate(file_paths, 1):
-        file_start_time = time.time()
+    # 元數據提取以網絡查詢為主，預設使用線程池並行；限制並發數避免觸發 API 速率限制
+    metadata_by_path = {}
+    for i, (path, result) in enumerate(_iter_extracted_metadata(file_paths, use_processes), 1):
         filename = os.path.basename(path)
         logger.info(f"📄 提取第 {i}/{len(file_paths)} 個文件元數據：{filename}")
         
-        # 記錄文件信息
-        file_size = os.path.getsize(path) if os.path.exists(path) else 0
-        file_ext = os.path.splitext(path)[1].lower()
-        logger.info(f"   📊 文件信息 - 大小: {file_size} bytes, 格式: {file_ext}")
-        
         if status_callback:
             status_callback(f"📄 提取第 {i}/{len(file_paths)} 個文件元數據：{filename}")
         
-        try:
-            # 提取基本元數據
-            extract_start_time = time.time()
-            metadata = extract_metadata(path)
-            extract_end_time = time.time()
-            logger.info(f"   ✅ 基本元數據提取完成，耗時: {extract_end_time - extract_start_time:.2f}秒")
-            logger.info(f"   📝 提取結果 - 標題: {metadata.get('title', '未知')}, DOI: {metadata.get('doi', '無')}")
-            
-            # Semantic Scholar補充信息
-            try:
-                logger.info(f"   🔍 開始Semantic Scholar查詢...")
-                semantic_start_time = time.time()
-                semantic_data = lookup_semantic_scholar_metadata(
-                    doi=metadata.get("doi", "") or None,
-                    title=metadata.get("title", "") or None
-                )
-                semantic_end_time = time.time()
-                logger.info(f"   ✅ Semantic Scholar查詢完成，耗時: {semantic_end_time - semantic_start_time:.2f}秒")
-                
-                if semantic_data:
-                    logger.info(f"   📊 Semantic Scholar結果 - 標題: {semantic_data.get('title', '無')}, 作者數: {len(semantic_data.get('authors', []))}")
-                else:
-                    logger.info(f"   ⚠️ Semantic Scholar無結果")
-                    
-            except Exception as e:
-                logger.warning(f"⚠️ Semantic Scholar 查詢失敗 {path}: {e}")
-                semantic_data = {}
-            
-            # 元數據整合
-            merge_start_time = time.time()
-            metadata.update({
-                "title": semantic_data.get("title", metadata.get("title", "")),
-                "authors": "; ".join(a["name"] for a in semantic_data.get("authors", [])),
-                "year": semantic_data.get("year", ""),
-                "venue": semantic_data.get("venue", ""),
-                "url": semantic_data.get("url", ""),
-                "original_path": path  # 保存原始路徑
-            })
-            merge_end_time = time.time()
-            logger.info(f"   ✅ 元數據整合完成，耗時: {merge_end_time - merge_start_time:.2f}秒")
-            
-            # 如果原始文件沒有DOI但Semantic Scholar找到了DOI，則補回DOI
-            if not metadata.get("doi") and semantic_data.get("externalIds", {}).get("DOI"):
-                semantic_doi = semantic_data["externalIds"]["DOI"]
-                metadata["doi"] = semantic_doi
-                logger.info(f"✅ 通過Semantic Scholar補回DOI: {semantic_doi}")
-            
-            batch_metadata.append(metadata)
-            file_end_time = time.time()
-            logger.info(f"   ✅ 文件 {filename} 元數據提取完成，耗時: {file_end_time - file_start_time:.2f}秒")
-            logger.info(f"   📝 最終結果 - 標題: {metadata.get('title', '未知標題')}")
-            
-        except Exception as e:
-            logger.error(f"❌ 元數據提取失敗 {filename}: {e}")
+        if isinstance(result, Exception):
+            logger.error(f"❌ 元數據提取失敗 {filename}: {result}")
             extraction_errors.append({
                 "file": filename,
-                "error": str(e)
+                "error": str(result)
             })
             if status_callback:
                 status_callback(f"❌ 元數據提取失敗：{filename}")
+        else:
+            metadata_by_path[path] = result
+    
+    # 保持輸入順序，讓後續去重結果與串行處理一致
+    batch_metadata = [metadata_by_path[path] for path in file_paths if path in metadata_by_path]
     
     extraction_end_time = time.time()
     logger.info(f"✅ 批次元數據提取完成，耗時: {extraction_end_time - extraction_start_time:.2f}秒")
@@ -3,17 +3,29 @@
 import fitz  # PyMuPDF
 import os
 
-def load_and_parse_file(filepath):
-    """讀取 PDF 檔案的全文文字"""
+def load_pdf_pages(filepath):
+    """一次讀入 PDF 並返回各頁文字（全文與頁碼比對共用，不再重複開檔解析）"""
     try:
-        doc = fitz.open(filepath)
-        full_text = "\n".join([page.get_text() for page in doc])
-        doc.close()
-        return full_text
+        with open(filepath, "rb") as f:
+            data = f.read()
+        with fitz.open(stream=data, filetype="pdf") as doc:
+            return [page.get_text() for page in doc]
     except Exception as e:
         print(f"❌ 讀取文件失敗 {filepath}: {e}")
         raise
 
+def find_page_number(page_texts, chunk_text):
+    """在已解析的各頁文字中比對 chunk 對應的原始頁碼"""
+    prefix = chunk_text[:50]
+    for i, text in enumerate(page_texts):
+        if prefix in text:
+            return i + 1  # PDF 頁碼從 1 開始
+    return "?"  # 無法找到對應頁碼
+
+def load_and_parse_file(filepath):
+    """讀取 PDF 檔案的全文文字"""
+    return "\n".join(load_pdf_pages(filepath))
+
 def get_page_number_for_chunk(filepath, chunk_text):
     """比對 chunk 對應的原始頁碼"""
     try:
@@ -8,6 +8,13 @@ PARSED_CHEMICAL_DIR = "experiment_data/parsed_chemicals"
 
 BASE_URL = "https://pubchem.ncbi.nlm.nih.gov/rest/pug"
 
+# XML 不允許的控制字符（保留 \t \n \r），供 str.translate 一次刪除
+_XML_DEL = dict.fromkeys([i for i in range(32) if i not in (9, 10, 13)], None)
+
+def clean_text_for_xml(text):
+    """清理文本以確保XML兼容性"""
+    return str(text).translate(_XML_DEL) if text else ""
+
 def search_source(keywords: List[str], limit: int = 5) -> List[Dict]:
     """
     Search PubChem by keyword and return metadata with CID
@@ -101,28 +108,6 @@ def parse_pubchem_json(json_data: dict) -> dict:
                 return p.get("value", {}).get("sval") or p.get("value", {}).get("fval")
         return None
 
-    def clean_text_for_xml(text):
-        """清理文本以確保XML兼容性"""
-        if not text:
-            return ""
-        # 移除NULL字節和控制字符
-        cleaned = "".join(char for char in str(text) if ord(char) >= 32 or char in '\n\r\t')
-        # 移除其他可能導致XML問題的字符
-        cleaned = cleaned.replace('\x00', '')  # NULL字節
-        cleaned = cleaned.replace('\x01', '')  # SOH
-        cleaned = cleaned.replace('\x02', '')  # STX
-        cleaned = cleaned.replace('\x03', '')  # ETX
-        cleaned = cleaned.replace('\x04', '')  # EOT
-        cleaned = cleaned.replace('\x05', '')  # ENQ
-        cleaned = cleaned.replace('\x06', '')  # ACK
-        cleaned = cleaned.replace('\x07', '')  # BEL
-        cleaned = cleaned.replace('\x08', '')  # BS
-        cleaned = cleaned.replace('\x0b', '')  # VT
-        cleaned = cleaned.replace('\x0c', '')  # FF
-        cleaned = cleaned.replace('\x0e', '')  # SO
-        cleaned = cleaned.replace('\x0f', '')  # SI
-        return cleaned
-
     # 優先使用IUPAC名稱，如果沒有則使用其他名稱
     iupac_name = find_prop("IUPAC Name", "Preferred") or find_prop("IUPAC Name", "Traditional")
     if not iupac_name:
@@ -182,28 +167,6 @@ def get_boiling_and_melting_point(cid: int) -> dict:
                 return match.group(0)
             return None
 
-        def clean_text_for_xml(text):
-            """清理文本以確保XML兼容性"""
-            if not text:
-                return ""
-            # 移除NULL字節和控制字符
-            cleaned = "".join(char for char in str(text) if ord(char) >= 32 or char in '\n\r\t')
-            # 移除其他可能導致XML問題的字符
-            cleaned = cleaned.replace('\x00', '')  # NULL字節
-            cleaned = cleaned.replace('\x01', '')  # SOH
-            cleaned = cleaned.replace('\x02', '')  # STX
-            cleaned = cleaned.replace('\x03', '')  # ETX
-            cleaned = cleaned.replace('\x04', '')  # EOT
-            cleaned = cleaned.replace('\x05', '')  # ENQ
-            cleaned = cleaned.replace('\x06', '')  # ACK
-            cleaned = cleaned.replace('\x07', '')  # BEL
-            cleaned = cleaned.replace('\x08', '')  # BS
-            cleaned = cleaned.replace('\x0b', '')  # VT
-            cleaned = cleaned.replace('\x0c', '')  # FF
-            cleaned = cleaned.replace('\x0e', '')  # SO
-            cleaned = cleaned.replace('\x0f', '')  # SI
-            return cleaned
-
         bp_raw = find_in_sections(sections, "Boiling Point")
         mp_raw = find_in_sections(sections, "Melting Point")
 
@@ -239,28 +202,6 @@ def get_safety_info(cid: int) -> dict:
         nfpa_url = None
         cas_number = None
 
-        def clean_text_for_xml(text):
-            """清理文本以確保XML兼容性"""
-            if not text:
-                return ""
-            # 移除NULL字節和控制字符
-            cleaned = "".join(char for char in str(text) if ord(char) >= 32 or char in '\n\r\t')
-            # 移除其他可能導致XML問題的字符
-            cleaned = cleaned.replace('\x00', '')  # NULL字節
-            cleaned = cleaned.replace('\x01', '')  # SOH
-            cleaned = cleaned.replace('\x02', '')  # STX
-            cleaned = cleaned.replace('\x03', '')  # ETX
-            cleaned = cleaned.replace('\x04', '')  # EOT
-            cleaned = cleaned.replace('\x05', '')  # ENQ
-            cleaned = cleaned.replace('\x06', '')  # ACK
-            cleaned = cleaned.replace('\x07', '')  # BEL
-            cleaned = cleaned.replace('\x08', '')  # BS
-            cleaned = cleaned.replace('\x0b', '')  # VT
-            cleaned = cleaned.replace('\x0c', '')  # FF
-            cleaned = cleaned.replace('\x0e', '')  # SO
-            cleaned = cleaned.replace('\x0f', '')  # SI
-            return cleaned
-
         def walk(sections):
             nonlocal ghs_urls, nfpa_url, cas_number
             for sec in sections:
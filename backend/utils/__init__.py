@@ -23,6 +23,7 @@ from .exceptions import (
     ValidationError,
     DatabaseError,
     ProcessingTimeoutError,
+    TaskCancelledError,
     handle_exception
 )
 from .helpers import (
@@ -63,6 +64,7 @@ __all__ = [
     "ValidationError",
     "DatabaseError",
     "ProcessingTimeoutError",
+    "TaskCancelledError",
     "handle_exception",
     
     # 工具函數
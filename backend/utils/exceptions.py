@@ -130,6 +130,14 @@ class ProcessingTimeoutError(AIResearchAgentError):
         super().__init__(message, "TIMEOUT_ERROR", details)
 
 
+class TaskCancelledError(AIResearchAgentError):
+    """任務已被取消"""
+    
+    def __init__(self, task_id: str, details: Optional[Dict[str, Any]] = None):
+        message = f"任務已取消 (任務: {task_id})"
+        super().__init__(message, "TASK_CANCELLED", details)
+
+
 def handle_exception(func):
     """
     異常處理裝飾器
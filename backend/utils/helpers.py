@@ -28,6 +28,13 @@ SUPPORTED_FORMATS = {
     "text": [".txt"]
 }
 
+# 計算文件雜湊時的讀取區塊大小
+HASH_CHUNK_SIZE = 1 << 20
+
+# 模組載入時預先展開，避免每次調用重建列表
+_SUPPORTED_EXTENSIONS = tuple(ext for format_exts in SUPPORTED_FORMATS.values() for ext in format_exts)
+_SUPPORTED_EXTENSION_SET = frozenset(_SUPPORTED_EXTENSIONS)
+
 def get_supported_extensions() -> list:
     """
     獲取所有支持的文件擴展名
@@ -35,10 +42,16 @@ def get_supported_extensions() -> list:
     Returns:
         list: 支持的文件擴展名列表
     """
-    extensions = []
-    for format_exts in SUPPORTED_FORMATS.values():
-        extensions.extend(format_exts)
-    return extensions
+    return list(_SUPPORTED_EXTENSIONS)
+
+def get_supported_extension_set() -> frozenset:
+    """
+    獲取所有支持的文件擴展名集合（供成員判斷使用）
+    
+    Returns:
+        frozenset: 支持的文件擴展名集合
+    """
+    return _SUPPORTED_EXTENSION_SET
 
 # 配置日誌
 logger = logging.getLogger(__name__)
@@ -88,13 +101,15 @@ def generate_file_hash(file_path: str, algorithm: str = 'md5') -> str:
     if algorithm not in hash_functions:
         raise ValueError(f"不支持的哈希算法: {algorithm}")
     
-    hash_func = hash_functions[algorithm]()
-    
     try:
-        with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b""):
+        with open(file_path, 'rb', buffering=HASH_CHUNK_SIZE) as f:
+            # Python 3.11+ 的 file_digest 在 C 層循環讀取，速度快且記憶體佔用固定
+            if hasattr(hashlib, "file_digest"):
+                return hashlib.file_digest(f, hash_functions[algorithm]).hexdigest()
+            hash_func = hash_functions[algorithm]()
+            while chunk := f.read(HASH_CHUNK_SIZE):
                 hash_func.update(chunk)
-        return hash_func.hexdigest()
+            return hash_func.hexdigest()
     except Exception as e:
         logger.error(f"生成文件哈希失敗 {file_path}: {e}")
         raise
@@ -117,12 +132,11 @@ def validate_file_format(file_path: str) -> str:
         raise FileNotFoundError(file_path)
     
     file_ext = Path(file_path).suffix.lower()
-    supported_extensions = get_supported_extensions()
     
-    if file_ext not in supported_extensions:
+    if file_ext not in _SUPPORTED_EXTENSION_SET:
         raise UnsupportedFileFormatError(
             file_path, 
-            supported_formats=supported_extensions
+            supported_formats=get_supported_extensions()
         )
     
     # 返回文件格式類型
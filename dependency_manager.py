@@ -45,9 +45,15 @@ PYTHON_DEPS = {
     # Web 框架
     "fastapi": ("fastapi", "fastapi"),
     "uvicorn": ("uvicorn", "uvicorn[standard]"),
+    "orjson": ("orjson", "orjson"),
+    "cachetools": ("cachetools", "cachetools"),
+    "redis": ("redis", "redis"),
+    # 較快的事件循環（依平台二選一）
+    **({"winloop": ("winloop", "winloop")} if sys.platform == "win32" else {"uvloop": ("uvloop", "uvloop")}),
     
     # HTTP 和網絡
     "requests": ("requests", "requests"),
+    "h2": ("h2", "h2"),
     "certifi": ("certifi", "certifi"),
     
     # 圖像處理
@@ -55,9 +61,6 @@ PYTHON_DEPS = {
     "svglib": ("svglib", "svglib"),
     "reportlab": ("reportlab", "reportlab"),
     
-    # Web 自動化
-    "selenium": ("selenium", "selenium"),
-    
     # 環境和配置
     "dotenv": ("dotenv", "python-dotenv"),
     "pydantic": ("pydantic", "pydantic-settings"),
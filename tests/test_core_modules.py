@@ -232,6 +232,33 @@ class TestGeneration:
         assert isinstance(response["content"], str)
         # 內容應該有值，title 可能為空
         assert len(response["content"]) > 0
+    
+    def test_structured_params_skeleton_follows_param_updates(self):
+        """測試模型參數更新後，結構化請求參數骨架隨之改變（不返回過時的快取）"""
+        from backend.core.llm_client import LLMClient
+        from backend.core.model_config import get_model_config, get_model_info
+        
+        schema = {"type": "object", "properties": {}}
+        config = get_model_config()
+        live_params = config.get_model_params_view()
+        try:
+            model, params = get_model_info()
+            skeleton = LLMClient._structured_params_skeleton(schema, model, params)
+            assert LLMClient._structured_params_skeleton(schema, model, params) is skeleton
+            LLMClient._structured_params_skeleton(schema, model, live_params)
+            
+            config.update_model_param("verbosity", "high")
+            config.update_model_param("max_output_tokens", 321)
+            
+            model, params = get_model_info()
+            updated = LLMClient._structured_params_skeleton(schema, model, params)
+            assert updated["text"]["verbosity"] == "high"
+            assert updated["max_output_tokens"] == 321
+            live_updated = LLMClient._structured_params_skeleton(schema, model, live_params)
+            assert live_updated["text"]["verbosity"] == "high"
+            assert live_updated["max_output_tokens"] == 321
+        finally:
+            config.reset_to_defaults()
 
 
 class TestSchemaManager:
@@ -260,6 +287,22 @@ class TestSchemaManager:
         assert "max_length" in params
         assert params["min_length"] > 0
         assert params["max_length"] > params["min_length"]
+    
+    def test_schema_cached_per_params(self):
+        """測試相同參數返回快取的 schema，參數變更時重新建立"""
+        from unittest.mock import patch
+        from backend.core import schema_manager
+        
+        schema_manager.invalidate_schemas()
+        with patch.object(schema_manager, "get_dynamic_schema_params",
+                          return_value={"min_length": 5, "max_length": 100}):
+            first = schema_manager.create_experimental_detail_schema()
+            assert schema_manager.create_experimental_detail_schema() is first
+        with patch.object(schema_manager, "get_dynamic_schema_params",
+                          return_value={"min_length": 5, "max_length": 300}):
+            changed = schema_manager.create_experimental_detail_schema()
+        assert changed is not first
+        assert changed["properties"]["precautions"]["maxLength"] == 300
 
 
 class TestModeManager:
@@ -550,4 +593,84 @@ class TestSchemaManagerRevisionFunctions:
         assert "type" in schema
         assert schema["type"] == "object"
         assert "title" in schema
-        assert schema["title"] == "RevisionExperimentalDetail" 
\ No newline at end of file
+        assert schema["title"] == "RevisionExperimentalDetail" 
+
+class TestEmbeddingCache:
+    """測試嵌入向量快取"""
+    
+    def test_cached_embedder_only_embeds_misses(self, tmp_path):
+        """測試快取只對未命中的文本呼叫底層模型，且結果保持原順序"""
+        from backend.core.embedding_cache import CachedEmbedder
+        
+        inner = Mock()
+        inner.embed_documents.side_effect = lambda texts: [[float(len(t)), 1.0] for t in texts]
+        db_path = str(tmp_path / "embeddings.db")
+        embedder = CachedEmbedder(inner, model_name="test-model", db_path=db_path)
+        
+        assert embedder.embed_documents(["aa", "bbb", "aa"]) == [[2.0, 1.0], [3.0, 1.0], [2.0, 1.0]]
+        inner.embed_documents.assert_called_once_with(["aa", "bbb"])
+        
+        inner.embed_documents.reset_mock()
+        assert embedder.embed_documents(["bbb", "cccc"]) == [[3.0, 1.0], [4.0, 1.0]]
+        inner.embed_documents.assert_called_once_with(["cccc"])
+        
+        # 新實例從持久化快取命中
+        inner.embed_documents.reset_mock()
+        restarted = CachedEmbedder(inner, model_name="test-model", db_path=db_path)
+        assert restarted.embed_documents(["aa", "cccc"]) == [[2.0, 1.0], [4.0, 1.0]]
+        inner.embed_documents.assert_not_called()
+
+
+class TestLLMResponseCache:
+    """測試 LLM 響應快取"""
+    
+    def test_response_cache_roundtrip_and_expiry(self, tmp_path):
+        """測試快取鍵區分參數與 schema，命中後返回原值，過期後未命中"""
+        from backend.core.llm_response_cache import LLMResponseCache, make_cache_key, is_cacheable
+        
+        key = make_cache_key("gpt-5", "prompt", {"reasoning_effort": "low"})
+        assert key == make_cache_key("gpt-5", "prompt", {"reasoning_effort": "low"})
+        assert key != make_cache_key("gpt-5", "prompt", {"reasoning_effort": "high"})
+        assert key != make_cache_key("gpt-5", "prompt", {"reasoning_effort": "low"}, {"type": "object"})
+        assert is_cacheable({}) and not is_cacheable({"temperature": 0.7})
+        
+        cache = LLMResponseCache(db_path=str(tmp_path / "responses.db"), ttl=60, enabled=True)
+        assert cache.get(key) is None
+        cache.set(key, {"need": "測試"})
+        assert cache.get(key) == {"need": "測試"}
+        
+        expired = LLMResponseCache(db_path=str(tmp_path / "responses.db"), ttl=-1, enabled=True)
+        assert expired.get(key) is None
+        
+        disabled = LLMResponseCache(db_path=str(tmp_path / "responses.db"), enabled=False)
+        assert disabled.get(key) is None
+
+
+class TestModelConfig:
+    """測試模型配置"""
+    
+    def test_model_params_view_and_version(self):
+        """測試參數以唯讀快照返回且不隨變更改變，即時視圖反映新值，變更時版本號遞增"""
+        from backend.core.model_config import ModelConfig
+        
+        config = ModelConfig()
+        params = config.get_model_params()
+        view = config.get_model_params_view()
+        version = config.get_model_params_version()
+        assert config.get_model_params() is params
+        with pytest.raises(TypeError):
+            params["timeout"] = 1
+        with pytest.raises(TypeError):
+            view["timeout"] = 1
+        
+        config.update_model_param("timeout", 30)
+        assert params["timeout"] == 75
+        assert config.get_model_params()["timeout"] == 30
+        assert config.get_model_params() is not params
+        assert view["timeout"] == 30
+        assert config.get_model_params_version() > version
+        
+        version = config.get_model_params_version()
+        config.reset_to_defaults()
+        assert config.get_model_params()["timeout"] == 75
+        assert config.get_model_params_version() > version
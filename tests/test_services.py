@@ -11,6 +11,7 @@
 
 import pytest
 import os
+import time
 import shutil
 
 class TestFileService:
@@ -45,6 +46,32 @@ class TestFileService:
             if os.path.exists(test_file):
                 os.remove(test_file)
     
+    def test_extraction_stops_when_consumer_closes_early(self):
+        """測試提前關閉元數據提取生成器時，排隊中的文件不會再被提取"""
+        import threading
+        from unittest.mock import patch
+        from backend.services import file_service
+        
+        extracted = []
+        release = threading.Event()
+        
+        def slow_extract(path):
+            extracted.append(path)
+            release.wait(timeout=0.2)
+            return {"filename": path}
+        
+        paths = [f"paper_{i}.pdf" for i in range(10)]
+        with patch.object(file_service, "_extract_single_file_metadata", side_effect=slow_extract), \
+                patch.object(file_service, "METADATA_MAX_WORKERS", 2):
+            results = file_service._iter_extracted_metadata(paths)
+            next(results)
+            results.close()
+            release.set()
+            time.sleep(0.3)
+        
+        # 只有關閉時已在執行的提取（每個線程至多兩個）會完成，其餘排隊中的路徑不再提取
+        assert len(extracted) <= 4
+    
     def test_real_document_renaming(self):
         """測試真實文檔重命名 - 驗證tracing number + title + type格式"""
         from backend.services.document_renamer import rename_and_copy_file
@@ -252,6 +279,34 @@ class TestChemicalService:
             assert "°C" in info["melting_point_c"]
 
 
+class TestContentHashRegistry:
+    """測試上傳文件內容雜湊註冊表 - 真實測試"""
+    
+    def test_real_record_and_lookup(self, tmp_path):
+        """測試記錄後可查到雜湊，未記錄的雜湊不會命中"""
+        from backend.services.content_hash_registry import lookup_hashes, record_hash
+        
+        db_path = str(tmp_path / "content_hashes.db")
+        record_hash("a" * 64, "001", "001_paper.pdf", db_path=db_path)
+        # 重複記錄同一雜湊時保留原紀錄
+        record_hash("a" * 64, "002", "002_paper.pdf", db_path=db_path)
+        
+        assert lookup_hashes(["a" * 64, "b" * 64], db_path=db_path) == {"a" * 64: "001"}
+        assert lookup_hashes([], db_path=db_path) == {}
+    
+    def test_real_batch_record_and_large_lookup(self, tmp_path):
+        """測試批次記錄，以及超過單次查詢上限（1000+ 個雜湊）時仍能正確命中"""
+        from backend.services.content_hash_registry import lookup_hashes, record_hashes
+        
+        db_path = str(tmp_path / "content_hashes.db")
+        recorded = {f"{i:064x}": f"{i:03d}" for i in range(0, 1200, 100)}
+        record_hashes([(h, doc_id, f"{doc_id}_paper.pdf") for h, doc_id in recorded.items()], db_path=db_path)
+        record_hashes([], db_path=db_path)
+        
+        queried = [f"{i:064x}" for i in range(1200)]
+        assert lookup_hashes(queried, db_path=db_path) == recorded
+
+
 class TestExcelService:
     """測試 Excel 服務 - 真實測試"""
     